@@ -118,7 +118,7 @@ def _query_vector_only(query_txt: str, config: dict, n_results: int = 20) -> dic
 
 def _query_hybrid(query_txt: str, config: dict, n_results: int = 20) -> dict:
     from ctxvault.core.querying import query
-    return query(query_txt=query_txt, config=config, n_results=n_results)
+    return query(query_txt=query_txt, config=config, n_results=n_results, mode="hybrid")
 
 
 # ---------------------------------------------------------------------------
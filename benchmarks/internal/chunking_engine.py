@@ -0,0 +1,198 @@
+"""
+Chunking engine microbenchmark — repeated split() counting vs single-pass word offsets.
+
+Runs the previous chunking implementation (kept below as the reference, it
+re-tokenizes the text for the whole document, every paragraph, every merged
+piece and every line) and the offsets-based engine in utils.chuncking on
+multi-megabyte synthetic inputs: plain prose with paragraphs, markdown with a
+header hierarchy, and PDF-like text with long unbroken lines. Checks that both
+produce identical chunks, then reports the median time per input.
+
+Usage: python benchmarks/internal/chunking_engine.py [--mb 4] [--chunk-size 400] [--overlap 100] [--repeat 3]
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (before the offsets engine)
+# ---------------------------------------------------------------------------
+
+def reference_chunking(text: str, chunk_size: int, overlap: int, file_type: str | None) -> list[str]:
+    if not text or not text.strip():
+        return []
+    if file_type == ".md":
+        return _reference_markdown(text, chunk_size, overlap)
+    return _reference_recursive(text, chunk_size, overlap)
+
+
+def _reference_markdown(text: str, chunk_size: int, overlap: int) -> list[str]:
+    headers = list(re.finditer(r"^(#{1,6})\s+(.*)", text, re.MULTILINE))
+    if not headers:
+        return _reference_recursive(text, chunk_size, overlap)
+
+    sections: list[tuple[str, str]] = []
+    header_stack: list[tuple[int, str]] = []
+    preamble = text[: headers[0].start()].strip()
+    if preamble:
+        sections.append(("", preamble))
+    for i, match in enumerate(headers):
+        level = len(match.group(1))
+        header_stack = [(lvl, txt) for lvl, txt in header_stack if lvl < level]
+        header_stack.append((level, match.group(2).strip()))
+        body_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        sections.append((" > ".join(txt for _, txt in header_stack), text[match.end():body_end].strip()))
+
+    chunks: list[str] = []
+    for prefix, body in sections:
+        section_text = (f"{prefix}\n{body}" if body else prefix) if prefix else body
+        if len(section_text.split()) <= chunk_size:
+            if section_text.strip():
+                chunks.append(section_text.strip())
+            continue
+        for sub in _reference_recursive(body if body else section_text, chunk_size, overlap):
+            chunk = f"{prefix}\n{sub}" if prefix else sub
+            if chunk.strip():
+                chunks.append(chunk.strip())
+    return chunks
+
+
+def _reference_recursive(text: str, chunk_size: int, overlap: int) -> list[str]:
+    if not text or not text.strip():
+        return []
+    if len(text.split()) <= chunk_size:
+        return [text.strip()]
+
+    paragraphs = [p.strip() for p in re.split(r"\n\n+", text) if p.strip()]
+    refined: list[str] = []
+    for piece in _reference_merge(paragraphs, chunk_size):
+        if len(piece.split()) <= chunk_size:
+            refined.append(piece)
+        else:
+            refined.extend(_reference_merge([ln.strip() for ln in piece.split("\n") if ln.strip()], chunk_size))
+
+    final: list[str] = []
+    for piece in refined:
+        if len(piece.split()) <= chunk_size:
+            final.append(piece)
+        else:
+            words = piece.split()
+            step = max(chunk_size - overlap, 1)
+            final.extend(" ".join(words[i:i + chunk_size]) for i in range(0, len(words), step))
+    return [c for c in final if c.strip()]
+
+
+def _reference_merge(pieces: list[str], chunk_size: int) -> list[str]:
+    merged: list[str] = []
+    current: list[str] = []
+    current_words = 0
+    for piece in pieces:
+        piece_words = len(piece.split())
+        if current and current_words + piece_words > chunk_size:
+            merged.append("\n\n".join(current))
+            current, current_words = [piece], piece_words
+        else:
+            current.append(piece)
+            current_words += piece_words
+    if current:
+        merged.append("\n\n".join(current))
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(6, 24))) + "."
+
+
+VOCABULARY = [
+    "vault", "memory", "agent", "retrieval", "index", "vector", "chunk", "query", "the", "a", "of",
+    "and", "local", "semantic", "skill", "document", "embedding", "latency", "throughput", "store",
+]
+
+
+def make_prose(size: int, rng: random.Random) -> str:
+    parts, length = [], 0
+    while length < size:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(2, 12)))
+        parts.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(parts)
+
+
+def make_markdown(size: int, rng: random.Random) -> str:
+    parts, length = [], 0
+    while length < size:
+        level = rng.choice([1, 2, 2, 3, 3, 3])
+        section = "#" * level + " " + " ".join(rng.choice(VOCABULARY) for _ in range(3))
+        body = "\n\n".join(" ".join(_sentence(rng) for _ in range(rng.randint(2, 8))) for _ in range(rng.randint(1, 40)))
+        parts.append(f"{section}\n\n{body}")
+        length += len(parts[-1]) + 2
+    return "\n\n".join(parts)
+
+
+def make_pdf_like(size: int, rng: random.Random) -> str:
+    """Long lines without paragraph breaks, as pypdf often returns them."""
+    lines, length = [], 0
+    while length < size:
+        line = " ".join(_sentence(rng) for _ in range(rng.randint(20, 300)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def timed(fn, repeat: int) -> tuple[float, list[str]]:
+    timings, result = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the reference chunker with the offsets-based engine")
+    parser.add_argument("--mb", type=float, default=4, help="Size of each synthetic input in MB")
+    parser.add_argument("--chunk-size", type=int, default=400)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from ctxvault.utils.chuncking import chunking
+
+    rng = random.Random(0)
+    size = int(args.mb * 2**20)
+    inputs = [
+        ("prose", ".txt", make_prose(size, rng)),
+        ("markdown", ".md", make_markdown(size, rng)),
+        ("pdf-like", ".pdf", make_pdf_like(size, rng)),
+    ]
+
+    header = f"{'Input':<10} {'MB':>5} {'chunks':>7} {'reference':>10} {'offsets':>9} {'speedup':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for name, file_type, text in inputs:
+        old_time, old_chunks = timed(lambda: reference_chunking(text, args.chunk_size, args.overlap, file_type), args.repeat)
+        new_time, new_chunks = timed(lambda: chunking(text, chunk_size=args.chunk_size, overlap=args.overlap, file_type=file_type), args.repeat)
+        if new_chunks != old_chunks:
+            raise SystemExit(f"{name}: chunks differ from the reference implementation")
+        print(
+            f"{name:<10} {len(text) / 2**20:>5.1f} {len(new_chunks):>7} "
+            f"{old_time:>9.3f}s {new_time:>8.3f}s {old_time / new_time:>7.2f}x"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -137,6 +137,11 @@ def _query_vector_only(query_txt: str, config: dict, n_results: int = 20) -> dic
     return chroma_store.query(query_embedding=query_embedding, config=config, n_results=n_results)
 
 
+def _query_hybrid(query_txt: str, config: dict, n_results: int = 20) -> dict:
+    from ctxvault.core.querying import query
+    return query(query_txt=query_txt, config=config, n_results=n_results, mode="hybrid")
+
+
 def _query_full_pipeline(query_txt: str, config: dict, n_results: int = 20) -> dict:
     """Full pipeline: vector → conditional BM25 → cross-encoder rerank."""
     from ctxvault.core.querying import query
@@ -318,6 +323,7 @@ def main():
     strategies = [
         ("OLD: fixed50 + vector", _index_old, _query_vector_only),
         ("MID: smart  + vector",  _index_new, _query_vector_only),
+        ("NEW: smart  + hybrid",  _index_new, _query_hybrid),
         ("NEW: smart  + rerank",  _index_new, _query_full_pipeline),
     ]
 
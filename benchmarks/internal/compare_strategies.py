@@ -98,7 +98,7 @@ def _query_vector_only(query_txt: str, config: dict, n_results: int = 5) -> dict
 def _query_hybrid(query_txt: str, config: dict, n_results: int = 5) -> dict:
     """Query using hybrid search (new behavior)."""
     from ctxvault.core.querying import query
-    return query(query_txt=query_txt, config=config, n_results=n_results)
+    return query(query_txt=query_txt, config=config, n_results=n_results, mode="hybrid")
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,108 @@
+"""
+Directory scan benchmark — rglob walker vs scandir walker on a large vault tree.
+
+Builds a synthetic vault (nested folders of empty documents, a share of
+unsupported files and a Chroma-sized db folder) and times collecting the
+indexable files with each walker: the previous rglob + resolve() filter, and
+BaseVault.scan_files, which prunes the db folder, filters extensions by name and
+returns stat results for the manifest in the same pass.
+
+Usage: python benchmarks/internal/directory_scan.py [--files 100000] [--db-files 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import make_vault
+
+FILES_PER_DIR = 50
+UNSUPPORTED_EVERY = 5
+
+
+def build_tree(vault_path: Path, db_path: Path, files: int, db_files: int) -> None:
+    for i in range(files):
+        folder = vault_path / f"area{i // (FILES_PER_DIR * 20)}" / f"topic{i // FILES_PER_DIR}"
+        if i % FILES_PER_DIR == 0:
+            folder.mkdir(parents=True, exist_ok=True)
+        suffix = ".png" if i % UNSUPPORTED_EVERY == 0 else ".txt"
+        (folder / f"doc{i}{suffix}").touch()
+    for i in range(db_files):
+        folder = db_path / f"segment{i // 1000}"
+        if i % 1000 == 0:
+            folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"data{i}.bin").touch()
+
+
+# ---------------------------------------------------------------------------
+# Walkers
+# ---------------------------------------------------------------------------
+
+def rglob_walker(vault, base_path: Path) -> dict:
+    """The walker scan_files replaced, plus the per-file checks and stat the indexer did after it."""
+    from ctxvault.utils.text_extraction import SUPPORTED_EXT
+
+    found = {}
+    for p in base_path.rglob("*"):
+        if not p.is_file():
+            continue
+        if p.resolve().is_relative_to(vault.db_path):
+            continue
+        if p.suffix not in SUPPORTED_EXT or not p.resolve().is_relative_to(vault.vault_path):
+            continue
+        found[str(p)] = p.stat()
+    return found
+
+
+def scandir_walker(vault, base_path: Path) -> dict:
+    files, _ = vault._collect_indexable(base_path=base_path)
+    return files
+
+
+def run(walker, vault, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = walker(vault, vault.vault_path)
+        timings.append(time.perf_counter() - start)
+    return {"files": len(found), "seconds": statistics.median(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rglob and scandir vault walkers")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--db-files", type=int, default=20_000, help="Files placed under the vault's db folder")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from ctxvault.core.vaults.semantic import SemanticVault
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_vault(os.path.realpath(tmp_dir))
+        vault = SemanticVault(vault_name="bench", config=config)
+        print(f"  building {args.files} files + {args.db_files} db files...", flush=True)
+        build_tree(vault.vault_path, vault.db_path, args.files, args.db_files)
+
+        results = {
+            "rglob": run(rglob_walker, vault, args.repeat),
+            "scandir": run(scandir_walker, vault, args.repeat),
+        }
+
+    baseline = results["rglob"]["seconds"]
+    header = f"{'Walker':<9} {'files':>8} {'time':>9} {'speedup':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<9} {r['files']:>8} {r['seconds']:>8.2f}s {baseline / r['seconds']:>7.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Embedding array microbenchmark — nested Python lists vs float32 NumPy arrays.
+
+Simulates encoder output for a batch of chunks and measures the path from
+embed_list to the vector store both ways: converting with .tolist() (the old
+behaviour) and passing the float32 array through unchanged. Reports peak
+traced allocations and latency for the conversion alone and for the Chroma
+upsert. No model is needed.
+
+Usage: python benchmarks/internal/embedding_arrays.py [--chunks 2048] [--dim 384] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def measure(fn, repeat: int) -> tuple[float, float]:
+    """Return (median ms, peak traced MB) for fn.
+
+    Latency is timed without tracing; allocations come from one extra traced run.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def upsert(collection, vectors, n: int) -> None:
+    ids = [f"c{i}" for i in range(n)]
+    collection.upsert(ids=ids, embeddings=vectors, documents=ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list vs ndarray embedding transport")
+    parser.add_argument("--chunks", type=int, default=2048)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from chromadb import PersistentClient, Settings
+
+    vectors = np.random.default_rng(0).random((args.chunks, args.dim), dtype=np.float32)
+
+    rows = {
+        "convert: tolist": lambda: vectors.tolist(),
+        "convert: ndarray": lambda: np.asarray(vectors, dtype=np.float32),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = PersistentClient(path=tmp_dir, settings=Settings(anonymized_telemetry=False))
+        as_list = client.get_or_create_collection("as_list")
+        as_array = client.get_or_create_collection("as_array")
+        rows["upsert: tolist"] = lambda: upsert(as_list, vectors.tolist(), args.chunks)
+        rows["upsert: ndarray"] = lambda: upsert(as_array, vectors, args.chunks)
+
+        results = {name: measure(fn, args.repeat) for name, fn in rows.items()}
+
+    header = f"{'Path':<18} {'median':>10} {'peak alloc':>12}"
+    print()
+    print(f"  {args.chunks} chunks x {args.dim} dims, float32")
+    print(header)
+    print("-" * len(header))
+    for name, (ms, mb) in results.items():
+        print(f"{name:<18} {ms:>8.2f}ms {mb:>10.2f}MB")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Embedding backend benchmark — compare latency, memory and fidelity of CtxVault's embedding backends.
+
+Each backend runs in a fresh subprocess so resident memory is measured in isolation.
+Vectors are compared against the full-precision torch backend (cosine similarity).
+
+Usage: python benchmarks/internal/embedding_backends.py [--backends torch torch-int8 onnx onnx-int8] [--queries 200]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DATASET_DIR = Path(__file__).parent.parent / "dataset"
+
+
+def load_texts() -> tuple[list[str], list[str]]:
+    queries = [q["query"] for q in json.loads((DATASET_DIR / "queries.json").read_text(encoding="utf-8"))]
+    passages = []
+    for f in sorted(DATASET_DIR.rglob("*.txt")):
+        passages.extend(p.strip() for p in f.read_text(encoding="utf-8").split("\n\n") if p.strip())
+    return queries, passages
+
+
+# ---------------------------------------------------------------------------
+# Worker (runs inside the subprocess)
+# ---------------------------------------------------------------------------
+
+def run_worker(backend: str, n_queries: int) -> dict:
+    from ctxvault.core.embedding import get_model
+
+    queries, passages = load_texts()
+    queries = (queries * (n_queries // len(queries) + 1))[:n_queries]
+
+    start = time.perf_counter()
+    model = get_model(backend)
+    load_s = time.perf_counter() - start
+
+    model.encode(sentences=["warmup"], show_progress_bar=False)
+
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        model.encode(sentences=[q], show_progress_bar=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    vectors = model.encode(sentences=passages, batch_size=64, show_progress_bar=False)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "load_s": round(load_s, 2),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(sorted(latencies)[int(len(latencies) * 0.95)], 2),
+        "passages_per_s": round(len(passages) / batch_s, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "vectors": vectors.tolist(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def cosine_min(a: list[list[float]], b: list[list[float]]) -> float:
+    import numpy as np
+    a, b = np.asarray(a), np.asarray(b)
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+    return float(np.min(np.sum(a * b, axis=1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CtxVault embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx", "onnx-int8"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.queries)))
+        return
+
+    results = {}
+    for backend in args.backends:
+        print(f"  running {backend}...", flush=True)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--queries", str(args.queries)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"    failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr else 'unknown error'}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    reference = results.get("torch")
+    header = f"{'Backend':<12} {'load':>7} {'q p50':>9} {'q p95':>9} {'psg/s':>8} {'RSS':>9} {'min cos':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for backend, r in results.items():
+        similarity = cosine_min(reference["vectors"], r["vectors"]) if reference else float("nan")
+        print(
+            f"{backend:<12} {r['load_s']:>6.2f}s {r['query_p50_ms']:>7.2f}ms {r['query_p95_ms']:>7.2f}ms "
+            f"{r['passages_per_s']:>8.1f} {r['max_rss_mb']:>7.1f}MB {similarity:>8.4f}"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
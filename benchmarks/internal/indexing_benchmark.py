@@ -0,0 +1,82 @@
+"""
+Indexing throughput benchmark — measure how embedding workers scale bulk indexing.
+
+Indexes the same synthetic corpus once per worker count and reports wall time,
+chunks/s and speedup over the single-process run. --extract-workers parses
+files in a separate process pool ahead of the embedder for every run. Every run gets a unique nonce
+in its documents so the persistent embedding cache never serves a hit.
+
+Usage: python benchmarks/internal/indexing_benchmark.py [--workers 1 2 4] [--extract-workers 1] [--copies 20]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import make_vault, write_doc
+
+DATASET_DIR = Path(__file__).parent.parent / "dataset"
+
+
+def load_corpus(copies: int) -> list[tuple[str, str]]:
+    docs = [(f.stem, f.read_text(encoding="utf-8")) for f in sorted(DATASET_DIR.rglob("*.txt"))]
+    return [(f"{name}-{i}", text) for i in range(copies) for name, text in docs]
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def run(corpus: list[tuple[str, str]], workers: int, extract_workers: int = 1) -> dict:
+    from ctxvault.core.indexer import index_files
+    from ctxvault.storage.chroma_store import get_collection
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_vault(tmp_dir)
+        nonce = uuid.uuid4().hex
+        paths = [write_doc(config, doc_id, f"{nonce}\n\n{text}") for doc_id, text in corpus]
+
+        start = time.perf_counter()
+        indexed, failed = index_files(file_paths=paths, config=config, workers=workers, extract_workers=extract_workers)
+        elapsed = time.perf_counter() - start
+
+        chunks = get_collection(config).count()
+
+    return {"workers": workers, "files": len(indexed), "failed": len(failed), "chunks": chunks, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CtxVault indexing throughput per worker count")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--extract-workers", type=int, default=1, help="Processes that extract and chunk files")
+    parser.add_argument("--copies", type=int, default=20, help="How many times the bundled dataset is replicated")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.copies)
+    print(f"  corpus: {len(corpus)} documents")
+
+    results = []
+    for workers in args.workers:
+        print(f"  running workers={workers}...", flush=True)
+        results.append(run(corpus, workers, args.extract_workers))
+
+    baseline = next((r["seconds"] for r in results if r["workers"] == 1), results[0]["seconds"])
+    header = f"{'Workers':>8} {'files':>7} {'chunks':>8} {'time':>9} {'chunks/s':>10} {'speedup':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['workers']:>8} {r['files']:>7} {r['chunks']:>8} {r['seconds']:>8.2f}s "
+            f"{r['chunks'] / r['seconds']:>10.1f} {baseline / r['seconds']:>7.2f}x"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
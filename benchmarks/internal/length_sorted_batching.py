@@ -0,0 +1,74 @@
+"""
+Length-sorted batching benchmark — padding waste and CPU throughput of embed batches.
+
+Chunks the bundled dataset (mixed short headers and long paragraphs) and encodes
+it twice: in arrival order and grouped by token length. Reports chunks/s and
+the fraction of encoder slots spent on padding.
+
+Usage: python benchmarks/internal/length_sorted_batching.py [--backend torch] [--repeat 3]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+DATASET_DIR = Path(__file__).parent.parent / "dataset"
+
+
+def load_chunks() -> list[str]:
+    from ctxvault.utils.chuncking import chunking
+
+    chunks = []
+    for f in sorted(DATASET_DIR.rglob("*.txt")):
+        chunks.extend(chunking(f.read_text(encoding="utf-8"), file_type=".txt"))
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def run(chunks: list[str], backend: str, sort_by_length: bool, repeat: int) -> dict:
+    from ctxvault.core.embedding import _encode
+    from ctxvault.models.indexing import IndexStats
+
+    timings = []
+    for _ in range(repeat):
+        stats = IndexStats()
+        start = time.perf_counter()
+        _encode(chunks, backend=backend, stats=stats, sort_by_length=sort_by_length)
+        timings.append(time.perf_counter() - start)
+
+    seconds = statistics.median(timings)
+    return {"chunks_per_s": len(chunks) / seconds, "seconds": seconds, "padding_ratio": stats.padding_ratio}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare arrival-order vs length-sorted embedding batches")
+    parser.add_argument("--backend", type=str, default="torch")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from ctxvault.core.embedding import get_model
+
+    chunks = load_chunks()
+    get_model(args.backend).encode(sentences=["warmup"], show_progress_bar=False)
+    print(f"  {len(chunks)} chunks, backend {args.backend}")
+
+    results = {
+        "arrival order": run(chunks, args.backend, sort_by_length=False, repeat=args.repeat),
+        "length sorted": run(chunks, args.backend, sort_by_length=True, repeat=args.repeat),
+    }
+
+    header = f"{'Batching':<15} {'time':>9} {'chunks/s':>10} {'padding':>9}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<15} {r['seconds']:>8.2f}s {r['chunks_per_s']:>10.1f} {r['padding_ratio']:>8.1%}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Upsert batching benchmark — Chroma write throughput by upsert batch size.
+
+Writes the same synthetic chunks (random float32 vectors, short texts) into a
+fresh store once per batch size and reports chunks/s. The smallest sizes match
+the old one-upsert-per-file behaviour; the largest is Chroma's own cap.
+
+Usage: python benchmarks/internal/upsert_batching.py [--chunks 20000] [--batch-sizes 8 32 256 1024 4096]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import make_vault
+
+DIM = 384
+
+
+def make_chunks(n: int) -> tuple[list[str], "np.ndarray", list[dict], list[str]]:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    ids = [f"doc{i // 8}::chunk{i % 8}" for i in range(n)]
+    embeddings = rng.random((n, DIM), dtype=np.float32)
+    metadatas = [{"doc_id": f"doc{i // 8}", "chunk_index": i % 8, "source": f"/tmp/doc{i // 8}.txt"} for i in range(n)]
+    documents = [f"Synthetic chunk number {i} " * 20 for i in range(n)]
+    return ids, embeddings, metadatas, documents
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def run(chunks: tuple, batch_size: int) -> dict:
+    from ctxvault.storage import chroma_store
+
+    ids, embeddings, metadatas, documents = chunks
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_vault(tmp_dir)
+        writer = chroma_store.UpsertBuffer(config=config, batch_size=batch_size)
+
+        start = time.perf_counter()
+        for i in range(0, len(ids), 8):
+            writer.add(ids=ids[i:i + 8], embeddings=embeddings[i:i + 8], metadatas=metadatas[i:i + 8], chunks=documents[i:i + 8])
+            if writer.full:
+                writer.flush()
+        writer.flush()
+        elapsed = time.perf_counter() - start
+
+        count = chroma_store.get_collection(config).count()
+        chroma_store._clients.clear()
+        chroma_store._collections.clear()
+
+    return {"batch_size": writer.batch_size, "count": count, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Chroma upsert throughput per batch size")
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[8, 32, 256, 1024, 4096])
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    results = []
+    for batch_size in args.batch_sizes:
+        print(f"  running batch_size={batch_size}...", flush=True)
+        results.append(run(chunks, batch_size))
+
+    baseline = results[0]["seconds"]
+    header = f"{'Batch':>7} {'chunks':>8} {'time':>9} {'chunks/s':>10} {'speedup':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['batch_size']:>7} {r['count']:>8} {r['seconds']:>8.2f}s "
+            f"{r['count'] / r['seconds']:>10.1f} {baseline / r['seconds']:>7.2f}x"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
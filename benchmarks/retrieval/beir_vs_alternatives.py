@@ -91,6 +91,12 @@ def _query_ctxvault(query_txt: str, config: dict, n_results: int = 20) -> dict:
     return query(query_txt=query_txt, config=config, n_results=n_results)
 
 
+def _query_ctxvault_hybrid(query_txt: str, config: dict, n_results: int = 20) -> dict:
+    """Query CtxVault in hybrid mode: vector and BM25 hits fused by reciprocal rank."""
+    from ctxvault.core.querying import query
+    return query(query_txt=query_txt, config=config, n_results=n_results, mode="hybrid")
+
+
 # ---------------------------------------------------------------------------
 # Strategy 2: ChromaDB raw (direct usage, no CtxVault)
 # ---------------------------------------------------------------------------
@@ -323,6 +329,7 @@ def main():
         ("ChromaDB (raw)",       _index_chromadb_raw, _query_chromadb_raw),
         ("LangChain retriever",  _index_langchain,    _query_langchain),
         ("CtxVault (full)",      _index_ctxvault,     _query_ctxvault),
+        ("CtxVault (hybrid)",    _index_ctxvault,     _query_ctxvault_hybrid),
     ]
 
     for ds_name in args.datasets:
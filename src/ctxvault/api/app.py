@@ -1,7 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from ctxvault.api.routes import ctxvault_router
+from ctxvault.core.embedding_scheduler import scheduler
+from ctxvault.core.jobs import jobs
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    yield
+    jobs.shutdown()
+    scheduler.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(ctxvault_router)
 
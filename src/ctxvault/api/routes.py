@@ -1,8 +1,9 @@
 from ctxvault.api.schemas import *
 from ctxvault.core.exceptions import *
-from ctxvault.models.vaults import SkillInput
+from ctxvault.models.skills import SkillInput
 from fastapi import APIRouter, FastAPI, HTTPException, Request
 from ctxvault.core import vault_router
+from ctxvault.core.jobs import jobs
 
 app = FastAPI()
 
@@ -13,31 +14,42 @@ def check_vault_access(vault_name: str, request: Request):
     if not vault_router.is_agent_authorized(vault_name, agent):
         raise VaultAccessDeniedError(f"Agent '{agent}' is not authorized to access vault '{vault_name}'")
 
+def can_access_vault(vault_name: str, request: Request)-> bool:
+    try:
+        check_vault_access(vault_name=vault_name, request=request)
+        return True
+    except (VaultNotFoundError, MissingAgentNameError, VaultAccessDeniedError):
+        return False
+
 @ctxvault_router.put(
     "/index",
     summary="Index documents into a vault",
     description="Chunk, embed, and store documents for semantic search."
 )
-async def index(index_request: IndexRequest)-> IndexResponse:
+def index(index_request: IndexRequest)-> IndexResponse:
     try:
-        indexed_files, skipped_files = vault_router.index_files(vault_name=index_request.vault_name, path=index_request.file_path)
+        stats = IndexStats()
+        with jobs.exclusive(vault_name=index_request.vault_name):
+            indexed_files, skipped_files = vault_router.index_files(vault_name=index_request.vault_name, path=index_request.file_path, workers=index_request.workers, stats=stats, extract_workers=index_request.extract_workers, retry_failed=index_request.retry_failed)
 
-        return IndexResponse(indexed_files=indexed_files, skipped_files=skipped_files)
+        return IndexResponse(indexed_files=indexed_files, skipped_files=skipped_files, stats=stats)
     except VaultNotFoundError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except UnsupportedVaultOperationError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except VaultBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @ctxvault_router.post(
     "/query",
     summary="Perform semantic search",
-    description="Run a vector similarity search against indexed vault documents."
+    description="Run a vector similarity search against indexed vault documents, or a hybrid search fused with keyword (BM25) matches."
 )
-async def query(query_request: QueryRequest, request: Request)-> QueryResponse:
+def query(query_request: QueryRequest, request: Request)-> QueryResponse:
     try:
         check_vault_access(vault_name=query_request.vault_name, request=request)
 
-        result = vault_router.query(vault_name=query_request.vault_name,text=query_request.query, filters=query_request.filters)
+        result = vault_router.query(vault_name=query_request.vault_name,text=query_request.query, filters=query_request.filters, mode=query_request.mode)
 
         if not result.results:
             raise HTTPException(status_code=404, detail="No results found.")
@@ -59,11 +71,12 @@ async def query(query_request: QueryRequest, request: Request)-> QueryResponse:
     summary="Delete document from vault",
     description="Remove a document and its embeddings from a vault."
 )
-async def delete(vault_name: str, file_path: str | None = None, request: Request = None)-> DeleteResponse:
+def delete(vault_name: str, file_path: str | None = None, request: Request = None)-> DeleteResponse:
     try:
         check_vault_access(vault_name=vault_name, request=request)
 
-        deleted_files, skipped_files = vault_router.delete_files(vault_name=vault_name, path=file_path)
+        with jobs.exclusive(vault_name=vault_name):
+            deleted_files, skipped_files = vault_router.delete_files(vault_name=vault_name, path=file_path)
 
         return DeleteResponse(deleted_files=deleted_files, skipped_files=skipped_files)
     except VaultNotFoundError as e:
@@ -74,19 +87,23 @@ async def delete(vault_name: str, file_path: str | None = None, request: Request
         raise HTTPException(status_code=400, detail=str(e))
     except VaultAccessDeniedError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except VaultBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @ctxvault_router.put(
     "/reindex",
     summary="Re-index vault documents",
     description="Rebuild embeddings for existing documents in a vault."
 )
-async def reindex(reindex_request: ReindexRequest, request: Request)-> ReindexResponse:
+def reindex(reindex_request: ReindexRequest, request: Request)-> ReindexResponse:
     try:
         check_vault_access(vault_name=reindex_request.vault_name, request=request)
 
-        reindexed_files, skipped_files = vault_router.index_files(vault_name=reindex_request.vault_name, path=reindex_request.file_path)
+        stats = IndexStats()
+        with jobs.exclusive(vault_name=reindex_request.vault_name):
+            reindexed_files, skipped_files = vault_router.reindex_files(vault_name=reindex_request.vault_name, path=reindex_request.file_path, workers=reindex_request.workers, stats=stats, extract_workers=reindex_request.extract_workers)
 
-        return ReindexResponse(reindexed_files=reindexed_files, skipped_files=skipped_files)
+        return ReindexResponse(reindexed_files=reindexed_files, skipped_files=skipped_files, stats=stats)
     except VaultNotFoundError as e:
         raise HTTPException(status_code=400, detail=f"Vault {reindex_request.vault_name} doesn't exist.")
     except UnsupportedVaultOperationError as e:
@@ -95,6 +112,82 @@ async def reindex(reindex_request: ReindexRequest, request: Request)-> ReindexRe
         raise HTTPException(status_code=400, detail=str(e))
     except VaultAccessDeniedError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except VaultBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@ctxvault_router.post(
+    "/fsck",
+    summary="Check and compact a vault index",
+    description="Remove chunks whose source file is gone or whose index is past the file's current chunk count."
+)
+def fsck(fsck_request: FsckRequest, request: Request)-> FsckResponse:
+    try:
+        check_vault_access(vault_name=fsck_request.vault_name, request=request)
+
+        with jobs.exclusive(vault_name=fsck_request.vault_name):
+            report = vault_router.fsck(vault_name=fsck_request.vault_name, dry_run=fsck_request.dry_run, extract_workers=fsck_request.extract_workers)
+
+        return FsckResponse(report=report)
+    except VaultNotFoundError as e:
+        raise HTTPException(status_code=400, detail=f"Vault {fsck_request.vault_name} doesn't exist.")
+    except UnsupportedVaultOperationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except MissingAgentNameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except VaultAccessDeniedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except VaultBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@ctxvault_router.post(
+    "/jobs",
+    status_code=202,
+    summary="Start a background indexing job",
+    description="Queue an index or reindex of a vault and return its job id immediately."
+)
+def submit_job(job_request: JobRequest, request: Request)-> JobResponse:
+    try:
+        check_vault_access(vault_name=job_request.vault_name, request=request)
+
+        job = jobs.submit(kind=job_request.kind, vault_name=job_request.vault_name, path=job_request.file_path, workers=job_request.workers, extract_workers=job_request.extract_workers, retry_failed=job_request.retry_failed)
+
+        return JobResponse(job=job)
+    except VaultNotFoundError as e:
+        raise HTTPException(status_code=400, detail=f"Vault {job_request.vault_name} doesn't exist.")
+    except UnsupportedVaultOperationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except MissingAgentNameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except VaultAccessDeniedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+@ctxvault_router.get(
+    "/jobs",
+    summary="List indexing jobs",
+    description="Return queued, running and recently finished indexing jobs on the vaults the agent can access."
+)
+async def list_jobs(request: Request)-> ListJobsResponse:
+    return ListJobsResponse(jobs=[job for job in jobs.list_jobs() if can_access_vault(vault_name=job.vault_name, request=request)])
+
+@ctxvault_router.get(
+    "/jobs/{job_id}",
+    summary="Get indexing job status",
+    description="Report a job's status and progress: files done, chunks embedded, errors and ETA."
+)
+async def get_job(job_id: str, request: Request)-> JobResponse:
+    try:
+        job = jobs.get(job_id=job_id)
+        check_vault_access(vault_name=job.vault_name, request=request)
+
+        return JobResponse(job=job)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except VaultNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except MissingAgentNameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except VaultAccessDeniedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
 
 @ctxvault_router.get(
     "/vaults",
@@ -131,15 +224,16 @@ async def docs(vault_name: str, request: Request)-> ListDocsResponse:
     summary="Write and index a document to a semantic vault",
     description="Write a file to a semantic vault and automatically index it for retrieval."
 )
-async def write_doc(write_request: WriteDocRequest, request: Request)-> WriteDocResponse:
+def write_doc(write_request: WriteDocRequest, request: Request)-> WriteDocResponse:
     try:
         check_vault_access(vault_name=write_request.vault_name, request=request)
 
-        vault_router.write_doc(vault_name=write_request.vault_name,
-                         file_path=write_request.file_path, 
-                         content=write_request.content, 
-                         overwrite=write_request.overwrite, 
-                         agent_metadata=write_request.agent_metadata.model_dump() if write_request.agent_metadata else None)
+        with jobs.exclusive(vault_name=write_request.vault_name):
+            vault_router.write_doc(vault_name=write_request.vault_name,
+                             file_path=write_request.file_path, 
+                             content=write_request.content, 
+                             overwrite=write_request.overwrite, 
+                             agent_metadata=write_request.agent_metadata.model_dump() if write_request.agent_metadata else None)
         
         return WriteDocResponse(file_path=write_request.file_path)
     except VaultNotFoundError as e:
@@ -152,7 +246,7 @@ async def write_doc(write_request: WriteDocRequest, request: Request)-> WriteDoc
         raise HTTPException(status_code=403, detail=str(e))
     except (VaultNotInitializedError, FileOutsideVaultError, UnsupportedFileTypeError, FileTypeNotPresentError) as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except FileAlreadyExistError as e:
+    except (FileAlreadyExistError, VaultBusyError) as e:
         raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -162,7 +256,7 @@ async def write_doc(write_request: WriteDocRequest, request: Request)-> WriteDoc
     summary="Write a new skill to a skill vault",
     description="Write a skill file to a skill vault making it available for usage."
 )
-async def write_skill(write_request: WriteSkillRequest, request: Request)-> WriteSkillResponse:
+def write_skill(write_request: WriteSkillRequest, request: Request)-> WriteSkillResponse:
     try:
         check_vault_access(vault_name=write_request.vault_name, request=request)
         
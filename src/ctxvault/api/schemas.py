@@ -1,7 +1,10 @@
 from ctxvault.models.documents import SemanticDocumentInfo, SkillDocumentInfo
+from ctxvault.models.indexing import FsckReport, IndexStats
+from ctxvault.models.jobs import JobInfo, JobKind
 from ctxvault.models.query_result import ChunkMatch
-from ctxvault.models.vaults import SkillOutput, VaultType
-from pydantic import BaseModel
+from ctxvault.models.skills import SkillOutput
+from ctxvault.models.vaults import QueryMode, VaultType
+from pydantic import BaseModel, Field
 
 class VaultInfo(BaseModel):
     name: str
@@ -23,15 +26,20 @@ class InitResponse(BaseModel):
 class IndexRequest(BaseModel):
     vault_name: str
     file_path: str | None = None
+    workers: int = Field(default=1, ge=1)
+    extract_workers: int = Field(default=1, ge=1)
+    retry_failed: bool = False
 
 class IndexResponse(BaseModel):
     indexed_files: list[str]
     skipped_files: list[str]
+    stats: IndexStats | None = None
 
 class QueryRequest(BaseModel):
     vault_name: str
     query: str
     filters: dict | None = None
+    mode: QueryMode = QueryMode.VECTOR
 
 class QueryResponse(BaseModel):
     results: list[ChunkMatch]
@@ -43,10 +51,35 @@ class DeleteResponse(BaseModel):
 class ReindexRequest(BaseModel):
     vault_name: str
     file_path: str | None = None
+    workers: int = Field(default=1, ge=1)
+    extract_workers: int = Field(default=1, ge=1)
 
 class ReindexResponse(BaseModel):
     reindexed_files: list[str]
     skipped_files: list[str]
+    stats: IndexStats | None = None
+
+class JobRequest(BaseModel):
+    kind: JobKind
+    vault_name: str
+    file_path: str | None = None
+    workers: int = Field(default=1, ge=1)
+    extract_workers: int = Field(default=1, ge=1)
+    retry_failed: bool = False
+
+class JobResponse(BaseModel):
+    job: JobInfo
+
+class ListJobsResponse(BaseModel):
+    jobs: list[JobInfo]
+
+class FsckRequest(BaseModel):
+    vault_name: str
+    dry_run: bool = False
+    extract_workers: int = Field(default=1, ge=1)
+
+class FsckResponse(BaseModel):
+    report: FsckReport
 
 class ListVaultsResponse(BaseModel):
     vaults: list[VaultInfo]
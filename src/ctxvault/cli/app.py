@@ -1,11 +1,31 @@
+from __future__ import annotations
+
+import sys
 from pathlib import Path
-from ctxvault.models.documents import SemanticDocumentInfo, SkillDocumentInfo
-from ctxvault.models.vaults import VaultType
+from typing import TYPE_CHECKING
+from ctxvault.models.vaults import ChunkingMode, ChunkStorage, QueryMode, VaultType
 import typer
 from ctxvault.core import vault_router
 from ctxvault.core.exceptions import PathOutsideVaultError, VaultAlreadyExistsError, VaultNotFoundError, VaultTypeNotValidError
 
+if TYPE_CHECKING:
+    from ctxvault.models.indexing import IndexStats
+
 app = typer.Typer()
+daemon_app = typer.Typer(help="Manage the resident daemon that keeps the embedding model loaded.")
+app.add_typer(daemon_app, name="daemon")
+
+def _print_stats(stats: IndexStats):
+    if stats.new_files or stats.changed_files or stats.unchanged_files or stats.removed_files:
+        typer.echo(f"New: {stats.new_files} | Changed: {stats.changed_files} | Unchanged: {stats.unchanged_files} | Removed: {stats.removed_files}")
+    if not stats.chunks:
+        return
+    typer.echo(f"Chunks: {stats.chunks} ({stats.cached_chunks} cached, {stats.reused_chunks} reused) | Batches: {stats.batches} | Padding: {stats.padding_ratio:.1%}")
+
+def _print_progress(stats: IndexStats):
+    if not sys.stderr.isatty():
+        return
+    typer.echo(f"\rProcessed {stats.files_done}/{stats.files_total} files", err=True, nl=stats.files_done == stats.files_total)
 
 def _print_vault(v: dict):
     name = v['name']
@@ -34,10 +54,10 @@ def _print_vault(v: dict):
     typer.echo("")
 
 @app.command()
-def init(name: str = typer.Argument("my-vault"), type: str = typer.Option(VaultType.SEMANTIC.value, "--type"), restricted: bool = typer.Option(False, "--restricted"), path: str = typer.Option(None, "--path"), global_vault: bool = typer.Option(False, "--global")):
+def init(name: str = typer.Argument("my-vault"), type: str = typer.Option(VaultType.SEMANTIC.value, "--type"), restricted: bool = typer.Option(False, "--restricted"), path: str = typer.Option(None, "--path"), global_vault: bool = typer.Option(False, "--global"), backend: str = typer.Option(None, "--backend"), chunking: str = typer.Option(ChunkingMode.TOKENS.value, "--chunking"), chunk_storage: str = typer.Option(ChunkStorage.TEXT.value, "--chunk-storage")):
     try:
         typer.echo(f"Initializing Context Vault {name}...")
-        vault_path, config_path = vault_router.init_vault(vault_name=name, vault_type=type, restricted=restricted, path=path, global_vault=global_vault)
+        vault_path, config_path = vault_router.init_vault(vault_name=name, vault_type=type, restricted=restricted, path=path, global_vault=global_vault, embedding_backend=backend, chunking=chunking, chunk_storage=chunk_storage)
         typer.secho("Context Vault initialized succesfully!", fg=typer.colors.GREEN, bold=True)
         typer.echo(f"Context Vault path: {vault_path}")
         typer.echo(f"Config file path: {config_path}")
@@ -46,9 +66,12 @@ def init(name: str = typer.Argument("my-vault"), type: str = typer.Option(VaultT
         raise typer.Exit(1)
 
 @app.command()
-def index(name: str = typer.Argument("my-vault"), path: str = typer.Option(None, "--path")):
+def index(name: str = typer.Argument("my-vault"), path: str = typer.Option(None, "--path"), workers: int = typer.Option(1, "--workers", min=1), extract_workers: int = typer.Option(1, "--extract-workers", min=1), retry_failed: bool = typer.Option(False, "--retry-failed")):
+    from ctxvault.models.indexing import IndexStats
+
     try:
-        indexed_files, skipped_files = vault_router.index_files(vault_name=name, path=path)
+        stats = IndexStats()
+        indexed_files, skipped_files = vault_router.index_files(vault_name=name, path=path, workers=workers, stats=stats, extract_workers=extract_workers, progress=_print_progress, retry_failed=retry_failed)
 
         for file in indexed_files:
             typer.secho(f"Indexed: {file}", fg=typer.colors.GREEN)
@@ -58,14 +81,15 @@ def index(name: str = typer.Argument("my-vault"), path: str = typer.Option(None,
 
         typer.secho(f"\nIndexed: {len(indexed_files)}", fg=typer.colors.GREEN, bold=True)
         typer.secho(f"Skipped: {len(skipped_files)}", fg=typer.colors.YELLOW, bold=True)
+        _print_stats(stats)
     except Exception as e:
         typer.secho(f"Error during indexing: {e}", fg=typer.colors.RED, bold=True)
         raise typer.Exit(1)
     
 @app.command()
-def query(name: str = typer.Argument("my-vault"), text: str = typer.Argument("")):
+def query(name: str = typer.Argument("my-vault"), text: str = typer.Argument(""), mode: str = typer.Option(QueryMode.VECTOR.value, "--mode")):
     try:
-        result = vault_router.query(text=text, vault_name=name)
+        result = vault_router.query(text=text, vault_name=name, mode=mode)
         if not result.results:
             typer.secho("No results found.", fg=typer.colors.YELLOW)
             return
@@ -75,9 +99,12 @@ def query(name: str = typer.Argument("my-vault"), text: str = typer.Argument("")
         
         for idx, chunk in enumerate(result.results, 1):
             typer.secho(f"\n[{idx}] ", fg=typer.colors.CYAN, bold=True, nl=False)
-            typer.secho(f"score: {chunk.score:.3f}", fg=typer.colors.MAGENTA)
+            scores = [f"score: {chunk.score:.3f}"] if chunk.score is not None else []
+            if chunk.fused_score is not None:
+                scores.append(f"fused score: {chunk.fused_score:.4f}")
+            typer.secho(", ".join(scores), fg=typer.colors.MAGENTA)
             typer.secho(f"    ▸ {chunk.source} ", fg=typer.colors.BLUE, nl=False)
-            typer.echo(f"(chunk {chunk.chunk_index})")
+            typer.echo(f"(page {chunk.page}, chunk {chunk.chunk_index})" if chunk.page is not None else f"(chunk {chunk.chunk_index})")
 
             preview = chunk.text.strip().replace("\n", " ")
             if len(preview) > 200:
@@ -115,9 +142,12 @@ def delete(name: str = typer.Argument("my-vault"), path: str = typer.Option(None
         raise typer.Exit(1)
 
 @app.command()
-def reindex(name: str = typer.Argument("my-vault"), path: str = typer.Option(None, "--path")):
+def reindex(name: str = typer.Argument("my-vault"), path: str = typer.Option(None, "--path"), workers: int = typer.Option(1, "--workers", min=1), extract_workers: int = typer.Option(1, "--extract-workers", min=1)):
+    from ctxvault.models.indexing import IndexStats
+
     try:
-        reindexed_files, skipped_files = vault_router.reindex_files(vault_name=name, path=path)
+        stats = IndexStats()
+        reindexed_files, skipped_files = vault_router.reindex_files(vault_name=name, path=path, workers=workers, stats=stats, extract_workers=extract_workers, progress=_print_progress)
 
         for file in reindexed_files:
             typer.secho(f"Reindexed: {file}", fg=typer.colors.GREEN)
@@ -127,10 +157,36 @@ def reindex(name: str = typer.Argument("my-vault"), path: str = typer.Option(Non
 
         typer.secho(f"Reindexed: {len(reindexed_files)}", fg=typer.colors.GREEN, bold=True)
         typer.secho(f"Skipped: {len(skipped_files)}", fg=typer.colors.YELLOW, bold=True)
+        _print_stats(stats)
     except Exception as e:
         typer.secho(f"Error during reindexing: {e}", fg=typer.colors.RED, bold=True)
         raise typer.Exit(1)
 
+@app.command()
+def fsck(name: str = typer.Argument("my-vault"), dry_run: bool = typer.Option(False, "--dry-run"), extract_workers: int = typer.Option(1, "--extract-workers", min=1)):
+    try:
+        report = vault_router.fsck(vault_name=name, dry_run=dry_run, extract_workers=extract_workers)
+
+        for source in report.missing_sources:
+            typer.secho(f"Missing: {source}", fg=typer.colors.YELLOW)
+
+        for source in report.unreadable_sources:
+            typer.secho(f"Unreadable: {source}", fg=typer.colors.YELLOW)
+
+        typer.secho(f"\nChunks: {report.chunks} | Orphaned: {report.orphan_chunks} | Stale: {report.stale_chunks}", bold=True)
+        if report.unused_texts:
+            typer.echo(f"Unused cached texts: {report.unused_texts}")
+        if dry_run:
+            return
+        typer.secho(f"Removed: {report.removed_chunks}", fg=typer.colors.GREEN, bold=True)
+        if report.removed_chunks:
+            typer.echo(f"Size: {report.bytes_before / 1e6:.1f} MB -> {report.bytes_after / 1e6:.1f} MB")
+        if report.query_ms_before is not None:
+            typer.echo(f"Probe query: {report.query_ms_before:.1f} ms -> {report.query_ms_after:.1f} ms")
+    except Exception as e:
+        typer.secho(f"Error during fsck: {e}", fg=typer.colors.RED, bold=True)
+        raise typer.Exit(1)
+
 @app.command()
 def vaults():
     vaults_list = vault_router.list_vaults()
@@ -254,6 +310,66 @@ def skill(vault_name: str = typer.Argument(...), skill_name: str = typer.Argumen
         typer.secho(f"Error reading skill: {e}", fg=typer.colors.RED, bold=True)
         raise typer.Exit(1)
 
+@daemon_app.command("start")
+def daemon_start(backend: str = typer.Option(None, "--backend"), foreground: bool = typer.Option(False, "--foreground"), timeout: int = typer.Option(180, "--timeout")):
+    import subprocess
+    import sys
+    import time
+    from ctxvault.daemon import client as daemon_client
+    from ctxvault.utils.config import GLOBAL_DIR
+
+    if daemon_client.ping() is not None:
+        typer.secho(f"Daemon already running at {daemon_client.socket_path()}", fg=typer.colors.YELLOW)
+        return
+
+    if foreground:
+        from ctxvault.daemon.server import serve
+        serve(backend=backend)
+        return
+
+    GLOBAL_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = GLOBAL_DIR / "daemon.log"
+    command = [sys.executable, "-m", "ctxvault.daemon.server"] + (["--backend", backend] if backend else [])
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = daemon_client.ping()
+        if status is not None:
+            typer.secho(f"Daemon started (pid {status['pid']}) at {daemon_client.socket_path()}", fg=typer.colors.GREEN, bold=True)
+            return
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+
+    typer.secho(f"Daemon failed to start. See {log_path}", fg=typer.colors.RED, bold=True)
+    raise typer.Exit(1)
+
+@daemon_app.command("stop")
+def daemon_stop():
+    from ctxvault.daemon import client as daemon_client
+
+    if daemon_client.ping() is None:
+        typer.secho("Daemon is not running.", fg=typer.colors.YELLOW)
+        return
+    daemon_client.shutdown()
+    typer.secho("Daemon stopped.", fg=typer.colors.GREEN, bold=True)
+
+@daemon_app.command("status")
+def daemon_status():
+    from ctxvault.daemon import client as daemon_client
+
+    status = daemon_client.ping()
+    if status is None:
+        typer.secho("Daemon is not running.", fg=typer.colors.YELLOW)
+        return
+    typer.secho(f"Daemon running (pid {status['pid']}, up {status['uptime']:.0f}s)", fg=typer.colors.GREEN, bold=True)
+    typer.echo(f"Socket: {daemon_client.socket_path()}")
+    typer.echo(f"Loaded backends: {', '.join(status['backends']) or 'none'}")
+    cache = status["query_cache"]
+    typer.echo(f"Query cache: {cache['size']}/{cache['max_size']} entries, {cache['hits']} hits, {cache['misses']} misses")
+
 
 def main():
     app()
@@ -1,40 +1,195 @@
 import logging
-import transformers
-from sentence_transformers import SentenceTransformer
-
-MODEL: SentenceTransformer = None
-
-def get_model():
-    global MODEL
-    if MODEL is None:
-        loggers = [
-            "sentence_transformers",
-            "transformers",
-            "transformers.modeling_utils",
-            "transformers.utils.logging",
-            "huggingface_hub",
-            "huggingface_hub.file_download",
-            "huggingface_hub._commit_api",
-        ]
-        original_levels = {}
-        for name in loggers:
-            logger = logging.getLogger(name)
-            original_levels[name] = logger.level
-            logger.setLevel(logging.ERROR)
-
-        original_verbosity = transformers.logging.get_verbosity()
-        transformers.logging.set_verbosity_error()
-        transformers.logging.disable_progress_bar()
+import os
+import threading
+import numpy as np
+from ctxvault.core.exceptions import EmbeddingBackendError
+from ctxvault.models.indexing import IndexStats
 
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = 64
+
+# torch:      full-precision PyTorch model (reference backend)
+# torch-int8: PyTorch model with dynamically quantized int8 Linear layers
+# onnx:       ONNX Runtime export of the same model (requires the "onnx" extra)
+# onnx-int8:  ONNX Runtime int8-quantized export (requires the "onnx" extra)
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.environ.get("CTXVAULT_EMBEDDING_BACKEND", "torch")
+BACKEND_TOLERANCE = 0.02
+
+_ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+
+_models: dict = {}
+_tokenizers: dict = {}
+_models_lock = threading.Lock()
+
+def resolve_backend(backend: str | None = None)-> str:
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise EmbeddingBackendError(f"Embedding backend not valid: {backend}. Choose between: {', '.join(BACKENDS)}")
+    return backend
+
+def _load_model(backend: str):
+    from sentence_transformers import SentenceTransformer
+
+    if backend in _ONNX_FILES:
         try:
-            MODEL = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-        finally:
-            transformers.logging.set_verbosity(original_verbosity)
-            transformers.logging.enable_progress_bar()
-            for name, level in original_levels.items():
-                logging.getLogger(name).setLevel(level)
+            return SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs={"file_name": _ONNX_FILES[backend]})
+        except ImportError as e:
+            raise EmbeddingBackendError(f"Backend '{backend}' requires ONNX Runtime. Install it with: pip install 'ctxvault[onnx]' ({e})")
+
+    model = SentenceTransformer(MODEL_NAME, device="cpu" if backend == "torch-int8" else None)
+    if backend == "torch-int8":
+        import torch
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+def get_model(backend: str | None = None):
+    import transformers
+
+    backend = resolve_backend(backend)
+    with _models_lock:
+        if backend not in _models:
+            loggers = [
+                "sentence_transformers",
+                "transformers",
+                "transformers.modeling_utils",
+                "transformers.utils.logging",
+                "huggingface_hub",
+                "huggingface_hub.file_download",
+                "huggingface_hub._commit_api",
+            ]
+            original_levels = {}
+            for name in loggers:
+                logger = logging.getLogger(name)
+                original_levels[name] = logger.level
+                logger.setLevel(logging.ERROR)
+
+            original_verbosity = transformers.logging.get_verbosity()
+            transformers.logging.set_verbosity_error()
+            transformers.logging.disable_progress_bar()
+
+            try:
+                _models[backend] = _load_model(backend)
+            finally:
+                transformers.logging.set_verbosity(original_verbosity)
+                transformers.logging.enable_progress_bar()
+                for name, level in original_levels.items():
+                    logging.getLogger(name).setLevel(level)
+
+    return _models[backend]
+
+def get_tokenizer():
+    """Return the model's fast tokenizer, loaded without the model weights.
+
+    Its model_max_length is set to the model's max_seq_length (longer inputs
+    are truncated by the encoder), so chunkers can size chunks to the window
+    that is actually embedded.
+    """
+    import json
+    from huggingface_hub import hf_hub_download
+    from transformers import AutoTokenizer
+
+    with _models_lock:
+        if MODEL_NAME not in _tokenizers:
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            with open(hf_hub_download(MODEL_NAME, "sentence_bert_config.json")) as f:
+                tokenizer.model_max_length = json.load(f)["max_seq_length"]
+            _tokenizers[MODEL_NAME] = tokenizer
+    return _tokenizers[MODEL_NAME]
+
+def _model_key(backend: str)-> str:
+    return MODEL_NAME if backend == "torch" else f"{MODEL_NAME}:{backend}"
+
+def _token_lengths(model, chunks: list[str])-> np.ndarray:
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return np.array([len(chunk.split()) for chunk in chunks], dtype=np.int64)
+    input_ids = tokenizer(chunks, truncation=True, max_length=model.max_seq_length)["input_ids"]
+    return np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(chunks))
+
+def _encode(chunks: list[str], backend: str, stats: IndexStats | None = None, sort_by_length: bool = True) -> np.ndarray:
+    """Encode chunks in batches of similar token length.
+
+    Every batch is padded to its longest member, so grouping chunks of similar
+    length keeps padding low on mixed corpora. Vectors are written back in the
+    original input order.
+    """
+    model = get_model(backend)
+    lengths = _token_lengths(model, chunks)
+    order = np.argsort(-lengths, kind="stable") if sort_by_length else np.arange(len(chunks))
+
+    vectors = None
+    for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+        idx = order[start:start + EMBED_BATCH_SIZE]
+        batch = model.encode(sentences=[chunks[i] for i in idx], batch_size=len(idx), show_progress_bar=False, convert_to_numpy=True)
+        if vectors is None:
+            vectors = np.empty((len(chunks), batch.shape[1]), dtype=np.float32)
+        vectors[idx] = batch
+        if stats is not None:
+            stats.record_batch(lengths[idx])
+    return vectors
+
+def embed_list(chunks: list[str], backend: str | None = None, stats: IndexStats | None = None) -> np.ndarray:
+    """Embed chunks, serving unchanged texts from the persistent embedding cache.
+
+    Only texts missing from the cache are sent to the model; their vectors are
+    written back so later index runs and overwrites can reuse them.
+
+    Returns a contiguous float32 array of shape (len(chunks), dim).
+    """
+    from ctxvault.storage.embedding_cache import cache_key, get_cache
+
+    backend = resolve_backend(backend)
+    cache = get_cache()
+    keys = [cache_key(_model_key(backend), chunk) for chunk in chunks]
+    vectors = cache.get_many(keys)
+
+    missing = {key: chunk for key, chunk in zip(keys, chunks) if key not in vectors}
+    if stats is not None:
+        stats.chunks += len(chunks)
+        stats.cached_chunks += len(chunks) - len(missing)
+    if missing:
+        computed = dict(zip(missing, _encode(list(missing.values()), backend=backend, stats=stats)))
+        cache.put_many(computed)
+        vectors.update(computed)
+
+    if not keys:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([vectors[key] for key in keys])
+
+def embed_queries(texts: list[str], backend: str | None = None)-> np.ndarray:
+    """Embed query texts with the model directly, bypassing the persistent cache.
+
+    Queries are mostly one-off strings: caching them on disk would cost a
+    write per query and evict chunk vectors. Repeats are served by the
+    in-process query cache instead (see querying.QueryEmbeddingCache).
+    """
+    return _encode(texts, backend=resolve_backend(backend))
+
+def validate_backend(backend: str, samples: list[str] | None = None, tolerance: float = BACKEND_TOLERANCE)-> float:
+    """Check that a backend reproduces the torch reference vectors.
+
+    Encodes the samples with both backends and returns the lowest cosine
+    similarity between matching vectors. Raises EmbeddingBackendError when it
+    falls below 1 - tolerance.
+    """
+    backend = resolve_backend(backend)
+    samples = samples or [
+        "Local memory infrastructure for AI agents.",
+        "How do I rotate the API keys for the staging cluster?",
+        "Error E1042: connection refused while syncing the vault index.",
+    ]
+
+    reference = np.asarray(get_model("torch").encode(sentences=samples, show_progress_bar=False), dtype=np.float32)
+    candidate = np.asarray(get_model(backend).encode(sentences=samples, show_progress_bar=False), dtype=np.float32)
 
-    return MODEL
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate /= np.linalg.norm(candidate, axis=1, keepdims=True)
+    similarity = float(np.min(np.sum(reference * candidate, axis=1)))
 
-def embed_list(chunks: list[str]) -> list[list[float]]:
-    return get_model().encode(sentences=chunks, show_progress_bar=False).tolist()
\ No newline at end of file
+    if similarity < 1 - tolerance:
+        raise EmbeddingBackendError(f"Backend '{backend}' deviates from the torch reference (min cosine similarity {similarity:.4f}, tolerance {tolerance}).")
+    return similarity
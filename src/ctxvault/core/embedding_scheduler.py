@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+MAX_BATCH_SIZE = 32
+MAX_WAIT_MS = 2.0
+
+_STOP = object()
+
+class EmbeddingScheduler:
+    """Coalesces concurrent embedding requests into batched model calls.
+
+    Callers submit single texts from any thread; a background thread drains
+    the queue, waiting at most max_wait_ms for up to max_batch_size requests,
+    and runs them through embed_queries as one batch per backend before fanning
+    the vectors back out to the callers.
+    """
+
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.requests = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self)-> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self)-> None:
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="ctxvault-embedding-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0)-> None:
+        with self._lock:
+            if not self.running:
+                return
+            self._queue.put(_STOP)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, text: str, backend: str | None = None)-> Future:
+        future: Future = Future()
+        self._queue.put((text, backend, future))
+        return future
+
+    def embed(self, text: str, backend: str | None = None, timeout: float | None = None)-> np.ndarray:
+        return self.submit(text=text, backend=backend).result(timeout=timeout)
+
+    def _collect(self, first)-> tuple[list, bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _dispatch(self, batch: list)-> None:
+        from ctxvault.core import embedding
+
+        by_backend: dict[str | None, list] = {}
+        for item in batch:
+            by_backend.setdefault(item[1], []).append(item)
+
+        for backend, items in by_backend.items():
+            pending = [(text, future) for text, _, future in items if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            try:
+                vectors = embedding.embed_queries(texts=[text for text, _ in pending], backend=backend)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+            else:
+                for (_, future), vector in zip(pending, vectors):
+                    future.set_result(vector)
+
+        self.batches += 1
+        self.requests += len(batch)
+
+    def _drain(self)-> list:
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return remaining
+            if item is not _STOP:
+                remaining.append(item)
+
+    def _run(self)-> None:
+        while True:
+            first = self._queue.get()
+            stop = first is _STOP
+            if not stop:
+                batch, stop = self._collect(first)
+                self._dispatch(batch)
+            if stop:
+                leftover = self._drain()
+                if leftover:
+                    self._dispatch(leftover)
+                return
+
+scheduler = EmbeddingScheduler()
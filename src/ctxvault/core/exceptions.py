@@ -14,6 +14,18 @@ class VaultTypeNotValidError(Exception):
     """Raised when trying to initialize a vault with a not valid type"""
     pass
 
+class ChunkingModeNotValidError(Exception):
+    """Raised when trying to initialize a vault with a not valid chunking mode"""
+    pass
+
+class ChunkStorageNotValidError(Exception):
+    """Raised when trying to initialize a vault with a not valid chunk storage mode"""
+    pass
+
+class QueryModeNotValidError(Exception):
+    """Raised when querying a vault with a not valid query mode"""
+    pass
+
 class VaultAlreadyExistsError(Exception):
     """Raised when a Context Vault is already initialized at that path."""
     def __init__(self, existing_path: str):
@@ -58,4 +70,20 @@ class SkillNotFoundError(Exception):
 
 class MissingAgentNameError(Exception):
     """Raised when agents try to access a restricted vault without providing an agent name."""
-    pass
\ No newline at end of file
+    pass
+
+class EmbeddingBackendError(Exception):
+    """Raised when an embedding backend is not valid, not installed or not consistent with the reference model."""
+    pass
+
+class DaemonError(Exception):
+    """Raised when the local daemon is unreachable or fails to serve a request."""
+    pass
+
+class JobNotFoundError(Exception):
+    """Raised when asking for an indexing job that does not exist or was already evicted."""
+    pass
+
+class VaultBusyError(Exception):
+    """Raised when writing to a vault while a background job for it is queued or running."""
+    pass
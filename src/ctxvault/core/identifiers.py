@@ -4,4 +4,14 @@ def get_doc_id(path: str)-> str:
     return hashlib.sha256(path.encode()).hexdigest()
 
 def get_chunk_id(chunk_id: int):
-    return hashlib.sha256(chunk_id.to_bytes(8, 'big')).hexdigest()
\ No newline at end of file
+    return hashlib.sha256(chunk_id.to_bytes(8, 'big')).hexdigest()
+
+def get_chunk_hash(text: str)-> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def get_content_hash(path: str)-> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,29 +1,295 @@
-def index_file(file_path: str, config: dict, agent_metadata: dict | None = None)-> dict:
-    from ctxvault.utils.text_extraction import extract_text
-    from ctxvault.core.identifiers import get_doc_id
-    from ctxvault.utils.chuncking import chunking
-    from ctxvault.core.embedding import embed_list
-    from ctxvault.storage.chroma_store import add_document
+from collections import deque
+import numpy as np
+from ctxvault.core.pipeline import FileCallback, ProgressCallback
+from ctxvault.models.indexing import IndexStats
+from ctxvault.models.vaults import ChunkingMode, ChunkStorage
+
+# Chunks handed to each embed_list call, in units of encoder batches. A wider
+# window lets embed_list group chunks of similar length across files.
+LENGTH_SORT_WINDOW = 8
+
+class _PendingDocument:
+    def __init__(self, file_path: str, file_type: str, chunks: list[str], pages: list[int | None] | None = None, locations: list[dict] | None = None):
+        from ctxvault.core.identifiers import get_chunk_hash, get_doc_id
+
+        self.file_path = file_path
+        self.file_type = file_type
+        self.doc_id = get_doc_id(path=file_path)
+        self.chunks = chunks
+        self.pages = pages
+        self.locations = locations
+        self.chunk_hashes = [get_chunk_hash(chunk) for chunk in chunks]
+        self.embeddings: np.ndarray | None = None
+        self.missing = len(chunks)
+        self.error: Exception | None = None
+        # Chunks already stored for this document as {chunk_id: metadata}, when diffing.
+        self.stored: dict[str, dict] | None = None
+
+    def set_vector(self, i: int, vector: np.ndarray)-> None:
+        if self.embeddings is None:
+            self.embeddings = np.empty((len(self.chunks), len(vector)), dtype=np.float32)
+        self.embeddings[i] = vector
+        self.missing -= 1
+
+    def load_stored(self, config: dict)-> dict[str, np.ndarray]:
+        """Record the chunks already stored for this document and return their vectors by chunk hash."""
+        from ctxvault.storage.chroma_store import get_document_chunks
+
+        result = get_document_chunks(doc_id=self.doc_id, config=config)
+        embeddings = result.get("embeddings")
+        self.stored = {}
+        vectors = {}
+        for i, (chunk_id, metadata) in enumerate(zip(result.get("ids") or [], result.get("metadatas") or [])):
+            self.stored[chunk_id] = metadata
+            if embeddings is not None and metadata.get("chunk_hash"):
+                vectors[metadata["chunk_hash"]] = np.asarray(embeddings[i], dtype=np.float32)
+        return vectors
+
+def _store_document(doc: _PendingDocument, config: dict, writer, lexical: list[tuple[str, list[str], list[str]]], agent_metadata: dict | None = None)-> None:
+    from ctxvault.storage.chroma_store import delete_chunks
     from ctxvault.utils.metadata_builder import build_chunks_metadatas
 
-    text, file_type = extract_text(path=file_path)
-    doc_id = get_doc_id(path=file_path)
+    # Vaults storing offsets keep each chunk's location in the text cache instead of its text.
+    offsets = config.get("chunk_storage") == ChunkStorage.OFFSETS.value and doc.locations is not None
+    chunk_ids, metadatas = build_chunks_metadatas(doc_id=doc.doc_id, chunks_size=len(doc.chunks), source=doc.file_path, filetype=doc.file_type, agent_metadata=agent_metadata, chunk_hashes=doc.chunk_hashes, pages=doc.pages, locations=doc.locations if offsets else None)
+
+    if doc.stored is not None:
+        current = set(chunk_ids)
+        delete_chunks(ids=[chunk_id for chunk_id in doc.stored if chunk_id not in current], config=config)
+        changed = [i for i, (chunk_id, metadata) in enumerate(zip(chunk_ids, metadatas)) if doc.stored.get(chunk_id) != metadata]
+    else:
+        changed = list(range(len(chunk_ids)))
+    lexical.append((doc.doc_id, chunk_ids, doc.chunks))
+
+    if not changed:
+        return
+
+    writer.add(
+        ids=[chunk_ids[i] for i in changed],
+        embeddings=doc.embeddings[changed],
+        metadatas=[metadatas[i] for i in changed],
+        chunks=None if offsets else [doc.chunks[i] for i in changed]
+    )
+
+def _init_worker(threads: int)-> None:
+    import torch
+    torch.set_num_threads(threads)
+
+def _embed_in_worker(chunks: list[str], backend: str | None)-> tuple[np.ndarray, IndexStats]:
+    from ctxvault.core import embedding
+    stats = IndexStats()
+    return embedding.embed_list(chunks=chunks, backend=backend, stats=stats), stats
+
+def _embed_local_or_daemon(chunks: list[str], backend: str | None, stats: IndexStats)-> np.ndarray:
+    from ctxvault.core import embedding
+    from ctxvault.core.exceptions import DaemonError
+    from ctxvault.daemon import client as daemon_client
+
+    if daemon_client.available():
+        try:
+            vectors, daemon_stats = daemon_client.embed(texts=chunks, backend=backend)
+            stats.merge(IndexStats(**daemon_stats))
+            return vectors
+        except DaemonError:
+            pass
+    return embedding.embed_list(chunks=chunks, backend=backend, stats=stats)
+
+def _create_pool(workers: int):
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,)
+    )
+
+def index_files(file_paths: list[str], config: dict, agent_metadata: dict | None = None, batch_size: int | None = None, workers: int = 1, stats: IndexStats | None = None, diff_chunks: bool = False, extract_workers: int = 1, progress: ProgressCallback | None = None, on_file: FileCallback | None = None, diff_paths: set[str] | None = None)-> tuple[list[str], list[tuple[str, Exception]]]:
+    """Index many files as a pipeline: extract and chunk, embed, store.
+
+    Extraction runs ahead of embedding in a pool of extract_workers processes
+    when extract_workers > 1 (see pipeline.iter_extracted); each stage holds
+    a bounded number of items, so a slow stage stalls the ones before it.
+    Extracted text is cached in the vault's db folder by file content, so
+    unchanged files are chunked again without being parsed.
 
-    chunks = chunking(text, file_type=file_type)
+    Chunks from consecutive files are packed into batches of batch_size so the
+    encoder always runs at a useful batch size, regardless of how many chunks a
+    single file produces. Vectors are assigned back to their documents and each
+    document is queued for writing as soon as all of its chunks are embedded.
+    Writes are buffered across documents and flushed in large upserts; a file
+    counts as indexed once the flush holding its chunks succeeds.
 
-    embeddings = embed_list(chunks=chunks)
+    Embedding counters (chunks, cache hits, padding) are accumulated into stats
+    when one is given, and progress is called with it after each file is
+    stored or fails. on_file gets the file path and its error, if any, at the
+    same point, once the file's chunks are durably written.
 
-    chunk_ids, metadatas = build_chunks_metadatas(doc_id=doc_id, chunks_size=len(chunks), source=file_path, filetype=file_type, agent_metadata=agent_metadata)
+    With workers > 1 the batches are embedded by a pool of worker processes,
+    each holding its own model, while this process stays the single writer to
+    the vector store. Otherwise they go to the local daemon when one is running.
 
-    add_document(ids=chunk_ids, embeddings=embeddings, metadatas=metadatas, chunks=chunks, config=config)
+    With diff_chunks the chunks already stored for each file are compared by
+    content hash: matching chunks reuse their stored vector, only chunks whose
+    text or metadata changed are written, and chunks past the new end of the
+    document are deleted. diff_paths limits this to the given files, so new
+    and modified files share one run without looking up stored chunks for
+    files that have none.
+
+    Every stored document also replaces its chunks in the vault's BM25 index,
+    written in one transaction after each successful flush.
+
+    Returns the indexed file paths and a list of (file_path, error) for failures.
+    """
+    from ctxvault.core.embedding import EMBED_BATCH_SIZE
+    from ctxvault.core.pipeline import iter_extracted
+    from ctxvault.storage.bm25_store import get_bm25_index
+    from ctxvault.storage.chroma_store import UpsertBuffer
+
+    batch_size = batch_size or EMBED_BATCH_SIZE * LENGTH_SORT_WINDOW
+    stats = stats if stats is not None else IndexStats()
+    stats.files_total += len(file_paths)
+    backend = config.get("embedding_backend")
+    pool = _create_pool(workers) if workers > 1 else None
+    extracted = iter_extracted(file_paths=file_paths, workers=extract_workers, cache_dir=config.get("db_path"), chunking=config.get("chunking", ChunkingMode.WORDS.value), chunk_storage=config.get("chunk_storage", ChunkStorage.TEXT.value))
+    writer = UpsertBuffer(config=config)
+    keyword_index = get_bm25_index(config["db_path"])
+    lexical: list[tuple[str, list[str], list[str]]] = []
+    unflushed: list[str] = []
+
+    indexed: list[str] = []
+    failed: list[tuple[str, Exception]] = []
+
+    def finish(file_path: str, error: Exception | None)-> None:
+        if error is None:
+            indexed.append(file_path)
+        else:
+            failed.append((file_path, error))
+        stats.files_done += 1
+        if on_file is not None:
+            on_file(file_path, error)
+        if progress is not None:
+            progress(stats)
+
+    pending: deque[_PendingDocument] = deque()
+    batch: list[tuple[_PendingDocument, int]] = []
+    in_flight: deque = deque()
+
+    def apply_vectors(items: list[tuple[_PendingDocument, int]], result)-> None:
+        try:
+            vectors = np.asarray(result(), dtype=np.float32)
+        except Exception as e:
+            for doc, _ in items:
+                doc.error = e
+        else:
+            for (doc, i), vector in zip(items, vectors):
+                doc.set_vector(i, vector)
+
+    def embed_batch():
+        items = list(batch)
+        batch.clear()
+        texts = [doc.chunks[i] for doc, i in items]
+        if pool is None:
+            apply_vectors(items, lambda: _embed_local_or_daemon(chunks=texts, backend=backend, stats=stats))
+            return
+        in_flight.append((items, pool.submit(_embed_in_worker, texts, backend)))
+        while len(in_flight) > workers * 2:
+            complete_oldest()
+
+    def complete_oldest():
+        items, future = in_flight.popleft()
+
+        def result():
+            vectors, worker_stats = future.result()
+            stats.merge(worker_stats)
+            return vectors
+
+        apply_vectors(items, result)
+
+    def flush():
+        try:
+            writer.flush()
+            keyword_index.replace_documents(lexical)
+            error = None
+        except Exception as e:
+            error = e
+        lexical.clear()
+        for file_path in unflushed:
+            finish(file_path, error)
+        unflushed.clear()
+
+    def store_ready():
+        while pending and (pending[0].error or not pending[0].missing):
+            doc = pending.popleft()
+            if doc.error is None:
+                try:
+                    _store_document(doc=doc, config=config, writer=writer, lexical=lexical, agent_metadata=agent_metadata)
+                except Exception as e:
+                    doc.error = e
+            if doc.error is not None:
+                finish(doc.file_path, doc.error)
+                continue
+            unflushed.append(doc.file_path)
+            if writer.full:
+                flush()
+
+    try:
+        for file_path, result, error in extracted:
+            if error is not None:
+                finish(file_path, error)
+                continue
+            try:
+                file_type, chunks, pages, locations = result
+                doc = _PendingDocument(file_path=file_path, file_type=file_type, chunks=chunks, pages=pages, locations=locations)
+                reusable = doc.load_stored(config=config) if diff_chunks or (diff_paths is not None and file_path in diff_paths) else {}
+            except Exception as e:
+                finish(file_path, e)
+                continue
+
+            pending.append(doc)
+
+            for i, chunk_hash in enumerate(doc.chunk_hashes):
+                if chunk_hash in reusable:
+                    doc.set_vector(i, reusable[chunk_hash])
+                    stats.reused_chunks += 1
+                    continue
+                batch.append((doc, i))
+                if len(batch) >= batch_size:
+                    embed_batch()
+            store_ready()
+
+        if batch:
+            embed_batch()
+        while in_flight:
+            complete_oldest()
+        store_ready()
+        flush()
+    finally:
+        extracted.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return indexed, failed
+
+def index_file(file_path: str, config: dict, agent_metadata: dict | None = None)-> None:
+    _, failed = index_files(file_paths=[file_path], config=config, agent_metadata=agent_metadata, diff_chunks=True)
+    if failed:
+        raise failed[0][1]
 
 def delete_file(file_path: str, config: dict)-> None:
     from ctxvault.core.identifiers import get_doc_id
+    from ctxvault.storage.bm25_store import get_bm25_index
     from ctxvault.storage.chroma_store import delete_document
 
     doc_id = get_doc_id(path=file_path)
     delete_document(doc_id=doc_id, config=config)
+    get_bm25_index(config["db_path"]).delete_document(doc_id=doc_id)
 
 def reindex_file(file_path: str, config: dict)->None:
-    delete_file(file_path=file_path, config=config)
     index_file(file_path=file_path, config=config)
+
+def reindex_files(file_paths: list[str], config: dict, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None, on_file: FileCallback | None = None)-> tuple[list[str], list[tuple[str, Exception]]]:
+    return index_files(file_paths=file_paths, config=config, workers=workers, stats=stats, diff_chunks=True, extract_workers=extract_workers, progress=progress, on_file=on_file)
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from ctxvault.core.exceptions import JobNotFoundError, VaultBusyError
+from ctxvault.models.jobs import JobInfo, JobKind, JobStatus
+from ctxvault.models.vaults import VaultOperation
+
+JOB_WORKERS = int(os.environ.get("CTXVAULT_JOB_WORKERS", "1"))
+MAX_FINISHED_JOBS = 100
+
+class JobRunner:
+    """Runs index and reindex requests in the background and tracks their progress.
+
+    Jobs run on a small thread pool (one by default); indexing itself still
+    fans out to the process pools of the pipeline. Each job holds its vault's
+    write lock while it runs, and synchronous writes take the same lock through
+    exclusive(), so nothing writes a vault concurrently. Progress is the job's
+    IndexStats, updated after each file. Only the most recent MAX_FINISHED_JOBS
+    finished jobs are kept.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._jobs: OrderedDict[str, JobInfo] = OrderedDict()
+        self._lock = threading.Lock()
+        self._vault_locks: dict[str, threading.Lock] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def submit(self, kind: JobKind, vault_name: str, path: str | None = None, workers: int = 1, extract_workers: int = 1, retry_failed: bool = False)-> JobInfo:
+        from ctxvault.core import vault_router
+
+        operation = VaultOperation.INDEX if kind == JobKind.INDEX else VaultOperation.REINDEX
+        vault_router._get_vault(vault_name=vault_name)._require_operation(operation)
+
+        job = JobInfo(id=uuid.uuid4().hex, kind=kind, vault_name=vault_name, path=path, created_at=time.time())
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ctxvault-job")
+            self._jobs[job.id] = job
+            self._evict()
+            self._executor.submit(self._run, job, workers, extract_workers, retry_failed)
+        return job.model_copy(deep=True)
+
+    def get(self, job_id: str)-> JobInfo:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobNotFoundError(f"Job '{job_id}' not found.")
+            return job.model_copy(deep=True)
+
+    def list_jobs(self)-> list[JobInfo]:
+        with self._lock:
+            return [job.model_copy(deep=True) for job in self._jobs.values()]
+
+    @contextmanager
+    def exclusive(self, vault_name: str)-> Iterator[None]:
+        """Hold a vault's write lock for a write made outside the job queue.
+
+        Raises VaultBusyError while a job for the vault is queued or running,
+        instead of blocking the caller for the length of the job.
+        """
+        with self._lock:
+            if any(job.vault_name == vault_name and job.status in (JobStatus.QUEUED, JobStatus.RUNNING) for job in self._jobs.values()):
+                raise VaultBusyError(f"Vault '{vault_name}' is being indexed by a background job, retry when it has finished.")
+            lock = self._vault_lock(vault_name)
+        with lock:
+            yield
+
+    def shutdown(self, wait: bool = False)-> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    def _vault_lock(self, vault_name: str)-> threading.Lock:
+        # Callers hold self._lock.
+        return self._vault_locks.setdefault(vault_name, threading.Lock())
+
+    def _evict(self)-> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: JobInfo, workers: int, extract_workers: int, retry_failed: bool)-> None:
+        from ctxvault.core import vault_router
+
+        with self._lock:
+            lock = self._vault_lock(job.vault_name)
+        with lock:
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            try:
+                if job.kind == JobKind.INDEX:
+                    processed, skipped = vault_router.index_files(vault_name=job.vault_name, path=job.path, workers=workers, stats=job.stats, extract_workers=extract_workers, retry_failed=retry_failed)
+                else:
+                    processed, skipped = vault_router.reindex_files(vault_name=job.vault_name, path=job.path, workers=workers, stats=job.stats, extract_workers=extract_workers)
+                job.processed_files, job.skipped_files = processed, skipped
+                job.status = JobStatus.SUCCEEDED
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = JobStatus.FAILED
+            finally:
+                job.finished_at = time.time()
+
+jobs = JobRunner()
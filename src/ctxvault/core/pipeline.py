@@ -0,0 +1,179 @@
+from collections import deque
+from collections.abc import Callable, Iterator
+from ctxvault.models.indexing import IndexStats
+from ctxvault.models.vaults import ChunkingMode, ChunkStorage
+
+ProgressCallback = Callable[[IndexStats], None]
+# Called once per file with its path and the error that made it fail, if any.
+FileCallback = Callable[[str, Exception | None], None]
+
+# Files handed to the extraction pool ahead of the embedder, per extraction
+# worker. Bounds memory when extraction outpaces embedding.
+EXTRACT_QUEUE_PER_WORKER = 4
+# Files whose extracted text is longer than this are not put in the text cache
+# of vaults storing chunk text: caching a file holds all of its text in memory,
+# which streaming extraction otherwise avoids.
+MAX_CACHED_CHARS = 8_000_000
+
+def _iter_and_cache(segments: Iterator[tuple[str, int | None]], cache, key: str, evict: bool)-> Iterator[tuple[str, int | None]]:
+    # Vaults storing offsets (evict=False) read chunk text from the cache, so they cache every file.
+    limit = MAX_CACHED_CHARS if evict else None
+    seen: list[tuple[str, int | None]] | None = []
+    size = 0
+    for segment in segments:
+        if seen is not None:
+            seen.append(segment)
+            size += len(segment[0])
+            if limit is not None and size > limit:
+                seen = None
+        yield segment
+    if seen is not None:
+        cache.put(key, seen, evict=evict)
+
+def _cached_segments(file_path: str, cache_dir: str, evict: bool = True)-> tuple[Iterator[tuple[str, int | None]], str, str]:
+    from pathlib import PurePosixPath
+    from ctxvault.core.identifiers import get_content_hash
+    from ctxvault.storage.text_cache import cache_key, get_text_cache
+    from ctxvault.utils.text_extraction import EXTRACTOR_VERSION, iter_segments
+
+    file_type = PurePosixPath(file_path).suffix
+    cache = get_text_cache(cache_dir)
+    key = cache_key(get_content_hash(file_path), file_type, EXTRACTOR_VERSION)
+    cached = cache.get(key)
+    if cached is not None:
+        return iter(cached), file_type, key
+
+    segments, file_type = iter_segments(path=file_path)
+    return _iter_and_cache(segments, cache, key, evict), file_type, key
+
+def load_text(text_key: str, file_path: str, cache_dir: str)-> str | None:
+    """The extracted text of a file stored under text_key, as chunk offsets index it.
+
+    When the entry was evicted from the text cache the file is extracted
+    again, as long as its content still matches the key. Returns None when
+    the file changed or is gone since it was indexed.
+    """
+    from ctxvault.storage.text_cache import get_text_cache
+    from ctxvault.utils.chuncking import join_segments
+
+    segments = get_text_cache(cache_dir).get(text_key)
+    if segments is None:
+        try:
+            segments, _, key = _cached_segments(file_path, cache_dir, evict=False)
+            if key != text_key:
+                return None
+            segments = list(segments)
+        except OSError:
+            return None
+    return join_segments(segments)
+
+def load_chunk_texts(documents: list[str | None], metadatas: list[dict | None], config: dict)-> list[str | None]:
+    """Fill in the text of hits stored as offsets, slicing it from the text cache.
+
+    Each file's text is loaded once however many of its chunks were hit. A
+    hit whose file changed since it was indexed stays None, like a hit with
+    a missing record.
+    """
+    texts: dict[str, str | None] = {}
+    filled = []
+    for document, metadata in zip(documents, metadatas):
+        if document is not None or not metadata or "text_key" not in metadata:
+            filled.append(document)
+            continue
+        key = metadata["text_key"]
+        if key not in texts:
+            texts[key] = load_text(text_key=key, file_path=metadata["source"], cache_dir=config["db_path"])
+        if texts[key] is None:
+            filled.append(None)
+            continue
+        body = texts[key][metadata["start"]:metadata["end"]]
+        section = metadata.get("section")
+        filled.append(f"{section}\n{body}" if section and body else (section or body))
+    return filled
+
+def chunking_options(chunking: str = ChunkingMode.WORDS.value)-> dict:
+    """Keyword arguments for chunk_segments() in the given chunking mode.
+
+    Token chunks fill the embedding model's window: max_seq_length minus the
+    special tokens the encoder adds, with a quarter of it as overlap, the
+    same ratio as the word defaults.
+    """
+    if ChunkingMode(chunking) == ChunkingMode.WORDS:
+        return {}
+
+    from ctxvault.core.embedding import get_tokenizer
+
+    tokenizer = get_tokenizer()
+    chunk_size = tokenizer.model_max_length - tokenizer.num_special_tokens_to_add()
+    return {"chunk_size": chunk_size, "overlap": chunk_size // 4, "tokenizer": tokenizer}
+
+def extract_chunks(file_path: str, cache_dir: str | None = None, chunking: str = ChunkingMode.WORDS.value, chunk_storage: str = ChunkStorage.TEXT.value)-> tuple[str, list[str], list[int | None], list[dict] | None]:
+    """Extract and chunk a file page by page.
+
+    Returns the file type, the chunks, each chunk's page and, with cache_dir,
+    each chunk's location in the cached text: its text_key, start and end
+    offsets and markdown section (see load_text). With cache_dir the
+    extracted text is read from, or written to, the text cache in that
+    folder, so unchanged files are not parsed again. chunking and
+    chunk_storage are the vault's ChunkingMode and ChunkStorage values; vaults
+    storing offsets keep their cache entries out of eviction.
+    """
+    from ctxvault.utils.text_extraction import iter_segments
+    from ctxvault.utils.chuncking import chunk_segment_spans
+
+    key = None
+    if cache_dir is not None:
+        segments, file_type, key = _cached_segments(file_path, cache_dir, evict=ChunkStorage(chunk_storage) == ChunkStorage.TEXT)
+    else:
+        segments, file_type = iter_segments(path=file_path)
+    chunks, pages, locations = [], [], []
+    for span, page in chunk_segment_spans(segments, file_type=file_type, **chunking_options(chunking)):
+        chunks.append(span.text)
+        pages.append(page)
+        location = {"text_key": key, "start": span.start, "end": span.end}
+        if span.section:
+            location["section"] = span.section
+        locations.append(location)
+    return file_type, chunks, pages, locations if key is not None else None
+
+def _create_extract_pool(workers: int):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def iter_extracted(file_paths: list[str], workers: int = 1, cache_dir: str | None = None, chunking: str = ChunkingMode.WORDS.value, chunk_storage: str = ChunkStorage.TEXT.value)-> Iterator[tuple[str, tuple[str, list[str], list[int | None], list[dict] | None] | None, Exception | None]]:
+    """Yield (file_path, extract_chunks(file_path, cache_dir, chunking, chunk_storage), error) for each file, in input order.
+
+    With workers > 1 extraction and chunking run in a process pool that works
+    ahead of the consumer, so parsing the next files overlaps with embedding
+    the current ones. At most EXTRACT_QUEUE_PER_WORKER files per worker are in
+    flight; the pool stalls when the consumer falls behind.
+    """
+    if workers <= 1:
+        for file_path in file_paths:
+            try:
+                yield file_path, extract_chunks(file_path, cache_dir, chunking, chunk_storage), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+
+    pool = _create_extract_pool(workers)
+    in_flight: deque = deque()
+    paths = iter(file_paths)
+    try:
+        while True:
+            while len(in_flight) < workers * EXTRACT_QUEUE_PER_WORKER:
+                file_path = next(paths, None)
+                if file_path is None:
+                    break
+                in_flight.append((file_path, pool.submit(extract_chunks, file_path, cache_dir, chunking, chunk_storage)))
+            if not in_flight:
+                return
+            file_path, future = in_flight.popleft()
+            try:
+                yield file_path, future.result(), None
+            except Exception as e:
+                yield file_path, None, e
+    finally:
+        pool.shutdown(cancel_futures=True)
@@ -1,7 +1,85 @@
-from ctxvault.core.embedding import embed_list
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from ctxvault.core import embedding
+from ctxvault.core.embedding_scheduler import scheduler
+from ctxvault.core.exceptions import DaemonError
+from ctxvault.daemon import client as daemon_client
 from ctxvault.models.documents import SemanticDocumentInfo
+from ctxvault.models.vaults import QueryMode
 from ctxvault.storage import chroma_store
 
+QUERY_CACHE_SIZE = int(os.environ.get("CTXVAULT_QUERY_CACHE_SIZE", "1024"))
+# Reciprocal rank fusion constant: a hit at rank r scores 1 / (RRF_K + r) in each list.
+RRF_K = 60
+# Candidates taken from each retriever in hybrid mode, per requested result.
+HYBRID_CANDIDATES = 4
+
+class QueryEmbeddingCache:
+    """Thread-safe in-process LRU of query embeddings with hit/miss counters."""
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str, backend: str | None = None)-> str:
+        return f"{backend or ''}\0{' '.join(text.split())}"
+
+    def get(self, text: str, backend: str | None = None)-> np.ndarray | None:
+        key = self._key(text, backend)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector: np.ndarray, backend: str | None = None)-> None:
+        if self.max_size <= 0:
+            return
+        key = self._key(text, backend)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def resize(self, max_size: int)-> None:
+        with self._lock:
+            self.max_size = max_size
+            while len(self._entries) > max(max_size, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self)-> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self)-> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+query_cache = QueryEmbeddingCache()
+
+def embed_query(query_txt: str, backend: str | None = None)-> np.ndarray:
+    vector = query_cache.get(query_txt, backend=backend)
+    if vector is None:
+        if scheduler.running:
+            vector = scheduler.embed(text=query_txt, backend=backend)
+        else:
+            vector = embedding.embed_queries(texts=[query_txt], backend=backend)[0]
+        vector = np.asarray(vector, dtype=np.float32)
+        query_cache.put(query_txt, vector, backend=backend)
+    return vector
+
 def build_documents_from_metadatas(metadatas)-> list[SemanticDocumentInfo]:
     acc = {}
 
@@ -28,8 +106,58 @@ def build_documents_from_metadatas(metadatas)-> list[SemanticDocumentInfo]:
         for doc_id, (source, filetype, count) in acc.items()
     ]
 
-def query(query_txt: str, config: dict, n_results: int = 5, filters: dict | None = None)-> dict:
-    query_embedding = embed_list(chunks=[query_txt])
+def _fuse(query_txt: str, query_embedding: np.ndarray, config: dict, n_results: int, filters: dict | None)-> dict:
+    """Merge vector and BM25 hits with reciprocal rank fusion, in the shape of a Chroma result.
+
+    "distances" keeps each hit's vector distance (None for hits found only by
+    keyword) and "fused_scores" holds the fusion score the hits are ranked
+    by, where higher is better.
+    """
+    from ctxvault.storage.bm25_store import get_bm25_index
+
+    candidates = n_results * HYBRID_CANDIDATES
+    vector = chroma_store.query(query_embedding=query_embedding, config=config, n_results=candidates, filters=filters)
+    lexical = get_bm25_index(config["db_path"]).search(text=query_txt, n_results=candidates)
+
+    scores: dict[str, float] = {}
+    records: dict[str, tuple] = {}
+    for rank, record in enumerate(zip(vector["ids"][0], vector["documents"][0], vector["metadatas"][0], vector["distances"][0]), start=1):
+        scores[record[0]] = 1 / (RRF_K + rank)
+        records[record[0]] = record
+    for rank, (chunk_id, _) in enumerate(lexical, start=1):
+        scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (RRF_K + rank)
+
+    # Lexical-only hits are read from the store, which also applies filters and drops stale ids.
+    missing = [chunk_id for chunk_id, _ in lexical if chunk_id not in records]
+    if missing:
+        fetched = chroma_store.get_chunks(ids=missing, config=config, filters=filters)
+        for chunk_id, document, metadata in zip(fetched["ids"], fetched["documents"], fetched["metadatas"]):
+            records[chunk_id] = (chunk_id, document, metadata, None)
+
+    ranked = sorted(records, key=scores.__getitem__, reverse=True)[:n_results]
+    return {
+        "ids": [ranked],
+        "documents": [[records[chunk_id][1] for chunk_id in ranked]],
+        "metadatas": [[records[chunk_id][2] for chunk_id in ranked]],
+        "distances": [[records[chunk_id][3] for chunk_id in ranked]],
+        "fused_scores": [[scores[chunk_id] for chunk_id in ranked]],
+    }
+
+def query(query_txt: str, config: dict, n_results: int = 5, filters: dict | None = None, forward: bool = True, mode: str = QueryMode.VECTOR.value)-> dict:
+    """Search a semantic vault and return the hits in Chroma's result shape.
+
+    In hybrid mode the vector hits are fused with the vault's BM25 index by
+    reciprocal rank fusion, and the result also has "fused_scores" (see _fuse).
+    """
+    if forward and daemon_client.available():
+        try:
+            return daemon_client.query(query_txt=query_txt, config=config, n_results=n_results, filters=filters, mode=mode)
+        except DaemonError:
+            pass
+
+    query_embedding = embed_query(query_txt=query_txt, backend=config.get("embedding_backend"))[np.newaxis, :]
+    if QueryMode(mode) == QueryMode.HYBRID:
+        return _fuse(query_txt=query_txt, query_embedding=query_embedding, config=config, n_results=n_results, filters=filters)
     return chroma_store.query(query_embedding=query_embedding, config=config, n_results=n_results, filters=filters)
 
 def list_documents(config: dict)-> list[SemanticDocumentInfo]:
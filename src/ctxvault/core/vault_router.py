@@ -1,29 +1,40 @@
-from ctxvault.core.exceptions import VaultTypeNotValidError
-from ctxvault.core.vaults.semantic import SemanticVault
-from ctxvault.core.vaults.skill import SkillVault
-from ctxvault.models.documents import SemanticDocumentInfo, SkillDocumentInfo
-from ctxvault.models.query_result import QueryResult
-from ctxvault.models.vaults import SkillOutput, SkillInput, VaultOperation, VaultType
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from ctxvault.core.exceptions import ChunkingModeNotValidError, ChunkStorageNotValidError, QueryModeNotValidError, VaultTypeNotValidError
+from ctxvault.models.vaults import ChunkingMode, ChunkStorage, QueryMode, VaultOperation, VaultType
 from ctxvault.utils.config import create_vault, get_vault_config, get_vaults
 
+# The vault classes and models import pydantic, which is most of the CLI's
+# startup time; commands that only read or edit the config never need them.
+if TYPE_CHECKING:
+    from ctxvault.core.pipeline import ProgressCallback
+    from ctxvault.models.documents import SemanticDocumentInfo, SkillDocumentInfo
+    from ctxvault.models.indexing import FsckReport, IndexStats
+    from ctxvault.models.query_result import QueryResult
+    from ctxvault.models.skills import SkillInput, SkillOutput
+
 def _get_vault(vault_name: str):
+    from ctxvault.core.vaults.semantic import SemanticVault
+    from ctxvault.core.vaults.skill import SkillVault
+
     config = get_vault_config(vault_name)
     vault_type = config.get("type", "semantic")
     if vault_type == "skill":
         return SkillVault(vault_name, config)
     return SemanticVault(vault_name, config)
 
-def warmup() -> None:
+def warmup(backend: str | None = None) -> None:
     """
     Pre-initializes heavy components (ChromaDB, embedding model) so that
-    the first tool call in long-running server contexts (MCP, FastAPI) is
-    not penalized by lazy initialization costs.
+    the first tool call in long-running server contexts (MCP, FastAPI, daemon)
+    is not penalized by lazy initialization costs.
     """
     from ctxvault.core import querying, indexer
-    from ctxvault.core.embedding import embed_list
+    from ctxvault.core.embedding import get_model
     from ctxvault.storage import chroma_store
 
-    embed_list(chunks=["warmup"])
+    get_model(backend).encode(sentences=["warmup"], show_progress_bar=False)
 
 def is_agent_authorized(vault_name: str, agent_name: str) -> bool:
     vault = _get_vault(vault_name=vault_name)
@@ -45,35 +56,64 @@ def purge_vault(vault_name: str) -> None:
     vault = _get_vault(vault_name=vault_name)
     vault.purge_vault()
 
-def init_vault(vault_name: str, vault_type: str | VaultType = VaultType.SEMANTIC, restricted: bool = False, path: str | None = None, global_vault: bool = False)-> tuple[str, str]:
+def init_vault(vault_name: str, vault_type: str | VaultType = VaultType.SEMANTIC, restricted: bool = False, path: str | None = None, global_vault: bool = False, embedding_backend: str | None = None, chunking: str | ChunkingMode = ChunkingMode.TOKENS, chunk_storage: str | ChunkStorage = ChunkStorage.TEXT)-> tuple[str, str]:
     if isinstance(vault_type, str):
         try:
             vault_type = VaultType(vault_type)
         except ValueError:
             raise VaultTypeNotValidError(f"Vault type not valid: {vault_type}. Choose between: {', '.join(VaultType.list())}")
+
+    if isinstance(chunking, str):
+        try:
+            chunking = ChunkingMode(chunking)
+        except ValueError:
+            raise ChunkingModeNotValidError(f"Chunking mode not valid: {chunking}. Choose between: {', '.join(ChunkingMode.list())}")
+
+    if isinstance(chunk_storage, str):
+        try:
+            chunk_storage = ChunkStorage(chunk_storage)
+        except ValueError:
+            raise ChunkStorageNotValidError(f"Chunk storage not valid: {chunk_storage}. Choose between: {', '.join(ChunkStorage.list())}")
+
+    if embedding_backend and vault_type == VaultType.SEMANTIC:
+        from ctxvault.core import embedding
+        embedding_backend = embedding.resolve_backend(embedding_backend)
+        if embedding_backend != "torch":
+            embedding.validate_backend(embedding_backend)
     
-    vault_path, config_path = create_vault(vault_name=vault_name, vault_type=vault_type, restricted=restricted, vault_path=path, global_vault=global_vault)
+    vault_path, config_path = create_vault(vault_name=vault_name, vault_type=vault_type, restricted=restricted, vault_path=path, global_vault=global_vault, embedding_backend=embedding_backend, chunking=chunking, chunk_storage=chunk_storage)
     return str(vault_path), config_path
 
-def index_files(vault_name: str, path: str | None = None)-> tuple[list[str], list[str]]:
+def index_files(vault_name: str, path: str | None = None, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None, retry_failed: bool = False)-> tuple[list[str], list[str]]:
     vault = _get_vault(vault_name=vault_name)
     vault._require_operation(VaultOperation.INDEX)
-    return vault.index_files(path=path)
+    return vault.index_files(path=path, workers=workers, stats=stats, extract_workers=extract_workers, progress=progress, retry_failed=retry_failed)
+
+def query(text: str, vault_name: str, filters: dict | None = None, mode: str | QueryMode = QueryMode.VECTOR)-> QueryResult:
+    if isinstance(mode, str):
+        try:
+            mode = QueryMode(mode)
+        except ValueError:
+            raise QueryModeNotValidError(f"Query mode not valid: {mode}. Choose between: {', '.join(QueryMode.list())}")
 
-def query(text: str, vault_name: str, filters: dict | None = None)-> QueryResult:
     vault = _get_vault(vault_name=vault_name)
     vault._require_operation(VaultOperation.QUERY)
-    return vault.query(text=text, filters=filters)
+    return vault.query(text=text, filters=filters, mode=mode)
 
 def delete_files(vault_name: str, path: str | None = None)-> tuple[list[str], list[str]]:
     vault = _get_vault(vault_name=vault_name)
     vault._require_operation(VaultOperation.DELETE)
     return vault.delete_files(path=path)
 
-def reindex_files(vault_name: str, path: str | None = None)-> tuple[list[str], list[str]]:
+def reindex_files(vault_name: str, path: str | None = None, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None)-> tuple[list[str], list[str]]:
     vault = _get_vault(vault_name=vault_name)
     vault._require_operation(VaultOperation.REINDEX)
-    return vault.reindex_files(path=path)
+    return vault.reindex_files(path=path, workers=workers, stats=stats, extract_workers=extract_workers, progress=progress)
+
+def fsck(vault_name: str, dry_run: bool = False, extract_workers: int = 1)-> FsckReport:
+    vault = _get_vault(vault_name=vault_name)
+    vault._require_operation(VaultOperation.FSCK)
+    return vault.fsck(dry_run=dry_run, extract_workers=extract_workers)
 
 def write_doc(vault_name: str, file_path: str, content: str, overwrite: bool = True, agent_metadata: dict | None = None)-> None:
     vault = _get_vault(vault_name=vault_name)
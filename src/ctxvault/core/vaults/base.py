@@ -1,5 +1,9 @@
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from ctxvault.core.pipeline import ProgressCallback
+from ctxvault.models.indexing import IndexStats
 from ctxvault.models.vaults import VaultOperation
 from ctxvault.utils.config import attach_agent_to_vault, delete_vault, detach_agent_from_vault, is_authorized, make_public as _make_public
 from ctxvault.core.exceptions import FileAlreadyExistError, FileOutsideVaultError, FileTypeNotPresentError, PathOutsideVaultError, UnsupportedFileTypeError, UnsupportedVaultOperationError
@@ -32,23 +36,50 @@ class BaseVault(ABC):
         
         return base_path
     
-    def iter_files(self, path: Path, exclude_dirs: list[Path] | None = None):
-        if exclude_dirs is None:
-            exclude_dirs = []
-        
+    def scan_files(self, path: Path, exclude_dirs: list[Path] | None = None, extensions: Iterable[str] | None = None)-> Iterator[tuple[Path, os.stat_result]]:
+        """Walk path with os.scandir, yielding each file with its stat result.
+
+        Excluded directories are pruned before descending, and with extensions
+        set other files are dropped on their name alone. Symlinked directories
+        are not followed, and symlinked files pointing outside the vault are
+        left out. Directories that cannot be read are skipped with a warning.
+        A path that names a single file is yielded whatever its extension, so
+        callers can report why it is not supported.
+        """
+        excluded = {os.path.realpath(excl) for excl in exclude_dirs or []}
+
         if path.is_file():
-            if not any(path.resolve().is_relative_to(excl) for excl in exclude_dirs):
-                yield path
+            if not any(path.resolve().is_relative_to(excl) for excl in excluded):
+                yield path, path.stat()
             return
 
-        for p in path.rglob("*"):
-            if not p.is_file():
-                continue
-
-            if any(p.resolve().is_relative_to(excl) for excl in exclude_dirs):
+        extensions = set(extensions) if extensions is not None else None
+        vault_root = os.path.realpath(self.vault_path) + os.sep
+        stack = [str(path)]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                import warnings
+                warnings.warn(f"Skipped unreadable directory {directory}: {e}")
                 continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if os.path.realpath(entry.path) not in excluded:
+                            stack.append(entry.path)
+                        continue
+                    if extensions is not None and os.path.splitext(entry.name)[1] not in extensions:
+                        continue
+                    if entry.is_symlink() and not os.path.realpath(entry.path).startswith(vault_root):
+                        continue
+                    if entry.is_file():
+                        yield Path(entry.path), entry.stat()
 
-            yield p
+    def iter_files(self, path: Path, exclude_dirs: list[Path] | None = None):
+        for file, _ in self.scan_files(path=path, exclude_dirs=exclude_dirs):
+            yield file
 
     def _require_operation(self, operation: VaultOperation) -> None:
         if operation not in self.supported_operations:
@@ -119,5 +150,5 @@ class BaseVault(ABC):
         abs_path.write_text(content, encoding="utf-8")
 
     @abstractmethod
-    def index_files(self, path: str | None = None) -> tuple[list[str], list[str]]:
+    def index_files(self, path: str | None = None, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None, retry_failed: bool = False) -> tuple[list[str], list[str]]:
         pass
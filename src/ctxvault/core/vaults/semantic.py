@@ -1,12 +1,21 @@
+import json
+import os
 from pathlib import Path
-from ctxvault.core import indexer
+from ctxvault.core.identifiers import get_content_hash
 from ctxvault.core.vaults.base import BaseVault
 from ctxvault.models.documents import SemanticDocumentInfo
+from ctxvault.core.pipeline import ProgressCallback
+from ctxvault.models.indexing import FsckReport, IndexStats
 from ctxvault.models.query_result import ChunkMatch, QueryResult
-from ctxvault.core.exceptions import EmptyQueryError, FileOutsideVaultError, UnsupportedFileTypeError
-from ctxvault.models.vaults import VaultOperation
+from ctxvault.core.exceptions import DaemonError, EmptyQueryError, FileOutsideVaultError, UnsupportedFileTypeError
+from ctxvault.models.vaults import ChunkingMode, ChunkStorage, QueryMode, VaultOperation
 from ctxvault.utils.text_extraction import SUPPORTED_EXT
 
+MANIFEST_FILE = "manifest.json"
+JOURNAL_FILE = "journal.jsonl"
+# Timed probe queries run before and after fsck removes chunks.
+FSCK_PROBE_QUERIES = 5
+
 class SemanticVault(BaseVault):
     supported_operations = frozenset({
         VaultOperation.INDEX,
@@ -15,46 +24,213 @@ class SemanticVault(BaseVault):
         VaultOperation.DELETE,
         VaultOperation.WRITE_DOC,
         VaultOperation.LIST_DOCUMENTS,
+        VaultOperation.FSCK,
     })
 
-    def index_file(self, file_path:Path, agent_metadata: dict | None = None)-> None:
-        from ctxvault.core import indexer
+    @property
+    def _manifest_path(self)-> Path:
+        return self.db_path / MANIFEST_FILE
+
+    def _load_manifest(self)-> dict:
+        if not self._manifest_path.exists():
+            return {}
+        return json.loads(self._manifest_path.read_text())
+
+    def _save_manifest(self, manifest: dict)-> None:
+        self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest))
+        tmp_path.replace(self._manifest_path)
+
+    @property
+    def _journal_path(self)-> Path:
+        return self.db_path / JOURNAL_FILE
+
+    def _replay_journal(self, manifest: dict)-> dict[str, str]:
+        """Apply the journal of an earlier run to manifest and return the files that failed, with their errors.
+
+        Each line records one finished file: its manifest state when it was
+        stored, or the error that made it fail. A run that was killed leaves
+        its completed files here, so the next run skips them. A torn last
+        line is ignored.
+        """
+        failures = {}
+        if not self._journal_path.exists():
+            return failures
+        for line in self._journal_path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if "error" in entry:
+                failures[entry["file"]] = entry["error"]
+            else:
+                manifest[entry["file"]] = entry["state"]
+                failures.pop(entry["file"], None)
+        return failures
+
+    def _write_journal(self, failures: dict[str, str])-> None:
+        """Compact the journal down to the files that still need a retry."""
+        if not failures:
+            self._journal_path.unlink(missing_ok=True)
+            return
+        tmp_path = self._journal_path.with_suffix(".tmp")
+        tmp_path.write_text("".join(json.dumps({"file": file, "error": error}) + "\n" for file, error in failures.items()))
+        tmp_path.replace(self._journal_path)
+
+    def _run_journaled(self, run, states: dict[str, dict], manifest: dict, failures: dict[str, str])-> tuple[list[str], list[tuple[str, Exception]]]:
+        """Call run(on_file) while appending each finished file to the journal.
+
+        When run returns, the manifest and the compacted journal are saved. If
+        it is interrupted instead, the journal keeps what was already stored
+        and the next run replays it.
+        """
+        self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._journal_path.open("a") as journal:
+            def record(file: str, error: Exception | None)-> None:
+                entry = {"file": file, "error": str(error)} if error is not None else {"file": file, "state": states[file]}
+                journal.write(json.dumps(entry) + "\n")
+                journal.flush()
+
+            done, failed = run(record)
+
+        for file in done:
+            manifest[file] = states[file]
+            failures.pop(file, None)
+        for file, e in failed:
+            manifest.pop(file, None)
+            failures[file] = str(e)
+        self._save_manifest(manifest)
+        self._write_journal(failures)
+        return done, failed
+
+    def _update_manifest(self, indexed: list[str] = (), removed: list[str] = ())-> None:
+        manifest = self._load_manifest()
+        for file in indexed:
+            manifest[file] = self._file_state(file_path=Path(file))
+        for file in removed:
+            manifest.pop(file, None)
+        self._save_manifest(manifest)
 
+    @staticmethod
+    def _file_state(file_path: Path, content_hash: str | None = None, stat: os.stat_result | None = None)-> dict:
+        stat = stat or file_path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": content_hash or get_content_hash(str(file_path))}
+
+    @staticmethod
+    def _file_status(file_path: Path, entry: dict | None, stat: os.stat_result | None = None)-> tuple[str, dict]:
+        """Classify a file against its manifest entry as new, changed or unchanged.
+
+        Size and mtime are checked first so unchanged files are never read; the
+        content hash only decides when they differ (e.g. after a touch or copy).
+        """
+        stat = stat or file_path.stat()
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return "unchanged", entry
+
+        state = SemanticVault._file_state(file_path=file_path, stat=stat)
+        if entry is None:
+            return "new", state
+        return ("unchanged" if entry["sha256"] == state["sha256"] else "changed"), state
+
+    def _check_indexable(self, file_path: Path)-> None:
         if file_path.suffix not in SUPPORTED_EXT:
             raise UnsupportedFileTypeError("File type not supported.")
 
         if not file_path.resolve().is_relative_to(self.vault_path):
             raise FileOutsideVaultError("The file to index is outside the Context Vault.")
 
+    def index_file(self, file_path:Path, agent_metadata: dict | None = None)-> None:
+        from ctxvault.core import indexer
+
+        self._check_indexable(file_path=file_path)
+
         indexer.index_file(file_path=str(file_path), config=self.config, agent_metadata=agent_metadata)
+        self._update_manifest(indexed=[str(file_path)])
 
-    def index_files(self, path: str | None = None)-> tuple[list[str], list[str]]:
-        base_path = self._get_base_path(path=path)
-        
-        indexed_files = []
+    def _collect_indexable(self, base_path: Path)-> tuple[dict[str, os.stat_result], list[str]]:
+        """Return the supported files under base_path with their stat results, and the skipped ones."""
+        to_index = {}
         skipped_files = []
-        
-        for file in self.iter_files(path=base_path, exclude_dirs=[self.db_path]):
-            try:
-                self.index_file(file_path=file)
-                indexed_files.append(str(file))
-            except Exception as e:
-                skipped_files.append(f"{str(file)} ({e})")
+
+        for file, stat in self.scan_files(path=base_path, exclude_dirs=[self.db_path], extensions=SUPPORTED_EXT):
+            if file == base_path:
+                try:
+                    self._check_indexable(file_path=file)
+                except Exception as e:
+                    skipped_files.append(f"{str(file)} ({e})")
+                    continue
+            to_index[str(file)] = stat
+
+        return to_index, skipped_files
+
+    def index_files(self, path: str | None = None, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None, retry_failed: bool = False)-> tuple[list[str], list[str]]:
+        """Bring the index in line with the files under path.
+
+        Files whose manifest entry still matches are skipped, new files are
+        embedded, modified files re-embed only the chunks that changed, and
+        vectors of files that no longer exist are purged. Finished files are
+        journaled as they are stored, so an interrupted run resumes where it
+        stopped. With retry_failed only the files that failed in earlier runs
+        are processed. Returns only the files that were actually processed.
+        """
+        from ctxvault.core import indexer
+
+        stats = stats if stats is not None else IndexStats()
+        base_path = self._get_base_path(path=path)
+        candidates, skipped_files = self._collect_indexable(base_path=base_path)
+        manifest = self._load_manifest()
+        failures = self._replay_journal(manifest)
+        if retry_failed:
+            candidates = {file: stat for file, stat in candidates.items() if file in failures}
+
+        pending: dict[str, dict] = {}
+        new_files: list[str] = []
+        changed: list[str] = []
+        for file, stat in candidates.items():
+            status, state = self._file_status(file_path=Path(file), entry=manifest.get(file), stat=stat)
+            if status == "unchanged":
+                manifest[file] = state
+                stats.unchanged_files += 1
+                continue
+            if status == "changed":
+                changed.append(file)
+                stats.changed_files += 1
+            else:
+                new_files.append(file)
+                stats.new_files += 1
+            pending[file] = state
+
+        removed = [] if retry_failed else [file for file in manifest if Path(file).is_relative_to(base_path) and not Path(file).exists()]
+        for file in removed:
+            indexer.delete_file(file_path=file, config=self.config)
+            del manifest[file]
+        stats.removed_files += len(removed)
+        for file in list(failures):
+            if Path(file).is_relative_to(base_path) and not Path(file).exists():
+                del failures[file]
+
+        def run(on_file):
+            return indexer.index_files(file_paths=new_files + changed, config=self.config, workers=workers, stats=stats, extract_workers=extract_workers, progress=progress, on_file=on_file, diff_paths=set(changed))
+
+        indexed_files, failed = self._run_journaled(run, states=pending, manifest=manifest, failures=failures)
+        skipped_files.extend(f"{file} ({e})" for file, e in failed)
 
         return indexed_files, skipped_files
     
-    def reindex_files(self, path: str | None = None)-> tuple[list[str], list[str]]:
-        base_path = self._get_base_path(path=path)
+    def reindex_files(self, path: str | None = None, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None)-> tuple[list[str], list[str]]:
+        from ctxvault.core import indexer
 
-        reindexed_files = []
-        skipped_files = []
+        to_reindex, skipped_files = self._collect_indexable(base_path=self._get_base_path(path=path))
+        manifest = self._load_manifest()
+        failures = self._replay_journal(manifest)
+        states = {file: self._file_state(file_path=Path(file), stat=stat) for file, stat in to_reindex.items()}
 
-        for file in self.iter_files(path=base_path, exclude_dirs=[self.db_path]):
-            try:
-                self.reindex_file(file_path=file, vault_config=self.config)
-                reindexed_files.append(str(file))
-            except Exception as e:
-                skipped_files.append(f"{str(file)} ({e})")
+        def run(on_file):
+            return indexer.reindex_files(file_paths=list(to_reindex), config=self.config, workers=workers, stats=stats, extract_workers=extract_workers, progress=progress, on_file=on_file)
+
+        reindexed_files, failed = self._run_journaled(run, states=states, manifest=manifest, failures=failures)
+        skipped_files.extend(f"{file} ({e})" for file, e in failed)
 
         return reindexed_files, skipped_files
 
@@ -68,25 +244,46 @@ class SemanticVault(BaseVault):
             raise FileOutsideVaultError("The file to reindex is outside the Context Vault.")
 
         indexer.reindex_file(file_path=str(file_path), config=self.config)
+        self._update_manifest(indexed=[str(file_path)])
 
     def delete_file(self, file_path: Path)-> None:
+        from ctxvault.core import indexer
+
         indexer.delete_file(file_path=str(file_path), config=self.config)
         super().delete_file(file_path=file_path)
+
+    def delete_files(self, path: str | None = None)-> tuple[list[str], list[str]]:
+        deleted_files, skipped_files = super().delete_files(path=path)
+        self._update_manifest(removed=deleted_files)
+        return deleted_files, skipped_files
         
-    def query(self, text: str, filters: dict | None = None) -> QueryResult:
-        from ctxvault.core import querying
+    def query(self, text: str, filters: dict | None = None, mode: QueryMode = QueryMode.VECTOR) -> QueryResult:
+        from ctxvault.core.pipeline import load_chunk_texts
+        from ctxvault.daemon import client as daemon_client
         if not text.strip():
             raise EmptyQueryError("Query text cannot be empty.")
 
-        result_dict = querying.query(query_txt=text, config=self.config, filters=filters)
+        # The daemon is asked before querying is imported: the local path loads
+        # numpy and chromadb, which takes longer than a forwarded query.
+        result_dict = None
+        if daemon_client.available():
+            try:
+                result_dict = daemon_client.query(query_txt=text, config=self.config, filters=filters, mode=mode.value)
+            except DaemonError:
+                pass
+        if result_dict is None:
+            from ctxvault.core import querying
+            result_dict = querying.query(query_txt=text, config=self.config, filters=filters, forward=False, mode=mode.value)
 
+        fused_scores = result_dict.get("fused_scores", [[None] * len(result_dict["ids"][0])])[0]
         raw_triples = list(zip(
-            result_dict["documents"][0],
+            load_chunk_texts(documents=result_dict["documents"][0], metadatas=result_dict["metadatas"][0], config=self.config),
             result_dict["metadatas"][0],
-            result_dict["distances"][0]
+            result_dict["distances"][0],
+            fused_scores
         ))
 
-        valid_triples = [(d, m, dist) for d, m, dist in raw_triples if d is not None and m is not None]
+        valid_triples = [(d, m, dist, fused) for d, m, dist, fused in raw_triples if d is not None and m is not None]
         skipped = len(raw_triples) - len(valid_triples)
 
         if skipped > 0:
@@ -99,16 +296,95 @@ class SemanticVault(BaseVault):
                 chunk_index=m["chunk_index"],
                 text=d,
                 score=dist,
+                fused_score=fused,
                 doc_id=m["doc_id"],
                 source=m["source"],
+                page=m.get("page"),
                 generated_by=m.get("generated_by"),
                 artifact_type=m.get("artifact_type"),
                 topic=m.get("topic")
             )
-            for d, m, dist in valid_triples
+            for d, m, dist, fused in valid_triples
         ]
         return QueryResult(query=text, results=chunks_match)
 
+    def _probe_query_ms(self, probe)-> float | None:
+        import statistics
+        import time
+        from ctxvault.storage import chroma_store
+
+        if probe is None:
+            return None
+        timings = []
+        for _ in range(FSCK_PROBE_QUERIES):
+            start = time.perf_counter()
+            chroma_store.query(query_embedding=probe, config=self.config)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def fsck(self, dry_run: bool = False, extract_workers: int = 1)-> FsckReport:
+        """Find and remove chunks that no longer belong to a file in the vault.
+
+        A chunk is orphaned when its source file is gone, and stale when its
+        chunk index is past the number of chunks the file produces today (left
+        behind when a document got shorter). Current chunk counts come from
+        re-extracting the files, without embedding. Unless dry_run is set, the
+        chunks are deleted in bulk, manifest entries of missing files are
+        dropped and the store is compacted. Vaults storing chunk offsets also
+        drop the cached texts that no remaining chunk refers to.
+        """
+        from ctxvault.core.pipeline import iter_extracted
+        from ctxvault.storage import chroma_store
+        from ctxvault.storage.bm25_store import get_bm25_index
+
+        report = FsckReport(bytes_before=chroma_store.disk_usage(config=self.config))
+        stored = chroma_store.get_all_chunks(config=self.config)
+        by_source: dict[str, list[tuple[str, int]]] = {}
+        for chunk_id, metadata in zip(stored.get("ids") or [], stored.get("metadatas") or []):
+            by_source.setdefault(metadata["source"], []).append((chunk_id, metadata["chunk_index"]))
+            report.chunks += 1
+
+        to_delete = []
+        existing = []
+        for source, chunks in sorted(by_source.items()):
+            if Path(source).is_file():
+                existing.append(source)
+                continue
+            report.missing_sources.append(source)
+            report.orphan_chunks += len(chunks)
+            to_delete.extend(chunk_id for chunk_id, _ in chunks)
+
+        for source, result, error in iter_extracted(file_paths=existing, workers=extract_workers, cache_dir=self.config["db_path"], chunking=self.config.get("chunking", ChunkingMode.WORDS.value), chunk_storage=self.config.get("chunk_storage", ChunkStorage.TEXT.value)):
+            if error is not None:
+                report.unreadable_sources.append(source)
+                continue
+            _, chunks, _, _ = result
+            stale = [chunk_id for chunk_id, chunk_index in by_source[source] if chunk_index >= len(chunks)]
+            report.stale_chunks += len(stale)
+            to_delete.extend(stale)
+
+        if self.config.get("chunk_storage") == ChunkStorage.OFFSETS.value:
+            from ctxvault.storage.text_cache import get_text_cache
+
+            removed = set(to_delete)
+            referenced = {metadata["text_key"] for chunk_id, metadata in zip(stored.get("ids") or [], stored.get("metadatas") or []) if chunk_id not in removed and "text_key" in metadata}
+            report.unused_texts = get_text_cache(self.config["db_path"]).prune(keep=referenced, dry_run=dry_run)
+
+        if dry_run or not to_delete:
+            report.bytes_after = report.bytes_before
+            return report
+
+        probe = chroma_store.get_sample_embedding(config=self.config)
+        report.query_ms_before = self._probe_query_ms(probe)
+        chroma_store.delete_chunks(ids=to_delete, config=self.config)
+        get_bm25_index(self.config["db_path"]).delete_chunks(ids=to_delete)
+        self._update_manifest(removed=report.missing_sources)
+        chroma_store.compact(config=self.config)
+        report.removed_chunks = len(to_delete)
+        report.query_ms_after = self._probe_query_ms(probe)
+        report.bytes_after = chroma_store.disk_usage(config=self.config)
+        return report
+
     def list_documents(self) -> list[SemanticDocumentInfo]:
         from ctxvault.core import querying
         return querying.list_documents(config=self.config)
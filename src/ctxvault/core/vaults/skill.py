@@ -1,11 +1,13 @@
 import json
 from pathlib import Path
 from ctxvault.core.exceptions import SkillNotFoundError
-from ctxvault.models.vaults import SkillInput, SkillOutput, VaultOperation
-import frontmatter
+from ctxvault.models.skills import SkillInput, SkillOutput
+from ctxvault.models.vaults import VaultOperation
 from datetime import datetime
 from ctxvault.core.vaults.base import BaseVault
 from ctxvault.models.documents import SkillDocumentInfo
+from ctxvault.core.pipeline import ProgressCallback
+from ctxvault.models.indexing import IndexStats
 
 INDEX_FILE = "skills-index.json"
 
@@ -31,6 +33,8 @@ class SkillVault(BaseVault):
 
     def _rebuild_index(self) -> tuple[dict, list[str]]:
         """Scan all .md files and rebuild index. Returns (index, conflicts)."""
+        import frontmatter
+
         index = {}
         conflicts = []
 
@@ -52,7 +56,7 @@ class SkillVault(BaseVault):
 
         return index, conflicts
 
-    def index_files(self, path: str | None = None) -> tuple[list[str], list[str]]:
+    def index_files(self, path: str | None = None, workers: int = 1, stats: IndexStats | None = None, extract_workers: int = 1, progress: ProgressCallback | None = None, retry_failed: bool = False) -> tuple[list[str], list[str]]:
         index, conflicts = self._rebuild_index()
         self._save_index(index)
         indexed = [v["file"] for v in index.values()]
@@ -60,6 +64,8 @@ class SkillVault(BaseVault):
         return indexed, skipped
 
     def read_skill(self, skill_name: str) -> SkillOutput:
+        import frontmatter
+
         index = self._load_index()
         entry = index.get(skill_name.lower())
         if not entry:
@@ -76,6 +82,8 @@ class SkillVault(BaseVault):
         )
 
     def write_skill(self, skill: SkillInput, overwrite: bool = True) -> str:
+        import frontmatter
+
         post = frontmatter.Post(skill.instructions, name=skill.name, description=skill.description)
         content = frontmatter.dumps(post)
         filename = f"{skill.name.lower().replace(' ', '-')}.md"
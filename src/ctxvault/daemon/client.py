@@ -0,0 +1,63 @@
+import base64
+import json
+import socket
+from pathlib import Path
+from ctxvault.core.exceptions import DaemonError
+
+SOCKET_FILE = "daemon.sock"
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 300.0
+
+def socket_path()-> Path:
+    from ctxvault.utils import config
+    return config.GLOBAL_DIR / SOCKET_FILE
+
+def available()-> bool:
+    return socket_path().exists()
+
+def encode_array(array)-> dict:
+    import numpy as np
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {"shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+def decode_array(payload: dict):
+    import numpy as np
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+def request(op: str, timeout: float = REQUEST_TIMEOUT, **payload)-> dict:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(socket_path()))
+            sock.settimeout(timeout)
+            sock.sendall((json.dumps({"op": op, **payload}) + "\n").encode())
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError as e:
+        raise DaemonError(f"Daemon not reachable at {socket_path()}: {e}")
+
+    if not line:
+        raise DaemonError("Daemon closed the connection without answering.")
+    response = json.loads(line)
+    if not response.pop("ok", False):
+        raise DaemonError(response.get("error", "Unknown daemon error."))
+    return response
+
+def ping()-> dict | None:
+    if not socket_path().exists():
+        return None
+    try:
+        return request("ping", timeout=CONNECT_TIMEOUT)
+    except DaemonError:
+        return None
+
+def embed(texts: list[str], backend: str | None = None)-> tuple:
+    """Embed index chunks in the daemon; returns the vectors and the IndexStats fields counted for them."""
+    response = request("embed", texts=texts, backend=backend)
+    return decode_array(response["vectors"]), response["stats"]
+
+def query(query_txt: str, config: dict, n_results: int = 5, filters: dict | None = None, mode: str = "vector")-> dict:
+    return request("query", text=query_txt, config=config, n_results=n_results, filters=filters, mode=mode)["result"]
+
+def shutdown()-> None:
+    request("shutdown", timeout=CONNECT_TIMEOUT)
@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from ctxvault.daemon import client
+
+logger = logging.getLogger(__name__)
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = {"ok": True, **self.server.dispatch(json.loads(line))}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Resident process holding the embedding model and open Chroma collections.
+
+    Clients talk to it over a Unix socket with one JSON object per line. Query
+    texts go through the embedding scheduler and the query cache, so concurrent
+    CLI and MCP processes share warm state instead of each loading the model.
+    Index chunks sent with "embed" go through the embedding cache, and the
+    reply carries the embedding counters of the request.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+        self.started_at = time.time()
+
+    def dispatch(self, request: dict)-> dict:
+        from ctxvault.core import embedding, querying
+        from ctxvault.storage import chroma_store
+
+        op = request.get("op")
+        if op == "ping":
+            return {"pid": os.getpid(), "uptime": time.time() - self.started_at, "backends": sorted(embedding._models), "query_cache": querying.query_cache.stats()}
+
+        if op == "embed":
+            from ctxvault.models.indexing import IndexStats
+
+            # Index chunks, never queries: they use the embedding cache and
+            # stay out of the query cache, whatever their number.
+            stats = IndexStats()
+            vectors = embedding.embed_list(chunks=request["texts"], backend=request.get("backend"), stats=stats)
+            return {"vectors": client.encode_array(vectors), "stats": stats.model_dump(exclude={"padding_ratio"})}
+
+        if op == "query":
+            config = request["config"]
+            chroma_store.reload_if_changed(config=config)
+            result = querying.query(query_txt=request["text"], config=config, n_results=request.get("n_results", 5), filters=request.get("filters"), forward=False, mode=request.get("mode", "vector"))
+            return {"result": {key: result[key] for key in ("ids", "documents", "metadatas", "distances", "fused_scores") if key in result}}
+
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {}
+
+        raise ValueError(f"Unknown operation: {op}")
+
+def serve(backend: str | None = None)-> None:
+    from ctxvault.core import vault_router
+    from ctxvault.core.embedding_scheduler import scheduler
+    from ctxvault.core.exceptions import DaemonError
+
+    if client.ping() is not None:
+        raise DaemonError(f"A daemon is already running at {client.socket_path()}.")
+
+    path = client.socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    vault_router.warmup(backend=backend)
+    scheduler.start()
+    server = DaemonServer(str(path))
+    logger.info("ctxvault daemon listening on %s", path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        scheduler.stop()
+        path.unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", type=str, default=None)
+    logging.basicConfig(level=logging.INFO)
+    serve(backend=parser.parse_args().backend)
@@ -1,7 +1,9 @@
 from ctxvault.api.schemas import *
 from ctxvault.core import vault_router
+from ctxvault.core.embedding_scheduler import scheduler
 from ctxvault.core.exceptions import *
-from ctxvault.models.vaults import SkillInput
+from ctxvault.daemon import client as daemon_client
+from ctxvault.models.skills import SkillInput
 from mcp.server.fastmcp import FastMCP
 from datetime import datetime, timezone
 from contextlib import asynccontextmanager
@@ -20,6 +22,7 @@ args, _ = parser.parse_known_args()
 async def lifespan(server):
     logger.info("ctxvault MCP server starting...")
     
+    scheduler.start()
     warmup_task = asyncio.create_task(async_warmup())
     
     yield
@@ -27,6 +30,7 @@ async def lifespan(server):
     logger.info("ctxvault MCP server shutting down...")
     if not warmup_task.done():
         warmup_task.cancel()
+    scheduler.stop()
 
 AGENT_ID = args.agent
 
@@ -36,6 +40,11 @@ warmup_complete = asyncio.Event()
 
 async def async_warmup():
     try:
+        if await asyncio.to_thread(daemon_client.ping) is not None:
+            warmup_complete.set()
+            logger.info("ctxvault daemon is running — skipping in-process warm-up")
+            return
+
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(None, vault_router.warmup)
         warmup_complete.set()
@@ -83,19 +92,19 @@ def check_access(vault_name: str, agent_name: str):
     if not vault_router.is_agent_authorized(vault_name, agent_name):
         raise PermissionError(f"Agent '{agent_name}' is not authorized to access vault '{vault_name}'")
 
-@mcp.tool(description="Search for relevant information in a CtxVault vault using semantic similarity. Use this when the user asks a question that might be answered by their personal knowledge base or documents. Returns the most relevant text chunks with their source files.")
-async def query(vault_name: str, query: str) -> QueryResponse:
+@mcp.tool(description="Search for relevant information in a CtxVault vault using semantic similarity. Use this when the user asks a question that might be answered by their personal knowledge base or documents. Set mode to 'hybrid' to also match exact keywords, such as identifiers, error codes or names. Returns the most relevant text chunks with their source files.")
+async def query(vault_name: str, query: str, mode: str = "vector") -> QueryResponse:
     await ensure_warmup()
     
     try:
         check_access(vault_name, AGENT_ID)
-        result = vault_router.query(vault_name=vault_name, text=query, filters=None)
+        result = await asyncio.to_thread(vault_router.query, vault_name=vault_name, text=query, filters=None, mode=mode)
         return QueryResponse(results=result.results)
     except VaultNotFoundError:
         raise ValueError(f"Vault '{vault_name}' does not exist.")
     except EmptyQueryError:
         raise ValueError("Query text cannot be empty.")
-    except UnsupportedVaultOperationError as e:
+    except (UnsupportedVaultOperationError, QueryModeNotValidError) as e:
         raise ValueError(e)
 
 @mcp.tool(description="Save new information or agent-generated content to a semantic vault for future retrieval. Use this only with semantic vaults, to persist important context, summaries, or notes that should be remembered across sessions. Supports .txt, .md, and .docx formats.")
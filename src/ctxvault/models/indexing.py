@@ -0,0 +1,47 @@
+from pydantic import BaseModel, computed_field
+
+class IndexStats(BaseModel):
+    files_total: int = 0
+    files_done: int = 0
+    new_files: int = 0
+    changed_files: int = 0
+    unchanged_files: int = 0
+    removed_files: int = 0
+    chunks: int = 0
+    cached_chunks: int = 0
+    reused_chunks: int = 0
+    batches: int = 0
+    tokens: int = 0
+    padding_tokens: int = 0
+
+    @computed_field
+    @property
+    def padding_ratio(self)-> float:
+        total = self.tokens + self.padding_tokens
+        return self.padding_tokens / total if total else 0.0
+
+    def record_batch(self, lengths: list[int])-> None:
+        self.batches += 1
+        self.tokens += int(sum(lengths))
+        self.padding_tokens += int(max(lengths)) * len(lengths) - int(sum(lengths))
+
+    def merge(self, other: "IndexStats")-> None:
+        self.chunks += other.chunks
+        self.cached_chunks += other.cached_chunks
+        self.batches += other.batches
+        self.tokens += other.tokens
+        self.padding_tokens += other.padding_tokens
+
+class FsckReport(BaseModel):
+    chunks: int = 0
+    orphan_chunks: int = 0
+    stale_chunks: int = 0
+    removed_chunks: int = 0
+    # Cached texts no chunk refers to any more, in vaults storing chunk offsets.
+    unused_texts: int = 0
+    missing_sources: list[str] = []
+    unreadable_sources: list[str] = []
+    bytes_before: int = 0
+    bytes_after: int = 0
+    query_ms_before: float | None = None
+    query_ms_after: float | None = None
@@ -0,0 +1,36 @@
+import time
+from enum import Enum
+from pydantic import BaseModel, Field, computed_field
+from ctxvault.models.indexing import IndexStats
+
+class JobKind(str, Enum):
+    INDEX = "index"
+    REINDEX = "reindex"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobInfo(BaseModel):
+    id: str
+    kind: JobKind
+    vault_name: str
+    path: str | None = None
+    status: JobStatus = JobStatus.QUEUED
+    stats: IndexStats = Field(default_factory=IndexStats)
+    processed_files: list[str] = []
+    skipped_files: list[str] = []
+    error: str | None = None
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @computed_field
+    @property
+    def eta_seconds(self)-> float | None:
+        if self.status != JobStatus.RUNNING or not self.stats.files_done or not self.stats.files_total:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed / self.stats.files_done * (self.stats.files_total - self.stats.files_done)
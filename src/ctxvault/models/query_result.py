@@ -4,9 +4,13 @@ class ChunkMatch(BaseModel):
     chunk_id: str
     chunk_index: int
     text: str
-    score: float
+    # Vector distance, lower is better; None for a hybrid hit found only by keyword.
+    score: float | None
+    # Reciprocal rank fusion score of a hybrid query, higher is better.
+    fused_score: float | None = None
     doc_id: str
     source: str
+    page: int | None = None
     generated_by: str | None = None
     artifact_type: str | None = None
     topic: str | None = None
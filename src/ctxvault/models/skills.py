@@ -0,0 +1,14 @@
+from pathlib import Path
+from pydantic import BaseModel
+
+class SkillInput(BaseModel):
+    name: str
+    description: str
+    instructions: str
+    
+class SkillOutput(BaseModel):
+    name: str
+    description: str
+    instructions: str
+    metadata: str | None
+    path: Path
\ No newline at end of file
@@ -1,6 +1,4 @@
 from enum import Enum
-from pathlib import Path
-from pydantic import BaseModel
 
 class VaultType(Enum):
     SEMANTIC = "semantic"
@@ -10,6 +8,30 @@ class VaultType(Enum):
     def list(cls):
         return [v.value for v in cls]
     
+class ChunkingMode(str, Enum):
+    WORDS = "words"
+    TOKENS = "tokens"
+
+    @classmethod
+    def list(cls):
+        return [v.value for v in cls]
+
+class ChunkStorage(str, Enum):
+    TEXT = "text"
+    OFFSETS = "offsets"
+
+    @classmethod
+    def list(cls):
+        return [v.value for v in cls]
+
+class QueryMode(str, Enum):
+    VECTOR = "vector"
+    HYBRID = "hybrid"
+
+    @classmethod
+    def list(cls):
+        return [v.value for v in cls]
+
 class VaultOperation(str, Enum):
     INDEX = "index"
     QUERY = "query"
@@ -20,15 +42,4 @@ class VaultOperation(str, Enum):
     LIST_DOCUMENTS = "list_documents"
     LIST_SKILLS = "list_skills"
     READ_SKILL = "read_skill"
-
-class SkillInput(BaseModel):
-    name: str
-    description: str
-    instructions: str
-    
-class SkillOutput(BaseModel):
-    name: str
-    description: str
-    instructions: str
-    metadata: str | None
-    path: Path
\ No newline at end of file
+    FSCK = "fsck"
@@ -0,0 +1,140 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+INDEX_FILE = "bm25.sqlite3"
+# Okapi BM25 parameters: term frequency saturation and length normalization.
+K1 = 1.2
+B = 0.75
+
+_indexes: dict[str, "BM25Index"] = {}
+_indexes_lock = threading.Lock()
+
+_TERM = re.compile(r"\w+")
+
+def tokenize(text: str)-> list[str]:
+    """Lowercased runs of word characters, so identifiers like ERR_CONN_RESET stay one term."""
+    return _TERM.findall(text.lower())
+
+class BM25Index:
+    """Persistent inverted index of a vault's chunks, scored with Okapi BM25.
+
+    Postings are stored per (term, chunk rowid) with the chunk's length,
+    clustered by term, so a query reads only the postings of its own terms
+    and scores them in SQL. The connection is shared by every thread, so each
+    write method runs as one transaction under the index lock and commits
+    before returning: no caller's changes are left open for another caller to
+    commit or roll back. The indexer batches its documents into one
+    replace_documents call per vector store flush.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Postings are inserted in term order, scattered over the table: a larger
+        # page cache (in KiB, grown on demand) keeps those inserts off the disk.
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, chunk_id TEXT NOT NULL UNIQUE, doc_id TEXT NOT NULL, length INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks (doc_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, chunk INTEGER NOT NULL, tf INTEGER NOT NULL, length INTEGER NOT NULL, "
+            "PRIMARY KEY (term, chunk)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_chunk ON postings (chunk)")
+        self._conn.commit()
+
+    def __len__(self)-> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self)-> Iterator[sqlite3.Connection]:
+        """Hold the lock for one write transaction, committed on success and rolled back on error."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _delete(self, where: str, params: tuple)-> None:
+        self._conn.execute(f"DELETE FROM postings WHERE chunk IN (SELECT id FROM chunks WHERE {where})", params)
+        self._conn.execute(f"DELETE FROM chunks WHERE {where}", params)
+
+    def replace_documents(self, documents: list[tuple[str, list[str], list[str]]])-> None:
+        """Replace every chunk indexed for each (doc_id, chunk_ids, chunks), in a single transaction."""
+        counts = [[Counter(tokenize(chunk)) for chunk in chunks] for _, _, chunks in documents]
+
+        with self._transaction() as conn:
+            for (doc_id, chunk_ids, _), doc_counts in zip(documents, counts):
+                self._delete("doc_id = ?", (doc_id,))
+                for chunk_id, terms in zip(chunk_ids, doc_counts):
+                    length = sum(terms.values())
+                    # Replacing the row drops any postings left under the chunk's old rowid.
+                    self._delete("chunk_id = ?", (chunk_id,))
+                    rowid = conn.execute(
+                        "INSERT INTO chunks (chunk_id, doc_id, length) VALUES (?, ?, ?)", (chunk_id, doc_id, length)
+                    ).lastrowid
+                    conn.executemany(
+                        "INSERT INTO postings (term, chunk, tf, length) VALUES (?, ?, ?, ?)",
+                        [(term, rowid, tf, length) for term, tf in terms.items()],
+                    )
+
+    def delete_document(self, doc_id: str)-> None:
+        with self._transaction():
+            self._delete("doc_id = ?", (doc_id,))
+
+    def delete_chunks(self, ids: list[str])-> None:
+        with self._transaction():
+            for chunk_id in ids:
+                self._delete("chunk_id = ?", (chunk_id,))
+
+    def search(self, text: str, n_results: int = 5)-> list[tuple[str, float]]:
+        """Return up to n_results (chunk_id, score) pairs, best first."""
+        terms = sorted(set(tokenize(text)))
+        if not terms:
+            return []
+
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunks").fetchone()
+            if not count:
+                return []
+            marks = ", ".join("?" * len(terms))
+            frequencies = dict(self._conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", terms
+            ).fetchall())
+            if not frequencies:
+                return []
+            params = {"k1": K1, "b": B, "avgdl": max(total / count, 1), "limit": n_results}
+            for i, (term, df) in enumerate(frequencies.items()):
+                params[f"term{i}"] = term
+                params[f"idf{i}"] = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            values = ", ".join(f"(:term{i}, :idf{i})" for i in range(len(frequencies)))
+            return self._conn.execute(
+                f"WITH query (term, idf) AS (VALUES {values}) "
+                "SELECT c.chunk_id, s.score FROM ("
+                "SELECT p.chunk, SUM(q.idf * p.tf * (:k1 + 1) / (p.tf + :k1 * (1 - :b + :b * p.length / :avgdl))) AS score "
+                "FROM query q JOIN postings p ON p.term = q.term "
+                "GROUP BY p.chunk ORDER BY score DESC LIMIT :limit"
+                ") s JOIN chunks c ON c.id = s.chunk ORDER BY s.score DESC",
+                params,
+            ).fetchall()
+
+    def clear(self)-> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM postings")
+            conn.execute("DELETE FROM chunks")
+
+def get_bm25_index(db_path: str)-> BM25Index:
+    path = str(Path(db_path) / INDEX_FILE)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = BM25Index(path=path)
+        return _indexes[path]
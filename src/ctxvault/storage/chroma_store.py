@@ -1,22 +1,103 @@
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
 from chromadb import PersistentClient, Settings
 
+# Chunks buffered by UpsertBuffer before each write; lowered to the client's
+# max batch size when that is smaller.
+UPSERT_BATCH_SIZE = 1024
+
 _clients: dict[str, PersistentClient] = {}
 _collections: dict[str, object] = {}
+_opened_at: dict[str, int] = {}
+_stores_lock = threading.Lock()
+
+class _ReadWriteLock:
+    """Shared by readers, exclusive for a writer; a waiting writer holds off new readers."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writers = 0
+
+    @contextmanager
+    def read(self)-> Iterator[None]:
+        with self._condition:
+            self._condition.wait_for(lambda: not self._writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def write(self)-> Iterator[None]:
+        with self._condition:
+            self._writers += 1
+            self._condition.wait_for(lambda: not self._readers)
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writers -= 1
+                self._condition.notify_all()
+
+_store_locks: dict[str, _ReadWriteLock] = {}
+
+def _store_lock(db_path: str)-> _ReadWriteLock:
+    with _stores_lock:
+        return _store_locks.setdefault(db_path, _ReadWriteLock())
+
+def _db_mtime(db_path: str)-> int:
+    try:
+        return os.stat(os.path.join(db_path, "chroma.sqlite3")).st_mtime_ns
+    except OSError:
+        return 0
 
 def _get_collection(db_path: str):
-    if db_path not in _collections:
-        client = PersistentClient(
-            path=db_path,
-            settings=Settings(anonymized_telemetry=False)
-        )
-        _clients[db_path] = client
-        _collections[db_path] = client.get_or_create_collection("ctxvault")
-    return _collections[db_path]
+    with _stores_lock:
+        if db_path not in _collections:
+            client = PersistentClient(
+                path=db_path,
+                settings=Settings(anonymized_telemetry=False)
+            )
+            _clients[db_path] = client
+            _collections[db_path] = client.get_or_create_collection("ctxvault")
+            _opened_at[db_path] = _db_mtime(db_path)
+        return _collections[db_path]
+
+def reload_if_changed(config: dict)-> bool:
+    """Close this store's cached client when another process wrote to it since it was opened.
+
+    A client keeps its vector index in memory and does not see writes made by
+    other processes, so long-lived processes call this before serving reads.
+    The client is closed under the store's write lock, after the queries
+    running on it have finished; other stores are left open.
+    """
+    db_path = config["db_path"]
+    if db_path not in _collections or _db_mtime(db_path) == _opened_at.get(db_path):
+        return False
+
+    with _store_lock(db_path).write():
+        with _stores_lock:
+            if db_path not in _collections or _db_mtime(db_path) == _opened_at.get(db_path):
+                return False
+            client = _clients.pop(db_path)
+            del _collections[db_path]
+            del _opened_at[db_path]
+        client.close()
+    return True
 
 def get_collection(config: dict):
     return _get_collection(config["db_path"])
 
-def add_document(ids: list[str], embeddings: list[list[float]], metadatas: list[dict], chunks: list[str], config: dict):
+def add_document(ids: list[str], embeddings: np.ndarray | list[list[float]], metadatas: list[dict], chunks: list[str] | None, config: dict):
+    """Upsert chunks; with chunks=None only vectors and metadata are stored."""
     collection = get_collection(config=config)
     collection.upsert(
         ids=ids, 
@@ -25,14 +106,81 @@ def add_document(ids: list[str], embeddings: list[list[float]], metadatas: list[
         documents=chunks
     )
 
-def query(query_embedding: list[float], config: dict, n_results: int = 5, filters: dict | None = None)-> dict:
+class UpsertBuffer:
+    """Accumulate chunk upserts across documents and write them in large batches.
+
+    Each upsert pays for a SQLite transaction and an HNSW update, so writing
+    thousands of small documents one by one is dominated by that overhead.
+    Callers flush() when the buffer is full and once more after the last
+    document; each write is capped by the client's max batch size.
+    """
+
+    def __init__(self, config: dict, batch_size: int = UPSERT_BATCH_SIZE):
+        get_collection(config=config)
+        self.config = config
+        self.batch_size = min(batch_size, _clients[config["db_path"]].get_max_batch_size())
+        self.ids: list[str] = []
+        self.embeddings: list[np.ndarray] = []
+        self.metadatas: list[dict] = []
+        self.chunks: list[str] = []
+
+    def __len__(self)-> int:
+        return len(self.ids)
+
+    @property
+    def full(self)-> bool:
+        return len(self.ids) >= self.batch_size
+
+    def add(self, ids: list[str], embeddings: np.ndarray | list[list[float]], metadatas: list[dict], chunks: list[str] | None)-> None:
+        self.ids.extend(ids)
+        self.embeddings.append(np.asarray(embeddings, dtype=np.float32))
+        self.metadatas.extend(metadatas)
+        if chunks is not None:
+            self.chunks.extend(chunks)
+
+    def flush(self)-> None:
+        if not self.ids:
+            return
+        ids, metadatas, chunks = self.ids, self.metadatas, self.chunks
+        embeddings = np.concatenate(self.embeddings)
+        self.ids, self.embeddings, self.metadatas, self.chunks = [], [], [], []
+        for start in range(0, len(ids), self.batch_size):
+            end = start + self.batch_size
+            add_document(ids=ids[start:end], embeddings=embeddings[start:end], metadatas=metadatas[start:end], chunks=chunks[start:end] if chunks else None, config=self.config)
+
+def query(query_embedding: np.ndarray | list[list[float]], config: dict, n_results: int = 5, filters: dict | None = None)-> dict:
+    with _store_lock(config["db_path"]).read():
+        collection = get_collection(config=config)
+        results = collection.query(
+            query_embeddings=query_embedding,
+            n_results=n_results,
+            where=filters
+        )
+    return results
+
+def get_chunks(ids: list[str], config: dict, filters: dict | None = None)-> dict:
+    with _store_lock(config["db_path"]).read():
+        collection = get_collection(config=config)
+        return collection.get(
+            ids=ids,
+            where=filters,
+            include=["documents", "metadatas"]
+        )
+
+def get_document_chunks(doc_id: str, config: dict)-> dict:
     collection = get_collection(config=config)
-    results = collection.query(
-        query_embeddings=query_embedding,
-        n_results=n_results,
-        where=filters
+    return collection.get(
+        where={"doc_id": doc_id},
+        include=["metadatas", "embeddings"]
     )
-    return results
+
+def delete_chunks(ids: list[str], config: dict):
+    if not ids:
+        return
+    collection = get_collection(config=config)
+    batch_size = _clients[config["db_path"]].get_max_batch_size()
+    for start in range(0, len(ids), batch_size):
+        collection.delete(ids=ids[start:start + batch_size])
 
 def delete_document(doc_id: str, config: dict):
     collection = get_collection(config=config)
@@ -43,4 +191,25 @@ def delete_document(doc_id: str, config: dict):
 def get_all_metadatas(config: dict):
     collection = get_collection(config=config)
     results = collection.get(include=["metadatas"])
-    return results["metadatas"]
\ No newline at end of file
+    return results["metadatas"]
+
+def get_all_chunks(config: dict)-> dict:
+    collection = get_collection(config=config)
+    return collection.get(include=["metadatas"])
+
+def get_sample_embedding(config: dict)-> np.ndarray | None:
+    collection = get_collection(config=config)
+    embeddings = collection.get(limit=1, include=["embeddings"]).get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return None
+    return np.asarray(embeddings[:1], dtype=np.float32)
+
+def disk_usage(config: dict)-> int:
+    return sum(f.stat().st_size for f in Path(config["db_path"]).rglob("*") if f.is_file())
+
+def compact(config: dict)-> None:
+    """VACUUM the store's SQLite file so space freed by deletions is returned to the filesystem."""
+    from chromadb.db.impl.sqlite import SqliteDB
+
+    get_collection(config=config)
+    _clients[config["db_path"]]._system.instance(SqliteDB).vacuum()
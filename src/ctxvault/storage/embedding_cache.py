@@ -0,0 +1,102 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+CACHE_FILE = "embedding-cache.sqlite3"
+MAX_ENTRIES = 500_000
+_SQL_BATCH = 500
+
+_caches: dict[str, "EmbeddingCache"] = {}
+_caches_lock = threading.Lock()
+
+def cache_key(model_name: str, text: str)-> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode()).hexdigest()
+
+class EmbeddingCache:
+    """Content-addressed on-disk store of embedding vectors with LRU eviction.
+
+    Vectors are stored as float32 blobs keyed by cache_key(model, text). Every
+    lookup refreshes the entry's last-used time; once the cache grows beyond
+    max_entries the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Path, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def __len__(self)-> int:
+        return self._size
+
+    def get_many(self, keys: list[str])-> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        now = time.time()
+
+        with self._lock:
+            for start in range(0, len(unique_keys), _SQL_BATCH):
+                part = unique_keys[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})", [now, *part]
+                    )
+            self._conn.commit()
+
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray])-> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+
+        with self._lock:
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            ).rowcount
+            self._size += max(inserted, 0)
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self)-> None:
+        # Evict down to 90% of the budget so eviction does not run on every insert.
+        excess = self._size - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self)-> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
+
+def get_cache()-> EmbeddingCache:
+    from ctxvault.utils import config
+
+    path = str(config.GLOBAL_DIR / CACHE_FILE)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = EmbeddingCache(path=path)
+        return _caches[path]
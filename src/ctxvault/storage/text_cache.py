@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+CACHE_FILE = "text-cache.sqlite3"
+MAX_ENTRIES = 50_000
+
+_caches: dict[str, "TextCache"] = {}
+_caches_lock = threading.Lock()
+
+Segment = tuple[str, int | None]
+
+def cache_key(content_hash: str, file_type: str, extractor_version: int)-> str:
+    return f"{extractor_version}:{file_type}:{content_hash}"
+
+class TextCache:
+    """On-disk store of extracted text segments keyed by file content.
+
+    Segments are stored zlib-compressed under cache_key(content hash, file
+    type, extractor version), so a file is only parsed again when its bytes or
+    the extraction code change. Entries are evicted least recently used once
+    the cache grows beyond max_entries, unless they are put with evict=False:
+    vaults storing chunk offsets read their chunk text from here, and prune
+    the entries they no longer reference instead.
+    """
+
+    def __init__(self, path: Path, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments (key TEXT PRIMARY KEY, data BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used)")
+        self._conn.commit()
+
+    def __len__(self)-> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def get(self, key: str)-> list[Segment] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM segments WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE segments SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return [(text, page) for text, page in json.loads(zlib.decompress(row[0]))]
+
+    def put(self, key: str, segments: list[Segment], evict: bool = True)-> None:
+        data = zlib.compress(json.dumps(segments, ensure_ascii=False).encode())
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO segments (key, data, last_used) VALUES (?, ?, ?)", (key, data, time.time())
+            )
+            size = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0] if evict else 0
+            if size > self.max_entries:
+                # Evict down to 90% of the budget so eviction does not run on every insert.
+                self._conn.execute(
+                    "DELETE FROM segments WHERE key IN (SELECT key FROM segments ORDER BY last_used LIMIT ?)",
+                    (size - int(self.max_entries * 0.9),),
+                )
+            self._conn.commit()
+
+    def prune(self, keep: set[str], dry_run: bool = False)-> int:
+        """Delete every entry whose key is not in keep and return how many there were."""
+        with self._lock:
+            unused = [key for (key,) in self._conn.execute("SELECT key FROM segments") if key not in keep]
+            if not dry_run:
+                self._conn.executemany("DELETE FROM segments WHERE key = ?", [(key,) for key in unused])
+                self._conn.commit()
+        return len(unused)
+
+    def clear(self)-> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._conn.commit()
+
+def get_text_cache(db_path: str)-> TextCache:
+    path = str(Path(db_path) / CACHE_FILE)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = TextCache(path=path)
+        return _caches[path]
@@ -5,16 +5,43 @@ Three strategies are available:
 - Recursive character splitting: tries paragraph -> line -> word splits.
 - Fixed-size splitting: simple word-based windowed chunks (original algorithm).
 
-NOTE: Markdown chunking requires raw markdown input with headers intact.
-The text_extraction module for .md files currently strips markdown formatting,
-so if the text has already been processed through text_extraction, the markdown
-strategy will not find headers and will gracefully fall back to recursive splitting.
-To use markdown chunking effectively, pass raw markdown text directly.
+Markdown chunking needs the '#' headers in its input. text_extraction keeps
+them for .md files and strips only inline syntax (see markdown_to_text), so
+extracted markdown is split on its sections; text without headers falls back
+to recursive splitting.
+
+The markdown and recursive strategies find the word offsets of the text once
+(see _Words) and take every split decision on word counts over those offsets;
+the output is the same as splitting with str.split() at every level. Every
+chunk also carries its character span in the text (see ChunkSpan), which
+vaults that store offsets instead of chunk text use to slice it back out.
 """
 
 from __future__ import annotations
 
 import re
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from functools import cache, cached_property
+from typing import NamedTuple
+
+# Placed between the segments of a document when they are read as one text;
+# ChunkSpan offsets from chunk_segment_spans() index into that text.
+SEGMENT_SEPARATOR = "\n\n"
+
+
+class ChunkSpan(NamedTuple):
+    """A chunk with the character span of its body in the chunked text.
+
+    section is the markdown header hierarchy prepended to the body, or "".
+    Unlike text, text[start:end] keeps the source whitespace between the
+    pieces and words of the chunk.
+    """
+
+    text: str
+    start: int
+    end: int
+    section: str = ""
 
 
 def chunking(
@@ -22,31 +49,252 @@ def chunking(
     chunk_size: int = 400,
     overlap: int = 100,
     file_type: str | None = None,
+    tokenizer=None,
 ) -> list[str]:
     """Split text into chunks using a strategy based on file_type.
 
     Args:
         text: The input text to chunk.
-        chunk_size: Maximum number of words per chunk.
-        overlap: Number of overlapping words between consecutive fixed-size chunks.
+        chunk_size: Maximum number of words (or tokens) per chunk.
+        overlap: Number of overlapping words (or tokens) between consecutive fixed-size chunks.
         file_type: File extension (e.g. ".md", ".txt"). When None, uses recursive strategy.
+        tokenizer: A fast Hugging Face tokenizer. When given, chunk_size and overlap
+            count its tokens instead of words, and fixed-size chunks are cut at word
+            boundaries and keep the original text instead of rejoining words.
 
     Returns:
         A list of non-empty text chunks.
     """
+    return [span.text for span in chunk_spans(text, chunk_size, overlap, file_type, tokenizer)]
+
+
+def chunk_spans(
+    text: str,
+    chunk_size: int = 400,
+    overlap: int = 100,
+    file_type: str | None = None,
+    tokenizer=None,
+) -> list[ChunkSpan]:
+    """Like chunking(), with the span of each chunk in text."""
     if not text or not text.strip():
         return []
 
     if file_type == ".md":
-        return _chunk_markdown(text, chunk_size, overlap)
+        return _chunk_markdown(text, chunk_size, overlap, tokenizer)
 
     # .txt, .pdf, .docx, None, and anything else -> recursive
-    return _chunk_recursive(text, chunk_size, overlap)
+    return _chunk_recursive(text, chunk_size, overlap, tokenizer)
+
+
+def chunk_segments(
+    segments: Iterable[tuple[str, int | None]],
+    chunk_size: int = 400,
+    overlap: int = 100,
+    file_type: str | None = None,
+    tokenizer=None,
+) -> Iterator[tuple[str, int | None]]:
+    """Chunk a stream of (text, page) segments, yielding (chunk, page) as it goes.
+
+    Each segment is chunked on its own with chunking(), so only one page or
+    paragraph is held at a time. The last chunk of a segment is merged with
+    the first chunk of the next one while they fit in chunk_size, so
+    short pages and paragraphs do not become tiny chunks; a merged chunk
+    keeps the page it started on. A single segment chunks exactly like
+    chunking().
+    """
+    for span, page in chunk_segment_spans(segments, chunk_size, overlap, file_type, tokenizer):
+        yield span.text, page
+
+
+def chunk_segment_spans(
+    segments: Iterable[tuple[str, int | None]],
+    chunk_size: int = 400,
+    overlap: int = 100,
+    file_type: str | None = None,
+    tokenizer=None,
+) -> Iterator[tuple[ChunkSpan, int | None]]:
+    """Like chunk_segments(), with spans in the segments joined by SEGMENT_SEPARATOR."""
+    held: ChunkSpan | None = None
+    held_page: int | None = None
+    offset = 0
+
+    for text, page in segments:
+        chunks = [
+            (span._replace(start=span.start + offset, end=span.end + offset), page)
+            for span in chunk_spans(text, chunk_size=chunk_size, overlap=overlap, file_type=file_type, tokenizer=tokenizer)
+        ]
+        offset += len(text) + len(SEGMENT_SEPARATOR)
+        if not chunks:
+            continue
+
+        if held is not None:
+            first = chunks[0][0]
+            if _length(held.text, tokenizer) + _length(first.text, tokenizer) <= chunk_size:
+                chunks[0] = (held._replace(text=f"{held.text}\n\n{first.text}", end=first.end), held_page)
+            else:
+                yield held, held_page
+
+        yield from chunks[:-1]
+        held, held_page = chunks[-1]
+
+    if held is not None:
+        yield held, held_page
+
+
+def join_segments(segments: Iterable[tuple[str, int | None]]) -> str:
+    """The text that chunk_segment_spans() offsets index into."""
+    return SEGMENT_SEPARATOR.join(text for text, _ in segments)
+
+
+_PARAGRAPH_BREAK = re.compile(r"\n\n+")
+_LINE_BREAK = re.compile(r"\n")
+# Every code point for which str.isspace() is true lies below this bound.
+_SPACE_TABLE_SIZE = 0x3001
+
+
+@cache
+def _space_table():
+    import numpy as np
+
+    # One extra False slot for every code point past the table.
+    return np.array([chr(c).isspace() for c in range(_SPACE_TABLE_SIZE)] + [False])
+
+
+class _Words:
+    """Word offsets of a text, found in a single pass.
+
+    Words are the runs of non-whitespace that str.split() would return; they
+    are located with one vectorized scan over the code points instead of
+    splitting the text again at every level. Split decisions work on ranges
+    of word indices, paragraph and line breaks are recorded as the index of
+    the word that follows them, and the original string is only sliced when
+    a chunk is emitted.
+    """
+
+    # Whether header prefixes count against the chunk size of split sections.
+    # Word chunks keep their original sizing, where they do not.
+    reserve_prefix = False
+
+    def __init__(self, text: str):
+        import numpy as np
+
+        self.text = text
+        if text.isascii():
+            space = _space_table()[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+        else:
+            codepoints = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+            space = _space_table()[np.minimum(codepoints, _SPACE_TABLE_SIZE)]
+        # Pad with whitespace on both sides so every word has a start and an end edge.
+        edges = np.flatnonzero(np.diff(np.concatenate(([True], space, [True])).view(np.int8)))
+        self.starts = edges[0::2]
+        self.ends = edges[1::2]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _breaks(self, pattern: re.Pattern) -> list[int]:
+        import numpy as np
+
+        positions = np.fromiter((match.end() for match in pattern.finditer(self.text)), dtype=np.int64)
+        return np.unique(self.starts.searchsorted(positions)).tolist()
+
+    @cached_property
+    def paragraph_breaks(self) -> list[int]:
+        return self._breaks(_PARAGRAPH_BREAK)
+
+    @cached_property
+    def line_breaks(self) -> list[int]:
+        return self._breaks(_LINE_BREAK)
+
+    def words_in(self, start: int, end: int) -> tuple[int, int]:
+        """Indices of the words inside text[start:end]; start and end must not fall inside a word."""
+        return int(self.starts.searchsorted(start)), int(self.starts.searchsorted(end))
+
+    def split(self, breaks: list[int], i: int, j: int) -> list[tuple[int, int]]:
+        """Split words i..j at the given breaks into non-empty ranges."""
+        cuts = [i, *breaks[bisect_right(breaks, i):bisect_left(breaks, j)], j]
+        return list(zip(cuts, cuts[1:]))
+
+    def slice(self, i: int, j: int) -> str:
+        """Words i..j as they appear in the text, i.e. the stripped substring."""
+        return self.text[self.starts[i]:self.ends[j - 1]]
+
+    def span(self, ranges: list[tuple[int, int]]) -> ChunkSpan:
+        """The chunk made of consecutive word ranges, joined by blank lines."""
+        text = "\n\n".join(self.slice(a, b) for a, b in ranges)
+        return ChunkSpan(text, int(self.starts[ranges[0][0]]), int(self.ends[ranges[-1][1] - 1]))
+
+    def window_ranges(self, i: int, j: int, chunk_size: int, overlap: int) -> list[tuple[int, int]]:
+        if chunk_size <= 0:
+            return []
+        step = max(chunk_size - overlap, 1)
+        return [(w, min(w + chunk_size, j)) for w in range(i, j, step)]
+
+    def window(self, i: int, j: int) -> ChunkSpan:
+        # Each window is sliced from the text and its whitespace normalized.
+        return ChunkSpan(" ".join(self.slice(i, j).split()), int(self.starts[i]), int(self.ends[j - 1]))
+
+    def windows(self, i: int, j: int, chunk_size: int, overlap: int) -> list[ChunkSpan]:
+        return [self.window(a, b) for a, b in self.window_ranges(i, j, chunk_size, overlap)]
+
+
+class _Tokens(_Words):
+    """Token offsets of a text from a fast tokenizer, used like word offsets.
+
+    Fixed-size windows are cut at word boundaries (tokens preceded by
+    whitespace) where possible and sliced from the original text, since
+    subword tokens cannot be rejoined with spaces.
+    """
+
+    reserve_prefix = True
+
+    def __init__(self, text: str, tokenizer):
+        import numpy as np
+
+        self.text = text
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        spans = np.array(encoding["offset_mapping"], dtype=np.int64).reshape(-1, 2)
+        self.starts = spans[:, 0]
+        self.ends = spans[:, 1]
+        self.word_starts = np.flatnonzero(self.starts[1:] > self.ends[:-1]) + 1
+
+    def _word_start(self, lo: int, k: int) -> int:
+        """The last word boundary in (lo, k], or k when the word is longer than that."""
+        index = int(self.word_starts.searchsorted(k, side="right")) - 1
+        return int(self.word_starts[index]) if index >= 0 and self.word_starts[index] > lo else k
+
+    def window_ranges(self, i: int, j: int, chunk_size: int, overlap: int) -> list[tuple[int, int]]:
+        if chunk_size <= 0:
+            return []
+        step = max(chunk_size - overlap, 1)
+        ranges: list[tuple[int, int]] = []
+        start = i
+        while True:
+            end = min(start + chunk_size, j)
+            if end < j:
+                end = self._word_start(start, end)
+            ranges.append((start, end))
+            if end >= j:
+                return ranges
+            start = min(self._word_start(start, start + step), end)
+
+    def window(self, i: int, j: int) -> ChunkSpan:
+        return self.span([(i, j)])
+
+
+def _units(text: str, tokenizer=None) -> _Words:
+    return _Tokens(text, tokenizer) if tokenizer is not None else _Words(text)
+
+
+def _length(text: str, tokenizer=None) -> int:
+    if tokenizer is None:
+        return len(text.split())
+    return len(tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"])
 
 
 def _chunk_markdown(
-    text: str, chunk_size: int, overlap: int
-) -> list[str]:
+    text: str, chunk_size: int, overlap: int, tokenizer=None
+) -> list[ChunkSpan]:
     """Split markdown text on headers, preserving header hierarchy as context prefixes.
 
     Each section becomes a chunk prefixed with its full header hierarchy.
@@ -59,21 +307,23 @@ def _chunk_markdown(
     headers = list(header_pattern.finditer(text))
 
     if not headers:
-        # No markdown headers found (text may have been stripped by text_extraction).
+        # No markdown headers found.
         # Fall back to recursive strategy.
-        return _chunk_recursive(text, chunk_size, overlap)
+        return _chunk_recursive(text, chunk_size, overlap, tokenizer)
+
+    words = _units(text, tokenizer)
 
-    # Build sections: each section is (header_hierarchy_prefix, body_text)
-    sections: list[tuple[str, str]] = []
+    # Build sections: each section is (header_hierarchy_prefix, body word range, header end)
+    sections: list[tuple[str, tuple[int, int], int]] = []
 
     # Track the current header stack for hierarchy context
     # Each entry is (level, header_text)
     header_stack: list[tuple[int, str]] = []
 
     # Collect any text before the first header as a preamble
-    preamble = text[: headers[0].start()].strip()
-    if preamble:
-        sections.append(("", preamble))
+    preamble = words.words_in(0, headers[0].start())
+    if preamble[1] > preamble[0]:
+        sections.append(("", preamble, 0))
 
     for i, match in enumerate(headers):
         level = len(match.group(1))
@@ -86,43 +336,48 @@ def _chunk_markdown(
         # Build the hierarchy prefix from the stack
         hierarchy_prefix = " > ".join(txt for _, txt in header_stack)
 
-        # Extract body text between this header and the next header (or end of text)
-        body_start = match.end()
+        # Body words between this header and the next header (or end of text)
         body_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
-        body = text[body_start:body_end].strip()
+        sections.append((hierarchy_prefix, words.words_in(match.end(), body_end), match.end()))
 
-        sections.append((hierarchy_prefix, body))
+    chunks: list[ChunkSpan] = []
 
-    chunks: list[str] = []
-
-    for prefix, body in sections:
+    for prefix, (start, end), header_end in sections:
+        # A section without body words has an empty span right after its header
+        span = words.span([(start, end)]) if end > start else ChunkSpan("", header_end, header_end)
+        body = words.slice(start, end) if end > start else ""
         if prefix:
             section_text = f"{prefix}\n{body}" if body else prefix
         else:
             section_text = body
 
-        word_count = len(section_text.split())
+        prefix_count = _length(prefix, tokenizer)
+        word_count = prefix_count + end - start
 
         if word_count <= chunk_size:
             if section_text.strip():
-                chunks.append(section_text.strip())
+                chunks.append(span._replace(text=section_text.strip(), section=prefix))
         else:
             # Section too large; split body with recursive strategy and prepend prefix
-            sub_chunks = _chunk_recursive(body if body else section_text, chunk_size, overlap)
+            budget = max(chunk_size - prefix_count, 1) if words.reserve_prefix else chunk_size
+            if body:
+                sub_chunks = _chunk_words(words, start, end, budget, overlap)
+            else:
+                sub_chunks = [span._replace(text=sub.text) for sub in _chunk_recursive(section_text, budget, overlap, tokenizer)]
             for sub in sub_chunks:
                 if prefix:
-                    chunk = f"{prefix}\n{sub}"
+                    chunk = f"{prefix}\n{sub.text}"
                 else:
-                    chunk = sub
+                    chunk = sub.text
                 if chunk.strip():
-                    chunks.append(chunk.strip())
+                    chunks.append(sub._replace(text=chunk.strip(), section=prefix))
 
     return chunks
 
 
 def _chunk_recursive(
-    text: str, chunk_size: int, overlap: int
-) -> list[str]:
+    text: str, chunk_size: int, overlap: int, tokenizer=None
+) -> list[ChunkSpan]:
     """Recursively split text by paragraphs, then lines, then words.
 
     Tries splitting by double newlines (paragraphs) first. If any resulting piece
@@ -132,56 +387,66 @@ def _chunk_recursive(
     if not text or not text.strip():
         return []
 
-    # If the entire text fits, return it as a single chunk
-    if len(text.split()) <= chunk_size:
-        return [text.strip()]
+    words = _units(text, tokenizer)
+    return _chunk_words(words, 0, len(words), chunk_size, overlap)
 
-    # Step 1: split by paragraphs
-    paragraphs = [p.strip() for p in re.split(r"\n\n+", text) if p.strip()]
 
-    pieces = _merge_pieces(paragraphs, chunk_size)
+def _chunk_words(
+    words: _Words, i: int, j: int, chunk_size: int, overlap: int
+) -> list[ChunkSpan]:
+    """The recursive strategy over words i..j, deciding every split on word counts."""
+    # Text the tokenizer drops entirely (zero-width or control characters) has no words
+    if j <= i:
+        return []
 
-    # Step 2: any piece still too large -> split by lines
-    refined: list[str] = []
-    for piece in pieces:
-        if len(piece.split()) <= chunk_size:
-            refined.append(piece)
-        else:
-            lines = [ln.strip() for ln in piece.split("\n") if ln.strip()]
-            refined.extend(_merge_pieces(lines, chunk_size))
-
-    # Step 3: any piece still too large -> fixed-size word split
-    final: list[str] = []
-    for piece in refined:
-        if len(piece.split()) <= chunk_size:
-            final.append(piece)
-        else:
-            final.extend(_chunk_fixed(piece, chunk_size, overlap))
+    # If the entire range fits, return it as a single chunk
+    if j - i <= chunk_size:
+        return [words.span([(i, j)])]
+
+    chunks: list[ChunkSpan] = []
 
-    return [c for c in final if c.strip()]
+    # Step 1: split by paragraphs
+    for pieces in _merge_ranges(words.split(words.paragraph_breaks, i, j), chunk_size):
+        if pieces[-1][1] - pieces[0][0] <= chunk_size:
+            chunks.append(words.span(pieces))
+            continue
+
+        # Step 2: piece still too large -> split by lines
+        lines = [line for a, b in pieces for line in words.split(words.line_breaks, a, b)]
+        for merged in _merge_ranges(lines, chunk_size):
+            start, end = merged[0][0], merged[-1][1]
+            if end - start <= chunk_size:
+                chunks.append(words.span(merged))
+            else:
+                # Step 3: still too large -> fixed-size word split
+                chunks.extend(words.windows(start, end, chunk_size, overlap))
+
+    return chunks
 
 
-def _merge_pieces(pieces: list[str], chunk_size: int) -> list[str]:
-    """Merge small consecutive pieces together up to chunk_size words.
+def _merge_ranges(
+    ranges: list[tuple[int, int]], chunk_size: int
+) -> list[list[tuple[int, int]]]:
+    """Merge small consecutive word ranges together up to chunk_size words.
 
-    Greedily combines pieces so that each merged chunk stays within the word limit.
+    Greedily groups ranges so that each group stays within the word limit; a
+    range that is larger on its own forms a group by itself.
     """
-    merged: list[str] = []
-    current: list[str] = []
+    merged: list[list[tuple[int, int]]] = []
+    current: list[tuple[int, int]] = []
     current_words = 0
 
-    for piece in pieces:
-        piece_words = len(piece.split())
-        if current and current_words + piece_words > chunk_size:
-            merged.append("\n\n".join(current))
-            current = [piece]
-            current_words = piece_words
+    for a, b in ranges:
+        if current and current_words + b - a > chunk_size:
+            merged.append(current)
+            current = [(a, b)]
+            current_words = b - a
         else:
-            current.append(piece)
-            current_words += piece_words
+            current.append((a, b))
+            current_words += b - a
 
     if current:
-        merged.append("\n\n".join(current))
+        merged.append(current)
 
     return merged
 
@@ -194,13 +459,5 @@ def _chunk_fixed(
     This is the original chunking algorithm, retained as an internal fallback.
     Splits text into windows of chunk_size words, stepping by (chunk_size - overlap).
     """
-    words = text.split()
-    if not words:
-        return []
-
-    step = max(chunk_size - overlap, 1)
-    chunks = [
-        " ".join(words[i : i + chunk_size])
-        for i in range(0, len(words), step)
-    ]
-    return [c for c in chunks if c.strip()]
+    words = _Words(text)
+    return [window.text for window in words.windows(0, len(words), chunk_size, overlap)]
@@ -2,7 +2,7 @@ from pathlib import Path
 import json
 import shutil
 from ctxvault.core.exceptions import VaultAlreadyExistsError, VaultNotFoundError, MissingAgentNameError
-from ctxvault.models.vaults import VaultType
+from ctxvault.models.vaults import ChunkingMode, ChunkStorage, VaultType
 
 CTXVAULT_DIR_NAME = ".ctxvault"
 GLOBAL_DIR = Path.home() / CTXVAULT_DIR_NAME
@@ -59,7 +59,7 @@ def _get_vault_scope(vault_name: str, global_config: dict, local_config: dict) -
         return "global"
     return None
 
-def create_vault(vault_name: str, vault_type: VaultType, restricted: bool, vault_path: str | None, global_vault: bool = False) -> tuple[str, str]:
+def create_vault(vault_name: str, vault_type: VaultType, restricted: bool, vault_path: str | None, global_vault: bool = False, embedding_backend: str | None = None, chunking: ChunkingMode = ChunkingMode.TOKENS, chunk_storage: ChunkStorage = ChunkStorage.TEXT) -> tuple[str, str]:
     if global_vault:
         global_config, _, _ = _load_config()
         config = global_config
@@ -96,6 +96,15 @@ def create_vault(vault_name: str, vault_type: VaultType, restricted: bool, vault
         "allowed_agents": []
     }
 
+    if vault_type == VaultType.SEMANTIC and embedding_backend:
+        config["vaults"][vault_name]["embedding_backend"] = embedding_backend
+
+    if vault_type == VaultType.SEMANTIC:
+        config["vaults"][vault_name]["chunking"] = chunking.value
+
+    if vault_type == VaultType.SEMANTIC and chunk_storage != ChunkStorage.TEXT:
+        config["vaults"][vault_name]["chunk_storage"] = chunk_storage.value
+
     _save_config(data=config, root=save_root)
     return str(vault_path_abs), str(_config_file(save_root))
 
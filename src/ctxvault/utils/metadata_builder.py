@@ -1,6 +1,6 @@
 from ctxvault.core.identifiers import get_chunk_id
 
-def build_chunks_metadatas(doc_id: str, chunks_size: int, source: str, filetype: str, agent_metadata: dict | None = None)-> tuple[list[str], list[dict]]:
+def build_chunks_metadatas(doc_id: str, chunks_size: int, source: str, filetype: str, agent_metadata: dict | None = None, chunk_hashes: list[str] | None = None, pages: list[int | None] | None = None, locations: list[dict] | None = None)-> tuple[list[str], list[dict]]:
     chunk_ids = []
     metadatas = []
 
@@ -15,6 +15,12 @@ def build_chunks_metadatas(doc_id: str, chunks_size: int, source: str, filetype:
                 "source": source,
                 "filetype": filetype,
             })
+        if chunk_hashes:
+            metadatas[-1]["chunk_hash"] = chunk_hashes[i]
+        if pages and pages[i] is not None:
+            metadatas[-1]["page"] = pages[i]
+        if locations:
+            metadatas[-1].update(locations[i])
         if agent_metadata:
             metadatas[-1].update(agent_metadata)
     
@@ -1,12 +1,12 @@
-from pypdf import PdfReader
-from docx import Document
-import markdown
-from strip_tags import strip_tags
+from collections.abc import Iterator
 from pathlib import Path, PurePosixPath
 from ctxvault.core.exceptions import UnsupportedFileTypeError, ExtractionError
 import hashlib
+import re
 
 SUPPORTED_EXT = {'.txt', '.md', '.pdf', '.docx'}
+# Bump whenever extraction output changes, so cached text is extracted again.
+EXTRACTOR_VERSION = 3
 
 def _extract_from_txt(path: str)->str:
     try:
@@ -16,15 +16,91 @@ def _extract_from_txt(path: str)->str:
     except Exception as e:
         raise ExtractionError(f"Failed to extract .txt {path}: {e}")
 
+_FENCE = re.compile(r"^\s{0,3}(```+|~~~+)")
+_FRONT_MATTER = re.compile(r"\A---[ \t]*\r?\n.*?^(?:---|\.\.\.)[ \t]*$\n?", re.DOTALL | re.MULTILINE)
+_ATX_HEADER = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_SETEXT_UNDERLINE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+_THEMATIC_BREAK = re.compile(r"^\s{0,3}([-*_])(?:\s*\1){2,}\s*$")
+_TABLE_DELIMITER = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_LINK_DEFINITION = re.compile(r"^\s{0,3}\[[^\]]+\]:\s+\S+")
+_BLOCK_PREFIX = re.compile(r"^\s*(?:>\s?)+|^\s*(?:[-*+]|\d{1,9}[.)])\s+(?:\[[ xX]\]\s+)?")
+# Applied in order to each line outside code blocks: (pattern, replacement).
+_INLINE = [
+    (re.compile(r"<!--.*?-->"), ""),
+    (re.compile(r"`+([^`]+?)`+"), r"\1"),
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),
+    (re.compile(r"\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])"), r"\1"),
+    (re.compile(r"<((?:https?|mailto):[^>\s]+)>"), r"\1"),
+    (re.compile(r"</?[A-Za-z][^>]*>"), ""),
+    (re.compile(r"(?<!\\)(\*\*|__)(?=\S)(.+?)(?<=[^\s\\])\1"), r"\2"),
+    (re.compile(r"(?<![\w*\\])\*(?=\S)(.+?)(?<=[^\s\\])\*(?!\w)"), r"\1"),
+    (re.compile(r"(?<![\w\\])_(?=\S)(.+?)(?<=[^\s\\])_(?!\w)"), r"\1"),
+    (re.compile(r"~~(?=\S)(.+?)(?<=\S)~~"), r"\1"),
+    (re.compile(r"\\([\\`*_{}\[\]()#+\-.!|>~])"), r"\1"),
+]
+
+def _strip_inline(line: str)-> str:
+    for pattern, replacement in _INLINE:
+        line = pattern.sub(replacement, line)
+    if "|" in line and line.lstrip().startswith("|"):
+        line = " ".join(cell.strip() for cell in line.strip().strip("|").split("|"))
+    return line
+
+def markdown_to_text(source: str)-> str:
+    """Plain text of a markdown document with its header structure kept.
+
+    Headers stay as '#' lines (setext headers are rewritten as ATX ones) so
+    the markdown chunker can split on them; emphasis, links, images, inline
+    code, HTML tags, list and quote markers are removed. Fenced code is kept
+    as an indented block, so a '# comment' in it is not taken for a header.
+    A leading YAML front matter block is dropped.
+    """
+    lines: list[str] = []
+    fence: str | None = None
+
+    for line in _FRONT_MATTER.sub("", source, count=1).splitlines():
+        match = _FENCE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            else:
+                lines.append(f"    {line}")
+            continue
+        if match:
+            fence = match.group(1)
+            continue
+
+        header = _ATX_HEADER.match(line)
+        if header:
+            lines.append(f"{header.group(1)} {_strip_inline(header.group(2))}")
+            continue
+        underline = _SETEXT_UNDERLINE.match(line)
+        if underline and lines and lines[-1].strip() and not lines[-1].startswith("#"):
+            lines[-1] = ("# " if underline.group(1)[0] == "=" else "## ") + lines[-1].strip()
+            continue
+        if _THEMATIC_BREAK.match(line) or _LINK_DEFINITION.match(line):
+            lines.append("")
+            continue
+        if "|" in line and _TABLE_DELIMITER.match(line):
+            continue
+
+        lines.append(_strip_inline(_BLOCK_PREFIX.sub("", line)).rstrip())
+
+    # Trim blank lines only: stripping spaces would unindent a leading code block.
+    start = next((i for i, line in enumerate(lines) if line.strip()), len(lines))
+    end = next((i for i in range(len(lines), start, -1) if lines[i - 1].strip()), start)
+    return "\n".join(lines[start:end])
+
 def _extract_from_md(path: str)->str:
     try:
         with open(file=path, mode='r', encoding='utf-8') as f:
-            md_content = markdown.markdown(f.read())
-        return strip_tags(input=md_content).strip()
+            return markdown_to_text(f.read())
     except Exception as e:
         raise ExtractionError(f"Failed to extract .md {path}: {e}")
 
 def _extract_from_pdf(path: str)->str:
+    from pypdf import PdfReader
+
     try:
         reader = PdfReader(stream=path)
         pdf_content = ''.join([(p.extract_text() or '').strip() for p in reader.pages])
@@ -33,6 +109,8 @@ def _extract_from_pdf(path: str)->str:
         raise ExtractionError(f"Failed to extract .pdf {path}: {e}")
 
 def _extract_from_docx(path: str)->str:
+    from docx import Document
+
     try:
         f = open(file=path, mode='rb')
         document = Document(f)
@@ -55,4 +133,58 @@ def extract_text(path: str)-> tuple[str, str]:
     elif suffix == '.pdf':
         return _extract_from_pdf(path=path), suffix
     elif suffix == '.docx':
-        return _extract_from_docx(path=path), suffix
\ No newline at end of file
+        return _extract_from_docx(path=path), suffix
+
+def _iter_pdf_pages(path: str)-> Iterator[tuple[str, int | None]]:
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(stream=path)
+        pages = reader.pages
+    except Exception as e:
+        raise ExtractionError(f"Failed to extract .pdf {path}: {e}")
+
+    for number, page in enumerate(pages, start=1):
+        try:
+            text = (page.extract_text() or '').strip()
+        except Exception as e:
+            raise ExtractionError(f"Failed to extract page {number} of .pdf {path}: {e}")
+        if text:
+            yield text, number
+
+def _iter_docx_paragraphs(path: str)-> Iterator[tuple[str, int | None]]:
+    from docx import Document
+
+    try:
+        with open(file=path, mode='rb') as f:
+            document = Document(f)
+    except Exception as e:
+        raise ExtractionError(f"Failed to extract .docx {path}: {e}")
+
+    for paragraph in document.paragraphs:
+        text = paragraph.text.strip()
+        if text:
+            yield text, None
+
+def _iter_whole(text: str)-> Iterator[tuple[str, int | None]]:
+    yield text, None
+
+def iter_segments(path: str)-> tuple[Iterator[tuple[str, int | None]], str]:
+    """Return a lazy iterator of (text, page) segments and the file type.
+
+    PDFs yield one segment per page with its 1-based page number and DOCX
+    files one per paragraph, so a large document is never held as a single
+    string. Text and markdown files are a single segment without a page.
+    """
+    suffix = PurePosixPath(path).suffix
+
+    if suffix not in SUPPORTED_EXT:
+        raise UnsupportedFileTypeError(f"Unsupported file type: {suffix}")
+
+    if suffix == '.pdf':
+        return _iter_pdf_pages(path=path), suffix
+    elif suffix == '.docx':
+        return _iter_docx_paragraphs(path=path), suffix
+    elif suffix == '.md':
+        return _iter_whole(_extract_from_md(path=path)), suffix
+    return _iter_whole(_extract_from_txt(path=path)), suffix
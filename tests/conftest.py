@@ -1,5 +1,8 @@
-from ctxvault.models.vaults import VaultType, SkillInput
+from ctxvault.models.skills import SkillInput
+from ctxvault.models.vaults import VaultType
 from ctxvault.utils.config import create_vault
+from ctxvault.core.querying import QueryEmbeddingCache
+import numpy as np
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -8,7 +11,11 @@ from unittest.mock import MagicMock
 def mock_chroma(monkeypatch):
     monkeypatch.setattr(
         "ctxvault.core.embedding.embed_list",
-        lambda chunks: [[0.1] * 384] * len(chunks),
+        lambda chunks, backend=None, stats=None: np.full((len(chunks), 384), 0.1, dtype=np.float32),
+    )
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_queries",
+        lambda texts, backend=None: np.full((len(texts), 384), 0.1, dtype=np.float32),
     )
 
     mock_collection = MagicMock()
@@ -16,6 +23,7 @@ def mock_chroma(monkeypatch):
     mock_collection.delete = MagicMock()
     mock_collection.query = MagicMock(
         return_value={
+            "ids": [["1"]],
             "documents": [["mock_doc"]],
             "metadatas": [[{
                 "chunk_id": "1",
@@ -38,6 +46,7 @@ def mock_chroma(monkeypatch):
 
     mock_client = MagicMock()
     mock_client.get_or_create_collection = MagicMock(return_value=mock_collection)
+    mock_client.get_max_batch_size = MagicMock(return_value=5461)
 
     monkeypatch.setattr(
         "ctxvault.storage.chroma_store.PersistentClient",
@@ -45,6 +54,36 @@ def mock_chroma(monkeypatch):
     )
     monkeypatch.setattr("ctxvault.storage.chroma_store._clients", {})
     monkeypatch.setattr("ctxvault.storage.chroma_store._collections", {})
+    monkeypatch.setattr("ctxvault.core.querying.query_cache", QueryEmbeddingCache())
+
+def _make_tokenizer(model_max_length: int = 256):
+    """A small WordPiece tokenizer built in memory, standing in for the model's tokenizer.
+
+    Its vocabulary is single characters, so every word is split into subword
+    pieces the way a real BERT tokenizer splits rare words.
+    """
+    import string
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+
+    chars = string.ascii_lowercase + string.digits + string.punctuation
+    vocab = {token: i for i, token in enumerate(["[PAD]", "[UNK]", "[CLS]", "[SEP]", *chars, *(f"##{c}" for c in chars)])}
+    tokenizer = Tokenizer(models.WordPiece(vocab=vocab, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.BertNormalizer(lowercase=True)
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.post_processor = processors.TemplateProcessing(single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)])
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]", pad_token="[PAD]", model_max_length=model_max_length
+    )
+
+@pytest.fixture(scope="session")
+def word_piece_tokenizer():
+    return _make_tokenizer()
+
+@pytest.fixture(autouse=True)
+def mock_tokenizer(monkeypatch, word_piece_tokenizer):
+    monkeypatch.setattr("ctxvault.core.embedding.get_tokenizer", lambda: word_piece_tokenizer)
+    return word_piece_tokenizer
 
 @pytest.fixture
 def mock_global_config(tmp_path, monkeypatch):
@@ -16,6 +16,7 @@ class TestIndexEndpoint:
         data = response.json()
         assert "indexed_files" in data
         assert "skipped_files" in data
+        assert data["stats"]["padding_ratio"] >= 0
 
     def test_index_missing_file_path(self, mock_vault_config):
         response = client.put("/ctxvault/index", json={"vault_name": "test_vault"})
@@ -31,6 +32,22 @@ class TestQueryEndpoint:
         )
         assert response.status_code == 200
         assert len(response.json()["results"]) > 0
+        assert response.json()["results"][0]["fused_score"] is None
+
+    def test_query_hybrid_mode(self, mock_vault_config):
+        response = client.post(
+            "/ctxvault/query",
+            json={"vault_name": "test_vault", "query": "test query", "mode": "hybrid"}
+        )
+        assert response.status_code == 200
+        match = response.json()["results"][0]
+        assert match["score"] == 0.99 and match["fused_score"] == 1 / 61
+
+        response = client.post(
+            "/ctxvault/query",
+            json={"vault_name": "test_vault", "query": "test query", "mode": "keyword"}
+        )
+        assert response.status_code == 422
 
     def test_query_empty_string(self, mock_vault_config):
         response = client.post(
@@ -45,7 +62,7 @@ class TestQueryEndpoint:
         from unittest.mock import MagicMock
         mock_result = MagicMock()
         mock_result.results = []
-        monkeypatch.setattr(vault_router, "query", lambda vault_name, text, filters=None: mock_result)
+        monkeypatch.setattr(vault_router, "query", lambda vault_name, text, filters=None, mode=None: mock_result)
         response = client.post(
             "/ctxvault/query",
             json={"vault_name": "test_vault", "query": "nonexistent"}
@@ -90,6 +107,74 @@ class TestReindexEndpoint:
         assert response.status_code == 200
 
 
+class TestJobsEndpoint:
+    def test_index_job_runs_in_background(self, mock_vault_config, temp_docs):
+        import time
+        response = client.post("/ctxvault/jobs", json={"kind": "index", "vault_name": "test_vault"})
+        assert response.status_code == 202
+        job_id = response.json()["job"]["id"]
+
+        for _ in range(200):
+            job = client.get(f"/ctxvault/jobs/{job_id}").json()["job"]
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.01)
+
+        assert job["status"] == "succeeded"
+        assert len(job["processed_files"]) == 2
+        assert job["stats"]["files_done"] == 2
+
+    def test_job_unknown_vault(self, mock_global_config):
+        response = client.post("/ctxvault/jobs", json={"kind": "reindex", "vault_name": "missing"})
+        assert response.status_code == 400
+
+    def test_job_not_found(self, mock_global_config):
+        response = client.get("/ctxvault/jobs/unknown")
+        assert response.status_code == 404
+
+    def test_jobs_on_restricted_vaults_are_hidden(self, mock_vault_config, monkeypatch):
+        from collections import OrderedDict
+        from ctxvault.core.jobs import jobs
+        from ctxvault.models.jobs import JobInfo, JobKind
+        from ctxvault.models.vaults import VaultType
+        from ctxvault.utils.config import create_vault
+
+        create_vault("private_vault", VaultType.SEMANTIC, True, None, global_vault=True)
+        monkeypatch.setattr(jobs, "_jobs", OrderedDict(
+            (name, JobInfo(id=name, kind=JobKind.INDEX, vault_name=name, created_at=0)) for name in ["test_vault", "private_vault"]
+        ))
+
+        listed = client.get("/ctxvault/jobs").json()["jobs"]
+        assert [job["vault_name"] for job in listed] == ["test_vault"]
+        assert client.get("/ctxvault/jobs/private_vault").status_code == 400
+
+    def test_sync_writes_conflict_with_a_running_job(self, mock_vault_config, temp_docs, monkeypatch):
+        from collections import OrderedDict
+        from ctxvault.core.jobs import jobs
+        from ctxvault.models.jobs import JobInfo, JobKind, JobStatus
+
+        job = JobInfo(id="running", kind=JobKind.INDEX, vault_name="test_vault", status=JobStatus.RUNNING, created_at=0)
+        monkeypatch.setattr(jobs, "_jobs", OrderedDict([(job.id, job)]))
+
+        assert client.put("/ctxvault/index", json={"vault_name": "test_vault"}).status_code == 409
+        assert client.put("/ctxvault/reindex", json={"vault_name": "test_vault"}).status_code == 409
+        assert client.post("/ctxvault/docs/write", json={"vault_name": "test_vault", "file_path": "new.md", "content": "text", "overwrite": False}).status_code == 409
+
+        job.status = JobStatus.SUCCEEDED
+        assert client.put("/ctxvault/index", json={"vault_name": "test_vault"}).status_code == 200
+
+
+class TestFsckEndpoint:
+    def test_fsck_dry_run(self, mock_vault_config, temp_docs):
+        response = client.post("/ctxvault/fsck", json={"vault_name": "test_vault", "dry_run": True})
+        assert response.status_code == 200
+        assert response.json()["report"]["removed_chunks"] == 0
+
+    def test_fsck_unknown_vault(self, mock_global_config):
+        response = client.post("/ctxvault/fsck", json={"vault_name": "missing"})
+        assert response.status_code == 400
+
+
 class TestListVaultsEndpoint:
     def test_list_vaults(self, mock_global_config):
         response = client.get("/ctxvault/vaults")
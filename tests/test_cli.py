@@ -39,6 +39,11 @@ def test_cli_query_semantic(mock_vault_config):
     assert result.exit_code == 0
     assert "mock_doc" in result.stdout
 
+def test_cli_query_invalid_mode(mock_vault_config):
+    result = runner.invoke(app, ["query", "test_vault", "test query", "--mode", "keyword"])
+    assert result.exit_code == 1
+    assert "Query mode not valid" in result.stdout
+
 def test_cli_query_empty_text(mock_vault_config):
     result = runner.invoke(app, ["query", "test_vault", "   "])
     assert result.exit_code == 1
@@ -55,6 +60,11 @@ def test_cli_reindex_semantic(mock_vault_config):
     assert result.exit_code == 0
     assert "Reindexed:" in result.stdout or "Skipped:" in result.stdout
 
+@pytest.mark.usefixtures("mock_chroma", "temp_docs")
+def test_cli_index_rejects_zero_workers(mock_vault_config):
+    result = runner.invoke(app, ["index", "test_vault", "--workers", "0"])
+    assert result.exit_code != 0
+
 @pytest.mark.usefixtures("mock_chroma", "temp_docs")
 def test_cli_docs_semantic(mock_vault_config):
     result = runner.invoke(app, ["docs", "test_vault"])
@@ -121,4 +131,36 @@ def test_cli_vaults_shows_scope(mock_vault_config):
 def test_cli_delete_purge(mock_vault_config):
     result = runner.invoke(app, ["delete", "test_vault", "--purge"])
     assert result.exit_code == 0
-    assert "permanently deleted" in result.stdout
\ No newline at end of file
+    assert "permanently deleted" in result.stdout
+
+# ── Startup ──────────────────────────────────────────────────────────────────
+
+def test_cli_import_skips_heavy_dependencies():
+    import subprocess
+    import sys
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ctxvault.cli.app"],
+        capture_output=True, text=True, check=True,
+    )
+    imported = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+    heavy = {"torch", "transformers", "sentence_transformers", "chromadb", "numpy", "pypdf", "docx", "markdown", "bs4", "frontmatter", "yaml", "pydantic"}
+
+    assert "ctxvault.cli.app" in imported
+    assert not heavy & imported
+
+def test_cli_import_time_stays_within_budget():
+    import subprocess
+    import sys
+
+    # Cumulative microseconds for ctxvault.cli.app, best of a few runs to absorb noise.
+    timings = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import ctxvault.cli.app"],
+            capture_output=True, text=True, check=True,
+        )
+        line = next(line for line in result.stderr.splitlines() if line.endswith("| ctxvault.cli.app"))
+        timings.append(int(line.split("|")[1]))
+
+    assert min(timings) < 120_000
@@ -1,8 +1,10 @@
 from pathlib import Path
+import numpy as np
 import pytest
 from ctxvault.core import vault_router
-from ctxvault.models.vaults import SkillInput
+from ctxvault.models.skills import SkillInput
 from ctxvault.core.exceptions import UnsupportedVaultOperationError
+from ctxvault.core.embedding import embed_list as real_embed_list, embed_queries as real_embed_queries
 
 # ── Semantic vault ──────────────────────────────────────────────────────────
 
@@ -19,11 +21,586 @@ def test_query_returns_result(mock_vault_config):
     assert len(result.results) == 1
     assert hasattr(result, "results")
 
+def test_repeated_query_skips_embedding(mock_vault_config, monkeypatch):
+    from ctxvault.core import querying
+    calls = []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_queries",
+        lambda texts, backend=None: calls.append(texts) or [[0.1] * 384] * len(texts),
+    )
+
+    vault_router.query(text="what is rag?", vault_name="test_vault")
+    vault_router.query(text="what is  rag? ", vault_name="test_vault")
+
+    assert len(calls) == 1
+    assert querying.query_cache.stats()["hits"] == 1
+    assert querying.query_cache.stats()["misses"] == 1
+
+def test_query_cache_is_bounded():
+    from ctxvault.core.querying import QueryEmbeddingCache
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    cache.resize(1)
+    assert cache.stats()["size"] == 1
+
 def test_index_files_returns_lists(mock_vault_config, temp_docs):
     indexed, skipped = vault_router.index_files(vault_name="test_vault", path=str(temp_docs))
     assert isinstance(indexed, list)
     assert isinstance(skipped, list)
 
+def test_index_files_batches_chunks_across_files(mock_vault_config, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_list",
+        lambda chunks, backend=None, stats=None: calls.append(len(chunks)) or [[0.1] * 384] * len(chunks),
+    )
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    for i in range(5):
+        (docs / f"note{i}.txt").write_text(f"Small note number {i}")
+
+    indexed, skipped = vault_router.index_files(vault_name="test_vault", path=str(docs))
+
+    assert len(indexed) == 5
+    assert skipped == []
+    assert calls == [5]
+
+def test_index_files_embedding_failure_skips_only_affected_files(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+
+    def fake_embed(chunks, backend=None, stats=None):
+        if any("broken" in c for c in chunks):
+            raise RuntimeError("encoder failure")
+        return [[0.1] * 384] * len(chunks)
+
+    monkeypatch.setattr("ctxvault.core.embedding.embed_list", fake_embed)
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    (docs / "a.txt").write_text("fine")
+    (docs / "b.txt").write_text("broken")
+    (docs / "c.txt").write_text("fine too")
+
+    files = [str(docs / name) for name in ("a.txt", "b.txt", "c.txt")]
+    indexed, failed = indexer.index_files(file_paths=files, config={"db_path": "db"}, batch_size=1)
+
+    assert indexed == [files[0], files[2]]
+    assert [f for f, _ in failed] == [files[1]]
+
+def test_index_files_with_workers_keeps_single_writer(mock_vault_config, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from ctxvault.core import indexer
+
+    writers = set()
+    monkeypatch.setattr(indexer, "_create_pool", lambda workers: ThreadPoolExecutor(max_workers=workers))
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: writers.add(threading.get_ident()),
+    )
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    for i in range(6):
+        (docs / f"note{i}.txt").write_text(f"Small note number {i}")
+
+    files = [str(docs / f"note{i}.txt") for i in range(6)]
+    indexed, failed = indexer.index_files(file_paths=files, config={"db_path": "db"}, batch_size=1, workers=3)
+
+    assert indexed == files
+    assert failed == []
+    assert writers == {threading.get_ident()}
+
+def test_scan_files_prunes_excluded_dirs_and_filters_extensions(mock_vault_config):
+    from ctxvault.core.vault_router import _get_vault
+    from ctxvault.utils.text_extraction import SUPPORTED_EXT
+    vault = _get_vault(vault_name="test_vault")
+    (mock_vault_config / "docs" / "deep").mkdir(parents=True)
+    (mock_vault_config / "docs" / "deep" / "a.md").write_text("# A")
+    (mock_vault_config / "docs" / "image.png").write_bytes(b"png")
+    (mock_vault_config / "top.txt").write_text("top")
+    db = mock_vault_config / "db"
+    db.mkdir()
+    (db / "chroma.txt").write_text("not a document")
+
+    found = dict(vault.scan_files(path=mock_vault_config, exclude_dirs=[db], extensions=SUPPORTED_EXT))
+
+    assert sorted(found) == [mock_vault_config / "docs" / "deep" / "a.md", mock_vault_config / "top.txt"]
+    assert found[mock_vault_config / "top.txt"].st_size == 3
+
+def test_scan_files_skips_unreadable_directories(mock_vault_config, monkeypatch):
+    import os
+    from ctxvault.core.vault_router import _get_vault
+    vault = _get_vault(vault_name="test_vault")
+    (mock_vault_config / "locked").mkdir()
+    (mock_vault_config / "locked" / "secret.txt").write_text("secret")
+    (mock_vault_config / "open.txt").write_text("open")
+    scandir = os.scandir
+
+    def guarded_scandir(path):
+        if os.path.basename(path) == "locked":
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", guarded_scandir)
+    with pytest.warns(UserWarning, match="locked"):
+        found = [file for file, _ in vault.scan_files(path=mock_vault_config, extensions=[".txt"])]
+
+    assert found == [mock_vault_config / "open.txt"]
+
+def test_index_files_pipelines_extraction_and_reports_progress(mock_vault_config, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from ctxvault.core import indexer, pipeline
+    from ctxvault.models.indexing import IndexStats
+    monkeypatch.setattr(pipeline, "_create_extract_pool", lambda workers: ThreadPoolExecutor(max_workers=workers))
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    for i in range(5):
+        (docs / f"note{i}.txt").write_text(f"Small note number {i}")
+    files = [str(docs / f"note{i}.txt") for i in range(5)] + [str(docs / "missing.txt")]
+    seen = []
+
+    stats = IndexStats()
+    indexed, failed = indexer.index_files(file_paths=files, config={"db_path": "db"}, batch_size=2, extract_workers=2, stats=stats, progress=lambda s: seen.append(s.files_done))
+
+    assert indexed == files[:5]
+    assert [file for file, _ in failed] == [files[5]]
+    assert (stats.files_done, stats.files_total) == (6, 6)
+    assert sorted(seen) == [1, 2, 3, 4, 5, 6]
+
+def test_index_files_only_processes_changes(mock_vault_config, monkeypatch):
+    import os
+    from ctxvault.core import indexer
+    from ctxvault.models.indexing import IndexStats
+    embedded, deleted = [], []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_list",
+        lambda chunks, backend=None, stats=None: embedded.extend(chunks) or [[0.1] * 384] * len(chunks),
+    )
+    monkeypatch.setattr("ctxvault.storage.chroma_store.delete_document", lambda doc_id, config: deleted.append(doc_id))
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.txt").write_text(f"Note {name}")
+
+    first = IndexStats()
+    vault_router.index_files(vault_name="test_vault", path=str(docs), stats=first)
+    assert (first.new_files, first.unchanged_files) == (3, 0)
+
+    (docs / "a.txt").write_text("Note a, edited")
+    (docs / "c.txt").unlink()
+    (docs / "d.txt").write_text("Note d")
+    os.utime(docs / "b.txt")
+    embedded.clear()
+    runs, diffed = [], []
+    index_files = indexer.index_files
+    monkeypatch.setattr("ctxvault.core.indexer.index_files", lambda file_paths, **kwargs: runs.append(file_paths) or index_files(file_paths=file_paths, **kwargs))
+    monkeypatch.setattr("ctxvault.storage.chroma_store.get_document_chunks", lambda doc_id, config: diffed.append(doc_id) or {"ids": [], "embeddings": [], "metadatas": []})
+    second = IndexStats()
+    indexed, _ = vault_router.index_files(vault_name="test_vault", path=str(docs), stats=second)
+
+    assert sorted(indexed) == [str(docs / "a.txt"), str(docs / "d.txt")]
+    assert sorted(embedded) == ["Note a, edited", "Note d"]
+    assert len(runs) == 1 and len(diffed) == 1
+    assert (second.new_files, second.changed_files, second.unchanged_files, second.removed_files) == (1, 1, 1, 1)
+    assert len(deleted) == 1
+
+def test_reindex_file_only_embeds_changed_chunks(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+    from ctxvault.core.identifiers import get_chunk_hash
+    from ctxvault.models.indexing import IndexStats
+    from ctxvault.utils.chuncking import ChunkSpan
+    store, embedded = {}, []
+    chunks = ["alpha", "beta", "gamma"]
+    monkeypatch.setattr("ctxvault.utils.chuncking.chunk_spans", lambda text, **kwargs: [ChunkSpan(c, 0, len(text)) for c in chunks])
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_list",
+        lambda chunks, backend=None, stats=None: embedded.extend(chunks) or np.full((len(chunks), 384), 0.1, dtype=np.float32),
+    )
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: store.update(zip(ids, zip(embeddings, metadatas))),
+    )
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.get_document_chunks",
+        lambda doc_id, config: {"ids": list(store), "embeddings": [e for e, _ in store.values()], "metadatas": [m for _, m in store.values()]},
+    )
+    monkeypatch.setattr("ctxvault.storage.chroma_store.delete_chunks", lambda ids, config: [store.pop(i) for i in ids])
+    doc = mock_vault_config / "doc.txt"
+    doc.write_text("placeholder")
+
+    indexer.index_file(file_path=str(doc), config={"db_path": "db"})
+    assert embedded == chunks and len(store) == 3
+
+    chunks[:] = ["alpha", "beta edited"]
+    embedded.clear()
+    stats = IndexStats()
+    indexer.reindex_files(file_paths=[str(doc)], config={"db_path": "db"}, stats=stats)
+
+    assert embedded == ["beta edited"]
+    assert stats.reused_chunks == 1
+    assert [m["chunk_hash"] for _, m in store.values()] == [get_chunk_hash("alpha"), get_chunk_hash("beta edited")]
+
+def test_chunk_segments_merges_short_pages_and_keeps_page_numbers():
+    from ctxvault.utils.chuncking import chunking, chunk_segments
+    long_page = " ".join(f"w{i}" for i in range(12))
+
+    chunks = list(chunk_segments([("one two", 1), ("three", 2), (long_page, 3), ("", 4), ("tail", 5)], chunk_size=8, overlap=2))
+
+    assert chunks[0] == ("one two\n\nthree", 1)
+    assert [page for _, page in chunks[1:]] == [3, 3]
+    assert chunks[-1][0].endswith("\n\ntail")
+    assert list(chunk_segments([(long_page, None)], chunk_size=8, overlap=2)) == [(c, None) for c in chunking(long_page, chunk_size=8, overlap=2)]
+
+def test_chunking_splits_on_word_offsets_like_str_split():
+    from ctxvault.utils.chuncking import chunking, _chunk_fixed
+    markdown = "Intro\u00a0line\n\n# A\none two three\n\nfour five\n## B\nsix\u2003seven\neight nine ten eleven\n# C\n"
+    text = "  p1 a b\n\n\n p2 c\n\nlong line one two three four five six\nshort\n  "
+
+    assert chunking(markdown, chunk_size=4, overlap=1, file_type=".md") == [
+        "Intro\u00a0line", "A\none two three", "A\nfour five", "A > B\nsix\u2003seven", "A > B\neight nine ten eleven", "C",
+    ]
+    assert chunking(text, chunk_size=4, overlap=2, file_type=".txt") == [
+        "p1 a b", "p2 c", "long line one two", "one two three four", "three four five six", "five six", "short",
+    ]
+    assert _chunk_fixed(" a\x1cb  c\u3000d ", chunk_size=2, overlap=1) == ["a b", "b c", "c d", "d"]
+
+def test_token_chunking_fits_the_model_window(mock_tokenizer):
+    from ctxvault.utils.chuncking import chunking
+    text = "Intro paragraph.\n\n" + " ".join(f"word{i}" for i in range(200))
+
+    chunks = chunking(text, chunk_size=30, overlap=10, tokenizer=mock_tokenizer)
+
+    lengths = [len(mock_tokenizer(c, add_special_tokens=False)["input_ids"]) for c in chunks]
+    assert chunks[0] == "Intro paragraph."
+    assert max(lengths) <= 30
+    assert all(c.startswith("word") and c.split()[-1] in text.split() for c in chunks[1:])
+    assert chunks[-1].endswith("word199")
+
+def test_token_chunking_skips_segments_without_tokens(mock_tokenizer):
+    from ctxvault.utils.chuncking import chunk_segments, chunking
+
+    for text in ["\u200b", "\x01\x02", " \u200b \n\n "]:
+        assert chunking(text, chunk_size=30, overlap=10, file_type=".txt", tokenizer=mock_tokenizer) == []
+        assert chunking(text, chunk_size=30, overlap=10, file_type=".md", tokenizer=mock_tokenizer) == []
+    segments = [("page one", 1), ("\u200b", 2), ("page three", 3)]
+    assert list(chunk_segments(segments, chunk_size=30, overlap=10, file_type=".pdf", tokenizer=mock_tokenizer)) == [("page one\n\npage three", 1)]
+
+def test_new_vaults_chunk_by_tokens_and_old_vaults_by_words(mock_global_config, monkeypatch):
+    from ctxvault.core.exceptions import ChunkingModeNotValidError
+    from ctxvault.utils.config import get_vault_config
+    embedded = []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_list",
+        lambda chunks, backend=None, stats=None: embedded.append(chunks) or [[0.1] * 384] * len(chunks),
+    )
+    vault_path, _ = vault_router.init_vault(vault_name="token_vault", global_vault=True)
+    words_path, _ = vault_router.init_vault(vault_name="word_vault", global_vault=True, chunking="words")
+    text = " ".join(f"w{i}" for i in range(300))
+    (Path(vault_path) / "doc.txt").write_text(text)
+    (Path(words_path) / "doc.txt").write_text(text)
+
+    vault_router.index_files(vault_name="token_vault")
+    vault_router.index_files(vault_name="word_vault")
+
+    assert get_vault_config("token_vault")["chunking"] == "tokens"
+    assert len(embedded[0]) > 1 and len(embedded[1]) == 1
+    with pytest.raises(ChunkingModeNotValidError):
+        vault_router.init_vault(vault_name="bad_vault", global_vault=True, chunking="sentences")
+
+def test_index_file_stores_page_numbers(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+    from ctxvault.utils import text_extraction
+    from ctxvault.utils.chuncking import ChunkSpan
+    stored = []
+    monkeypatch.setattr(text_extraction, "iter_segments", lambda path: (iter([("first page", 1), ("second page", 2)]), ".pdf"))
+    monkeypatch.setattr("ctxvault.utils.chuncking.chunk_spans", lambda text, **kwargs: [ChunkSpan(text, 0, len(text))] * 2)
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: stored.extend(metadatas),
+    )
+    doc = mock_vault_config / "doc.pdf"
+    doc.write_bytes(b"%PDF")
+
+    indexer.index_file(file_path=str(doc), config={"db_path": "db"})
+
+    assert [m["page"] for m in stored] == [1, 1, 2]
+
+def test_index_file_reuses_cached_text_for_unchanged_bytes(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+    from ctxvault.utils import text_extraction
+    real_segments = text_extraction.iter_segments
+    parsed = []
+    monkeypatch.setattr(text_extraction, "iter_segments", lambda path: parsed.append(path) or real_segments(path))
+    doc = mock_vault_config / "doc.txt"
+    doc.write_text("Some text")
+    config = {"db_path": str(mock_vault_config / "db")}
+
+    indexer.index_file(file_path=str(doc), config=config)
+    indexed, failed = indexer.reindex_files(file_paths=[str(doc)], config=config)
+    assert indexed == [str(doc)] and failed == []
+    assert len(parsed) == 1
+
+    doc.write_text("Some other text")
+    indexer.reindex_files(file_paths=[str(doc)], config=config)
+    assert len(parsed) == 2
+    assert (mock_vault_config / "db" / "text-cache.sqlite3").exists()
+
+def test_text_cache_skips_files_over_the_size_limit(mock_vault_config, monkeypatch):
+    from ctxvault.core import pipeline
+    from ctxvault.storage.text_cache import get_text_cache
+    monkeypatch.setattr(pipeline, "MAX_CACHED_CHARS", 10)
+    cache_dir = str(mock_vault_config / "db")
+    (mock_vault_config / "short.txt").write_text("short")
+    (mock_vault_config / "long.txt").write_text("long enough to pass the limit")
+
+    for name in ("short", "long"):
+        pipeline.extract_chunks(str(mock_vault_config / f"{name}.txt"), cache_dir)
+    assert len(get_text_cache(cache_dir)) == 1
+
+    pipeline.extract_chunks(str(mock_vault_config / "long.txt"), cache_dir, chunk_storage="offsets")
+    assert len(get_text_cache(cache_dir)) == 2
+
+def test_offsets_storage_keeps_text_out_of_the_store(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer, pipeline
+    from ctxvault.storage.text_cache import get_text_cache
+    stored = []
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: stored.append((metadatas, chunks)),
+    )
+    doc = mock_vault_config / "doc.md"
+    doc.write_text("# Intro\n\nfirst   line\nsecond line\n\n## Usage\n\nrun it")
+    config = {"db_path": str(mock_vault_config / "db"), "chunk_storage": "offsets"}
+
+    indexer.index_file(file_path=str(doc), config=config)
+
+    [(metadatas, chunks)] = stored
+    assert chunks is None
+    assert pipeline.load_chunk_texts([None, None], metadatas, config) == ["Intro\nfirst   line\nsecond line", "Intro > Usage\nrun it"]
+    get_text_cache(config["db_path"]).clear()
+    assert pipeline.load_chunk_texts([None], metadatas[:1], config) == ["Intro\nfirst   line\nsecond line"]
+    doc.write_text("# Intro\n\nedited")
+    get_text_cache(config["db_path"]).clear()
+    assert pipeline.load_chunk_texts([None], metadatas[:1], config) == [None]
+
+def test_offsets_vault_texts_skip_eviction_and_are_pruned_by_fsck(mock_global_config, monkeypatch):
+    from ctxvault.models.vaults import ChunkStorage, VaultType
+    from ctxvault.storage.text_cache import get_text_cache
+    from ctxvault.utils.config import create_vault, get_vault_config
+    vault_path, _ = create_vault("offsets_vault", VaultType.SEMANTIC, False, None, global_vault=True, chunk_storage=ChunkStorage.OFFSETS)
+    stored = {}
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: stored.update(zip(ids, metadatas)),
+    )
+    monkeypatch.setattr("ctxvault.storage.chroma_store.get_all_chunks", lambda config: {"ids": list(stored), "metadatas": list(stored.values())})
+    cache = get_text_cache(get_vault_config("offsets_vault")["db_path"])
+    cache.max_entries = 1
+    for name in "abc":
+        (Path(vault_path) / f"{name}.txt").write_text(f"text {name}")
+
+    vault_router.index_files(vault_name="offsets_vault")
+    assert len(cache) == 3
+    (Path(vault_path) / "a.txt").write_text("edited a")
+    vault_router.index_files(vault_name="offsets_vault")
+    assert len(cache) == 4
+
+    assert vault_router.fsck(vault_name="offsets_vault", dry_run=True).unused_texts == 1
+    assert len(cache) == 4
+    assert vault_router.fsck(vault_name="offsets_vault").unused_texts == 1
+    assert len(cache) == 3
+
+def test_bm25_index_follows_index_and_delete(mock_vault_config):
+    from ctxvault.core import indexer
+    from ctxvault.core.identifiers import get_doc_id
+    from ctxvault.storage.bm25_store import get_bm25_index
+    config = {"db_path": str(mock_vault_config / "db")}
+    docs = {name: mock_vault_config / f"{name}.txt" for name in ("a", "b")}
+    docs["a"].write_text("The connection failed with ERR_CONN_RESET twice")
+    docs["b"].write_text("The connection is fine")
+
+    for doc in docs.values():
+        indexer.index_file(file_path=str(doc), config=config)
+    lexical = get_bm25_index(config["db_path"])
+
+    assert [chunk_id.split("::")[0] for chunk_id, _ in lexical.search("err_conn_reset")] == [get_doc_id(str(docs["a"]))]
+    assert len(lexical.search("the connection")) == 2
+    docs["a"].write_text("Resolved")
+    indexer.index_file(file_path=str(docs["a"]), config=config)
+    assert lexical.search("ERR_CONN_RESET") == []
+    indexer.delete_file(file_path=str(docs["b"]), config=config)
+    assert lexical.search("connection") == [] and len(lexical) == 1
+
+def test_bm25_index_only_takes_flushed_documents(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+    from ctxvault.storage import chroma_store
+    from ctxvault.storage.bm25_store import get_bm25_index
+    config = {"db_path": str(mock_vault_config / "db")}
+    lexical = get_bm25_index(config["db_path"])
+    lexical.replace_documents([("other", ["o1"], ["kept"])])
+    doc = mock_vault_config / "a.txt"
+    doc.write_text("pending keyword")
+
+    def failing_flush(self):
+        # Another caller's write commits while this run's documents are still pending
+        lexical.delete_document(doc_id="other")
+        raise RuntimeError("upsert failed")
+
+    monkeypatch.setattr(chroma_store.UpsertBuffer, "flush", failing_flush)
+    _, failed = indexer.index_files(file_paths=[str(doc)], config=config)
+
+    assert len(failed) == 1
+    assert lexical.search("pending") == [] and len(lexical) == 0
+
+def test_hybrid_query_fuses_vector_and_keyword_ranks(mock_vault_config, monkeypatch):
+    from ctxvault.core import querying
+    from ctxvault.storage import chroma_store
+    from ctxvault.storage.bm25_store import get_bm25_index
+    config = {"db_path": str(mock_vault_config / "db")}
+    lexical = get_bm25_index(config["db_path"])
+    lexical.replace_documents([("d", ["c1", "c2", "c3"], ["semantic notes", "error E4012 in the parser", "parser notes"])])
+    record = lambda chunk_id: {"chunk_id": chunk_id, "source": f"{chunk_id}.txt"}
+    monkeypatch.setattr(chroma_store, "query", lambda query_embedding, config, n_results=5, filters=None: {
+        "ids": [["c3", "c1"]], "documents": [["parser notes", "semantic notes"]], "metadatas": [[record("c3"), record("c1")]], "distances": [[0.2, 0.3]],
+    })
+    fetched = []
+    monkeypatch.setattr(chroma_store, "get_chunks", lambda ids, config, filters=None: fetched.append(ids) or {
+        "ids": ids, "documents": ["error E4012 in the parser"], "metadatas": [record("c2")],
+    })
+
+    result = querying.query(query_txt="E4012 parser", config=config, n_results=2, mode="hybrid")
+
+    assert fetched == [["c2"]]
+    assert result["ids"] == [["c3", "c2"]]
+    assert result["distances"] == [[0.2, None]]
+    assert result["fused_scores"][0] == pytest.approx([1 / 61 + 1 / 62, 1 / 61])
+    assert querying.query(query_txt="E4012 parser", config=config, n_results=2)["ids"] == [["c3", "c1"]]
+
+def test_index_files_resumes_from_journal_and_retries_failures(mock_vault_config, monkeypatch):
+    import json
+    from ctxvault.core.vault_router import _get_vault
+    from ctxvault.utils import text_extraction
+    embedded = []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_list",
+        lambda chunks, backend=None, stats=None: embedded.extend(chunks) or np.full((len(chunks), 384), 0.1, dtype=np.float32),
+    )
+    vault = _get_vault(vault_name="test_vault")
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.txt").write_text(f"Note {name}")
+    # An earlier run was killed after storing a.txt.
+    vault.db_path.mkdir(parents=True, exist_ok=True)
+    a = docs / "a.txt"
+    vault._journal_path.write_text(json.dumps({"file": str(a), "state": vault._file_state(file_path=a)}) + "\n" + '{"file": "torn')
+
+    real_segments = text_extraction.iter_segments
+    def flaky_segments(path):
+        if path.endswith("b.txt"):
+            raise RuntimeError("parser crashed")
+        return real_segments(path)
+    monkeypatch.setattr(text_extraction, "iter_segments", flaky_segments)
+
+    indexed, skipped = vault_router.index_files(vault_name="test_vault", path=str(docs))
+    assert indexed == [str(docs / "c.txt")]
+    assert embedded == ["Note c"]
+    assert len(skipped) == 1 and "parser crashed" in skipped[0]
+
+    monkeypatch.setattr(text_extraction, "iter_segments", real_segments)
+    (docs / "d.txt").write_text("Note d")
+    embedded.clear()
+    indexed, _ = vault_router.index_files(vault_name="test_vault", path=str(docs), retry_failed=True)
+
+    assert indexed == [str(docs / "b.txt")]
+    assert embedded == ["Note b"]
+    assert not vault._journal_path.exists()
+
+def test_index_files_stores_float32_arrays(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+    stored = []
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: stored.append(embeddings),
+    )
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    (docs / "a.txt").write_text("A short note")
+
+    indexer.index_files(file_paths=[str(docs / "a.txt")], config={"db_path": "db"})
+
+    assert isinstance(stored[0], np.ndarray)
+    assert stored[0].dtype == np.float32 and stored[0].shape == (1, 384)
+
+def test_index_files_buffers_upserts_across_documents(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+    writes = []
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.add_document",
+        lambda ids, embeddings, metadatas, chunks, config: writes.append(ids),
+    )
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    files = []
+    for i in range(5):
+        (docs / f"note{i}.txt").write_text(f"Small note number {i}")
+        files.append(str(docs / f"note{i}.txt"))
+
+    indexed, failed = indexer.index_files(file_paths=files, config={"db_path": "db"})
+
+    assert indexed == files and failed == []
+    assert len(writes) == 1 and len(writes[0]) == 5
+
+def test_index_files_reports_failed_flush(mock_vault_config, monkeypatch):
+    from ctxvault.core import indexer
+
+    def fail(ids, embeddings, metadatas, chunks, config):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("ctxvault.storage.chroma_store.add_document", fail)
+    docs = mock_vault_config / "notes"
+    docs.mkdir()
+    (docs / "a.txt").write_text("A short note")
+
+    indexed, failed = indexer.index_files(file_paths=[str(docs / "a.txt")], config={"db_path": "db"})
+
+    assert indexed == []
+    assert [(file, str(e)) for file, e in failed] == [(str(docs / "a.txt"), "disk full")]
+
+def test_fsck_removes_orphan_and_stale_chunks(mock_vault_config, temp_docs, monkeypatch):
+    deleted = []
+    file1 = str(temp_docs / "file1.txt")
+    monkeypatch.setattr(
+        "ctxvault.storage.chroma_store.get_all_chunks",
+        lambda config: {
+            "ids": ["a::0", "a::1", "gone::0"],
+            "metadatas": [
+                {"source": file1, "chunk_index": 0},
+                {"source": file1, "chunk_index": 1},
+                {"source": str(temp_docs / "gone.txt"), "chunk_index": 0},
+            ],
+        },
+    )
+    monkeypatch.setattr("ctxvault.storage.chroma_store.delete_chunks", lambda ids, config: deleted.extend(ids))
+
+    report = vault_router.fsck(vault_name="test_vault", dry_run=True)
+    assert (report.chunks, report.orphan_chunks, report.stale_chunks, report.removed_chunks) == (3, 1, 1, 0)
+    assert deleted == []
+
+    report = vault_router.fsck(vault_name="test_vault")
+    assert report.missing_sources == [str(temp_docs / "gone.txt")]
+    assert report.removed_chunks == 2
+    assert sorted(deleted) == ["a::1", "gone::0"]
+
+def test_fsck_not_supported_on_skill_vault(mock_skill_vault_config):
+    with pytest.raises(UnsupportedVaultOperationError):
+        vault_router.fsck(vault_name="test_skill_vault")
+
 def test_list_documents_returns_list(mock_vault_config):
     docs = vault_router.list_documents(vault_name="test_vault")
     assert isinstance(docs, list)
@@ -156,6 +733,31 @@ def test_chunking_markdown_splits_on_headers():
     chunks = chunking(md_text, file_type=".md")
     assert len(chunks) >= 2
 
+def test_markdown_extraction_keeps_headers_and_strips_inline_syntax(tmp_path):
+    from ctxvault.utils.text_extraction import extract_text
+    from ctxvault.utils.chuncking import chunking
+    doc = tmp_path / "notes.md"
+    doc.write_text(
+        "Guide\n=====\n\nRead **the** [docs](http://x.io) and `run()`.\n\n"
+        "## Install ##\n\n- pip install *ctxvault*\n\n```bash\n# not a header\n```\n",
+        encoding="utf-8",
+    )
+
+    text, file_type = extract_text(str(doc))
+
+    assert text == "# Guide\n\nRead the docs and run().\n\n## Install\n\npip install ctxvault\n\n    # not a header"
+    assert chunking(text, chunk_size=3, overlap=0, file_type=file_type)[0].startswith("Guide\n")
+
+def test_markdown_extraction_keeps_leading_code_and_drops_front_matter():
+    from ctxvault.utils.text_extraction import markdown_to_text
+    from ctxvault.utils.chuncking import chunking
+
+    text = markdown_to_text("```python\n# comment\n```\n\nBody")
+    assert text == "    # comment\n\nBody"
+    assert chunking(text, chunk_size=50, overlap=0, file_type=".md") == ["# comment\n\nBody"]
+
+    assert markdown_to_text("---\ntitle: x\ntags: y\n---\n\n# Intro\nBody") == "# Intro\nBody"
+
 def test_chunking_backward_compatible():
     from ctxvault.utils.chuncking import chunking
     text = "hello world " * 100
@@ -169,3 +771,239 @@ def test_chunking_new_defaults():
     sig = inspect.signature(chunking)
     assert sig.parameters["chunk_size"].default == 400
     assert sig.parameters["overlap"].default == 100
+
+# ── Embedding cache ────────────────────────────────────────────────────────
+
+class FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, sentences, **kwargs):
+        import numpy as np
+        self.encoded.extend(sentences)
+        return np.array([[float(len(s)), 1.0] for s in sentences], dtype=np.float32)
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    from ctxvault.storage.embedding_cache import EmbeddingCache
+    cache = EmbeddingCache(path=tmp_path / "cache.sqlite3", max_entries=10)
+    cache.put_many({f"k{i}": [float(i)] for i in range(10)})
+    cache.get_many(["k0"])
+    cache.put_many({"k10": [10.0]})
+
+    assert len(cache) == 9
+    assert cache.get_many(["k0", "k10"]) == {"k0": [0.0], "k10": [10.0]}
+
+def test_embed_list_only_encodes_uncached_chunks(mock_global_config, monkeypatch):
+    from ctxvault.core import embedding
+    model = FakeModel()
+    monkeypatch.setattr(embedding, "embed_list", real_embed_list)
+    monkeypatch.setattr(embedding, "get_model", lambda backend=None: model)
+
+    first = embedding.embed_list(["alpha", "beta"])
+    second = embedding.embed_list(["beta", "gamma", "alpha"])
+
+    assert model.encoded == ["alpha", "beta", "gamma"]
+    assert second.dtype == np.float32 and second.flags["C_CONTIGUOUS"]
+    assert second.tolist() == [first[1].tolist(), [5.0, 1.0], first[0].tolist()]
+
+def test_embed_queries_bypasses_persistent_cache(mock_global_config, monkeypatch):
+    from ctxvault.core import embedding
+    from ctxvault.storage import embedding_cache
+    model = FakeModel()
+    monkeypatch.setattr(embedding, "get_model", lambda backend=None: model)
+    monkeypatch.setattr(embedding, "embed_queries", real_embed_queries)
+    monkeypatch.setattr(embedding_cache, "get_cache", lambda: pytest.fail("query embeddings must not touch the embedding cache"))
+
+    vectors = embedding.embed_queries(["what is rag?"])
+
+    assert model.encoded == ["what is rag?"]
+    assert vectors.shape[0] == 1
+
+def test_encode_groups_by_length_and_restores_order(monkeypatch):
+    from ctxvault.core import embedding
+    from ctxvault.models.indexing import IndexStats
+    model = FakeModel()
+    monkeypatch.setattr(embedding, "get_model", lambda backend=None: model)
+    monkeypatch.setattr(embedding, "EMBED_BATCH_SIZE", 2)
+    chunks = ["a", "b c d e f", "g", "h i j k l"]
+
+    sorted_stats, unsorted_stats = IndexStats(), IndexStats()
+    vectors = embedding._encode(chunks, backend="torch", stats=sorted_stats)
+    embedding._encode(chunks, backend="torch", stats=unsorted_stats, sort_by_length=False)
+
+    assert vectors[:, 0].tolist() == [float(len(c)) for c in chunks]
+    assert sorted_stats.padding_ratio == 0.0
+    assert unsorted_stats.padding_ratio == 0.4
+
+def test_validate_backend_checks_tolerance(monkeypatch):
+    import numpy as np
+    from ctxvault.core import embedding
+    from ctxvault.core.exceptions import EmbeddingBackendError
+
+    class ScaledModel:
+        def __init__(self, noise):
+            self.noise = noise
+
+        def encode(self, sentences, **kwargs):
+            base = np.array([[1.0, 0.5, 0.25]] * len(sentences), dtype=np.float32)
+            return base + np.array([0.0, 0.0, self.noise], dtype=np.float32)
+
+    models = {"torch": ScaledModel(0.0), "torch-int8": ScaledModel(0.01), "onnx": ScaledModel(2.0)}
+    monkeypatch.setattr(embedding, "get_model", lambda backend=None: models[backend])
+
+    assert embedding.validate_backend("torch-int8") > 0.99
+    with pytest.raises(EmbeddingBackendError):
+        embedding.validate_backend("onnx")
+
+def test_init_vault_rejects_unknown_backend(mock_global_config):
+    from ctxvault.core.exceptions import EmbeddingBackendError
+    with pytest.raises(EmbeddingBackendError):
+        vault_router.init_vault(vault_name="fast_vault", embedding_backend="tensorrt", global_vault=True)
+
+def test_vault_backend_is_used_for_indexing(mock_global_config, monkeypatch):
+    from ctxvault.core import embedding
+    from ctxvault.utils.config import get_vault_config
+    monkeypatch.setattr(embedding, "validate_backend", lambda backend: 1.0)
+    backends = []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_list",
+        lambda chunks, backend=None, stats=None: backends.append(backend) or [[0.1] * 384] * len(chunks),
+    )
+
+    vault_router.init_vault(vault_name="fast_vault", embedding_backend="onnx-int8", global_vault=True)
+    vault_router.write_doc(vault_name="fast_vault", file_path="note.txt", content="hello world")
+
+    assert get_vault_config("fast_vault")["embedding_backend"] == "onnx-int8"
+    assert backends == ["onnx-int8"]
+
+# ── Embedding scheduler ────────────────────────────────────────────────────
+
+def test_scheduler_coalesces_concurrent_requests(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from ctxvault.core.embedding_scheduler import EmbeddingScheduler
+    batches = []
+    monkeypatch.setattr(
+        "ctxvault.core.embedding.embed_queries",
+        lambda texts, backend=None: batches.append(list(texts)) or [[float(len(t))] for t in texts],
+    )
+    scheduler = EmbeddingScheduler(max_batch_size=16, max_wait_ms=50)
+    scheduler.start()
+    try:
+        texts = [f"query {'x' * i}" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(scheduler.embed, texts))
+    finally:
+        scheduler.stop()
+
+    assert results == [[float(len(t))] for t in texts]
+    assert len(batches) < len(texts)
+    assert sorted(t for batch in batches for t in batch) == sorted(texts)
+
+def test_query_uses_scheduler_when_running(mock_vault_config, monkeypatch):
+    from ctxvault.core.embedding_scheduler import scheduler
+    scheduler.start()
+    try:
+        result = vault_router.query(text="scheduled query", vault_name="test_vault")
+    finally:
+        scheduler.stop()
+
+    assert scheduler.requests >= 1
+    assert len(result.results) == 1
+
+def test_query_and_embed_are_forwarded_to_daemon(mock_vault_config, monkeypatch):
+    import os
+    import threading
+    from ctxvault.core import indexer
+    from ctxvault.daemon import client as daemon_client
+    from ctxvault.daemon.server import DaemonServer
+    from ctxvault.models.indexing import IndexStats
+
+    def cached_embed_list(chunks, backend=None, stats=None):
+        stats.chunks += len(chunks)
+        stats.cached_chunks += len(chunks)
+        return np.full((len(chunks), 384), 0.1, dtype=np.float32)
+
+    monkeypatch.setattr("ctxvault.core.embedding.embed_list", cached_embed_list)
+    server = DaemonServer(str(daemon_client.socket_path()))
+    ops = []
+    dispatch = server.dispatch
+    server.dispatch = lambda request: ops.append(request["op"]) or dispatch(request)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert daemon_client.ping()["pid"] == os.getpid()
+        result = vault_router.query(text="forwarded query", vault_name="test_vault")
+        stats = IndexStats()
+        vectors = indexer._embed_local_or_daemon(chunks=["a"], backend=None, stats=stats)
+        status = daemon_client.ping()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert ops == ["ping", "query", "embed", "ping"]
+    assert status["query_cache"]["misses"] == 1
+    assert len(result.results) == 1
+    assert vectors.shape == (1, 384) and vectors.dtype == np.float32
+    assert (stats.chunks, stats.cached_chunks) == (1, 1)
+
+def test_forwarded_query_skips_vector_store_import(mock_vault_config, mock_global_config):
+    import subprocess
+    import sys
+    import threading
+    from ctxvault.daemon import client as daemon_client
+    from ctxvault.daemon.server import DaemonServer
+
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from ctxvault.utils import config\n"
+        f"config.GLOBAL_DIR = Path({str(mock_global_config)!r})\n"
+        "config._find_local_root = lambda: None\n"
+        "from ctxvault.core import vault_router\n"
+        "result = vault_router.query(text='forwarded query', vault_name='test_vault')\n"
+        "print(len(result.results), 'chromadb' in sys.modules, 'numpy' in sys.modules)\n"
+    )
+    server = DaemonServer(str(daemon_client.socket_path()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert output.split() == ["1", "False", "False"]
+
+def test_reload_closes_only_the_changed_store_after_running_queries(tmp_path, monkeypatch):
+    import threading
+    from ctxvault.storage import chroma_store
+    monkeypatch.setattr(chroma_store, "_opened_at", {})
+    changed, other = ({"db_path": str(tmp_path / name)} for name in ("changed", "other"))
+    for config in (changed, other):
+        chroma_store.get_collection(config=config)
+    client = chroma_store._clients[changed["db_path"]]
+    started, release = threading.Event(), threading.Event()
+    client.get_or_create_collection.return_value.query.side_effect = lambda **kwargs: started.set() or release.wait(5) or {}
+
+    reader = threading.Thread(target=chroma_store.query, kwargs={"query_embedding": [[0.0]], "config": changed})
+    reader.start()
+    started.wait(5)
+    (tmp_path / "changed").mkdir()
+    (tmp_path / "changed" / "chroma.sqlite3").touch()
+    reloader = threading.Thread(target=chroma_store.reload_if_changed, kwargs={"config": changed})
+    reloader.start()
+    reloader.join(0.2)
+
+    assert reloader.is_alive() and not client.close.called
+    release.set()
+    reader.join(5)
+    reloader.join(5)
+    assert client.close.call_count == 1
+    assert set(chroma_store._collections) == {other["db_path"]}
+    assert chroma_store.reload_if_changed(config=other) is False
+
+def test_query_falls_back_when_daemon_socket_is_stale(mock_vault_config):
+    from ctxvault.daemon import client as daemon_client
+    daemon_client.socket_path().touch()
+
+    assert daemon_client.ping() is None
+    result = vault_router.query(text="local query", vault_name="test_vault")
+    assert len(result.results) == 1